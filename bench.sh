@@ -0,0 +1,3 @@
+for bench in src/bench_*.py; do
+    python3 "$bench"
+done
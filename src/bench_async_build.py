@@ -0,0 +1,70 @@
+import argparse
+import os
+import tempfile
+import time
+
+from bench_build import hash_directory, TEMPLATE, write_corpus
+import build
+from build import find_markdown_files, page_paths, render_async, render_pages
+from templates import compile_template
+
+
+def tmpfs_directory() -> str | None:
+    """Returns a tmpfs mount to keep the corpus in memory, so that the timings do not depend on the disk."""
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+def add_io_latency(delay: float) -> None:
+    """Makes every source read and output write wait delay seconds, like a request to a network file system."""
+    read_source, write_if_changed = build.read_source, build.write_if_changed
+
+    def slow_read_source(source_path: str) -> str:
+        time.sleep(delay)
+        return read_source(source_path)
+
+    def slow_write_if_changed(output_path: str, html: str, previous_hash: str | None = None) -> tuple[str, bool]:
+        time.sleep(delay)
+        return write_if_changed(output_path, html, previous_hash)
+
+    build.read_source, build.write_if_changed = slow_read_source, slow_write_if_changed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the asyncio build pipeline with the sequential page loop on tmpfs.")
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--blocks', type=int, default=10, help="blocks per page")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="render processes of the asyncio pipeline")
+    parser.add_argument('--io-delay-ms', type=float, nargs='+', default=[0.0, 1.0], help="latency added to every read and write")
+    args = parser.parse_args()
+    template = compile_template(TEMPLATE)
+
+    with tempfile.TemporaryDirectory(dir=tmpfs_directory()) as root:
+        content_dir = os.path.join(root, 'content')
+        write_corpus(content_dir, args.pages, args.blocks)
+        sources = find_markdown_files(content_dir)
+        print(f"{args.pages} pages of {args.blocks} blocks in {root}, {os.cpu_count()} cpus")
+
+        original_io = build.read_source, build.write_if_changed
+        for delay_ms in args.io_delay_ms:
+            if delay_ms > 0:
+                add_io_latency(delay_ms / 1000)
+            timings = []
+            output_hashes = set()
+            runs = [
+                ('sequential', lambda pages: render_pages(pages, template)),
+                ('asyncio, 1 worker', lambda pages: render_async(pages, template)),
+            ]
+            if args.workers > 1:
+                runs.append((f"asyncio, {args.workers} workers", lambda pages: render_async(pages, template, args.workers)))
+            for name, render in runs:
+                output_dir = os.path.join(root, f"public-{len(timings)}")
+                pages = [page_paths(content_dir, output_dir, source) for source in sources]
+                start = time.perf_counter()
+                render(pages)
+                timings.append(f"{name} {time.perf_counter() - start:.3f}s")
+                output_hashes.add(hash_directory(output_dir))
+            build.read_source, build.write_if_changed = original_io
+            assert len(output_hashes) == 1, "the pipelines wrote different pages"
+            print(f"{delay_ms:.1f}ms per read and write: {', '.join(timings)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from block_markdown import block_to_block_type, BlockType, extract_number, iter_markdown_blocks, markdown_to_blocks
+from markdown_patterns import HEADING_PATTERN
+
+
+BLOCKS = [
+    "# Release notes\n",
+    "This release fixes a handful of bugs  \nand improves the build time of large sites.\n",
+    "- fixed the parser\n- fixed the renderer\n- updated the docs\n",
+    "1. download\n2. install\n3. run\n",
+    "> a quote that spans\n> two lines\n",
+    "```\ndef main():\n    pass\n```\n",
+]
+
+
+def scanning_block_to_block_type(markdown_block: str) -> BlockType:
+    """The classifier before the first character dispatch: scans every line for an ordered list first."""
+    lines = markdown_block.split('\n')
+    is_ordered_list = True
+    previous_num = 0
+    for line in lines:
+        number = extract_number(line)
+        if number is None or number < previous_num or number != (previous_num + 1):
+            is_ordered_list = False
+            break
+        previous_num += 1
+    if HEADING_PATTERN.match(lines[0]):
+        return BlockType.HEADING
+    elif len(lines) > 1 and markdown_block.startswith('```') and markdown_block.endswith('```'):
+        return BlockType.CODE
+    elif all([line.startswith('>') for line in lines]):
+        return BlockType.QUOTE
+    elif all([line.startswith('- ') for line in lines]):
+        return BlockType.UNORDERED_LIST
+    elif is_ordered_list:
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def classification_corpus(block_lines: int) -> dict[BlockType, list[str]]:
+    """Blocks of every BlockType, the multi-line ones with block_lines lines each."""
+    return {
+        BlockType.HEADING: ["## A heading", "###### Another heading"],
+        BlockType.CODE: ["```\n" + "print('code line')\n" * block_lines + "```"],
+        BlockType.QUOTE: ["> quoted line\n" * (block_lines - 1) + "> last quoted line"],
+        BlockType.UNORDERED_LIST: ["- list item\n" * (block_lines - 1) + "- last item"],
+        BlockType.ORDERED_LIST: ['\n'.join(f"{i}. list item" for i in range(1, block_lines + 1))],
+        BlockType.PARAGRAPH: ["A paragraph line\n" * (block_lines - 1) + "last paragraph line", "- almost a list\nbut not"],
+    }
+
+def time_classifier(classify, blocks: list[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for block in blocks:
+            classify(block)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def write_markdown_file(path: str, size_bytes: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w') as file:
+        while written < size_bytes:
+            block = rng.choice(BLOCKS) + '\n' * rng.randint(1, 3)
+            file.write(block)
+            written += len(block)
+
+def measure(func) -> tuple[float, int, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    block_count = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, block_count
+
+def whole_document(path: str) -> int:
+    with open(path) as file:
+        return sum(1 for _ in markdown_to_blocks(file.read()))
+
+def streamed(path: str) -> int:
+    with open(path) as file:
+        return sum(1 for _ in iter_markdown_blocks(file))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the block classifier and compare the peak memory of the block splitters.")
+    parser.add_argument('--size-mb', type=float, default=20.0, help="size of the generated markdown file")
+    parser.add_argument('--block-lines', type=int, default=5000, help="lines in each multi-line block of the classification corpus")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for block_type, blocks in classification_corpus(args.block_lines).items():
+        for block in blocks:
+            assert block_to_block_type(block) == scanning_block_to_block_type(block) == block_type
+        scanning_time = time_classifier(scanning_block_to_block_type, blocks, args.repeat)
+        dispatch_time = time_classifier(block_to_block_type, blocks, args.repeat)
+        print(
+            f"block_to_block_type {block_type.value}: line scan {scanning_time / len(blocks) * 1e6:.1f}us, "
+            f"first character dispatch {dispatch_time / len(blocks) * 1e6:.1f}us per block"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'document.md')
+        write_markdown_file(path, int(args.size_mb * 1024 * 1024))
+        for name, func in (('markdown_to_blocks', whole_document), ('iter_markdown_blocks', streamed)):
+            elapsed, peak, block_count = measure(lambda: func(path))
+            print(f"{name}: {block_count} blocks from {args.size_mb:.1f} MB in {elapsed:.3f}s, peak traced memory {peak / 1024 / 1024:.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from build import build_site
+
+
+PAGE_BLOCKS = [
+    "## A section heading",
+    "A paragraph with **bold**, _italic_ and `code` spans,\nand a [link](https://example.com/docs) to the docs.",
+    "- a list item with **bold** text\n- a second item\n- a third item with an ![image](https://example.com/a.png)",
+    "1. first step\n2. second step\n3. third step",
+    "> a quote with _italic_ words\n> over two lines",
+    "```\ndef main():\n    return 0\n```",
+]
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+
+def write_corpus(content_dir: str, page_count: int, blocks_per_page: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    for i in range(page_count):
+        path = os.path.join(content_dir, f"section{i % 20}", f"page{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blocks = [f"# Page {i}"] + [rng.choice(PAGE_BLOCKS) for _ in range(blocks_per_page)]
+        with open(path, 'w') as file:
+            file.write('\n\n'.join(blocks))
+
+def hash_directory(directory: str) -> str:
+    digest = hashlib.sha256()
+    for root, _, file_names in sorted(os.walk(directory)):
+        for file_name in sorted(file_names):
+            path = os.path.join(root, file_name)
+            digest.update(os.path.relpath(path, directory).encode())
+            with open(path, 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+def main():
+    parser = argparse.ArgumentParser(description="Time full site builds with a growing number of worker processes.")
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--blocks', type=int, default=50, help="blocks per page")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir = os.path.join(root, 'content')
+        template_path = os.path.join(root, 'template.html')
+        with open(template_path, 'w') as file:
+            file.write(TEMPLATE)
+        write_corpus(content_dir, args.pages, args.blocks)
+
+        print(f"{args.pages} pages of {args.blocks} blocks, {os.cpu_count()} cpus")
+        output_hashes = set()
+        baseline = None
+        for workers in args.workers:
+            output_dir = os.path.join(root, f"public{workers}")
+            start = time.perf_counter()
+            build_site(content_dir, output_dir, template_path, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            output_hashes.add(hash_directory(output_dir))
+            print(f"{workers} workers: {elapsed:.3f}s, speedup x{baseline / elapsed:.2f}")
+        assert len(output_hashes) == 1, "the output changed with the number of workers"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import gc
+import time
+
+from htmlnode import clear_props_table, HTMLNode, LeafNode, ParentNode, PROPS_TABLE_MAX_SIZE
+
+
+def recursive_to_html(node: HTMLNode) -> str:
+    """The ParentNode.to_html implementation that recursed once per nesting level."""
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    tagged_content = f"<{node.tag}>"
+    for child in node.children:
+        tagged_content += recursive_to_html(child)
+    tagged_content += f"</{node.tag}>"
+    return tagged_content
+
+def nested_tree(depth: int, width: int) -> ParentNode:
+    """A chain of depth nested nodes, each level also holding width leaf siblings."""
+    node = ParentNode("blockquote", [LeafNode("p", "deepest quote")])
+    for _ in range(depth - 1):
+        siblings = [LeafNode("i", "sibling text") for _ in range(width)]
+        node = ParentNode("blockquote", [node, *siblings])
+    return node
+
+def uncached_props_to_html(self: HTMLNode) -> str:
+    """The props_to_html implementation that serialized the props on every call."""
+    if not self.props:
+        return ""
+    attrs_string = ''.join([f' {key}="{val}"' for key, val in self.props.items() if key and val])
+    return attrs_string
+
+_first_sets_table: dict[tuple[tuple[str, str], ...], tuple[dict[str, str], str]] = {}
+
+def first_sets_props_to_html(self: HTMLNode) -> str:
+    """
+    The props_to_html implementation that cached a copy of the props on the node, compared it on every call,
+    and shared the first PROPS_TABLE_MAX_SIZE attribute sets of the process, never evicted.
+    """
+    props = self.props
+    if not props:
+        return ""
+    entry = self._props_cache
+    if entry is None or entry[0] != props:
+        props_items = tuple(props.items())
+        entry = _first_sets_table.get(props_items)
+        if entry is None:
+            entry = dict(props), ''.join([f' {key}="{val}"' for key, val in props_items if key and val])
+            if len(_first_sets_table) < PROPS_TABLE_MAX_SIZE:
+                _first_sets_table[props_items] = entry
+        self._props_cache = entry
+    return entry[1]
+
+def link_page(links: int, distinct_urls: int) -> ParentNode:
+    """A page of paragraphs holding links and images, their props repeating over distinct_urls values."""
+    paragraphs = []
+    for i in range(0, links, 10):
+        children = []
+        for j in range(i, min(i + 10, links)):
+            url = f"https://example.com/page{j % distinct_urls}"
+            children.append(LeafNode("a", f"link {j}", {'href': url}))
+            children.append(LeafNode(None, " and "))
+            children.append(LeafNode("img", "", {'src': f"{url}.png", 'alt': f"image {j % distinct_urls}"}))
+        paragraphs.append(ParentNode("p", children))
+    return ParentNode("div", paragraphs)
+
+def time_render(render, node: HTMLNode, repeat: int) -> float | None:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            render(node)
+        except RecursionError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the recursive and the explicit stack html renderers, and time the props cache.")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--width', type=int, default=3, help="leaf siblings on every nesting level")
+    parser.add_argument('--links', type=int, default=5000, help="links and images on the props benchmark page")
+    args = parser.parse_args()
+
+    for depth in (10, 100, 10_000):
+        node = nested_tree(depth, args.width)
+        iterative_time = time_render(ParentNode.to_html, node, args.repeat)
+        recursive_time = time_render(recursive_to_html, node, args.repeat)
+        if recursive_time is None:
+            recursive_result = "RecursionError"
+        else:
+            assert recursive_to_html(node) == node.to_html()
+            recursive_result = f"{recursive_time * 1000:.3f}ms"
+        print(f"depth {depth}: recursive {recursive_result}, explicit stack {iterative_time * 1000:.3f}ms")
+
+    cached_props_to_html = HTMLNode.props_to_html
+    many_urls = PROPS_TABLE_MAX_SIZE * 4
+    for links, distinct_urls in ((args.links, args.links), (args.links, 50), (many_urls, many_urls)):
+        page = link_page(links, distinct_urls)
+        HTMLNode.props_to_html = uncached_props_to_html
+        try:
+            expected = page.to_html()
+            uncached_time = time_render(ParentNode.to_html, page, args.repeat)
+        finally:
+            HTMLNode.props_to_html = cached_props_to_html
+        print(f"{links} links and images, {distinct_urls} distinct urls: uncached props {uncached_time * 1000:.3f}ms")
+
+        implementations = {'first sets table': first_sets_props_to_html, 'recent sets table': cached_props_to_html}
+        # [first render, rerender, new nodes with a warm table] of every implementation, best of the repeats
+        times = {name: [float('inf')] * 3 for name in implementations}
+        for _ in range(args.repeat):
+            # the implementations take turns, so a noisy moment of the machine doesn't fall on one of them only
+            for name, props_to_html in implementations.items():
+                HTMLNode.props_to_html = props_to_html
+                try:
+                    clear_props_table()
+                    _first_sets_table.clear()
+                    page = link_page(links, distinct_urls)
+                    fresh_page = link_page(links, distinct_urls)  # new nodes, only the shared table is warm
+                    gc.collect()  # the garbage of the other implementation is not collected on this one's time
+                    start = time.perf_counter()
+                    html = page.to_html()
+                    first_time = time.perf_counter() - start
+                    start = time.perf_counter()
+                    page.to_html()
+                    cached_time = time.perf_counter() - start
+                    start = time.perf_counter()
+                    fresh_page.to_html()
+                    fresh_time = time.perf_counter() - start
+                finally:
+                    HTMLNode.props_to_html = cached_props_to_html
+                assert html == expected
+                best = times[name]
+                times[name] = [min(best[0], first_time), min(best[1], cached_time), min(best[2], fresh_time)]
+        for name, (first_time, cached_time, fresh_time) in times.items():
+            print(
+                f"  {name}: first render {first_time * 1000:.3f}ms, rerender {cached_time * 1000:.3f}ms, "
+                f"new nodes with a warm table {fresh_time * 1000:.3f}ms"
+            )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import random
+import time
+
+from inline_markdown import (
+    ALLOWED_DELIMITERS,
+    extract_markdown_links,
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_text_nodes
+)
+from textnode import TextNode, TextType
+
+
+PARAGRAPH_PIECES = [
+    "Lorem ipsum dolor sit amet, ",
+    "consectetur adipiscing elit ",
+    "**bold words** ",
+    "an _italic_ one ",
+    "a *second italic* ",
+    "some `inline code` ",
+    "a [link to docs](https://example.com/docs/page) ",
+    "an ![image](https://example.com/static/image.png) ",
+]
+
+
+def split_pipeline_text_to_text_nodes(text: str) -> list[TextNode]:
+    """The chained split pipeline text_to_text_nodes used before the single pass tokenizer."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    for delimiter, text_type in ALLOWED_DELIMITERS.items():
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    return nodes
+
+def split_pattern_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
+    """The split_nodes_link implementation that rebuilt every link source and split the remaining text on it."""
+    new_nodes = []
+    for old_node in old_nodes:
+        original_text = old_node.text
+        for text, url in extract_markdown_links(original_text):
+            sections = original_text.split(f"[{text}]({url})", 1)
+            if sections[0]:
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(text, TextType.LINK, url))
+            original_text = sections[1]
+        if original_text:
+            new_nodes.append(TextNode(original_text, TextType.TEXT))
+    return new_nodes
+
+def generate_paragraphs(size_bytes: int, pieces_per_paragraph: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    paragraphs = []
+    total = 0
+    while total < size_bytes:
+        paragraph = ''.join(rng.choice(PARAGRAPH_PIECES) for _ in range(pieces_per_paragraph))
+        paragraphs.append(paragraph)
+        total += len(paragraph)
+    return paragraphs
+
+def time_call(func, paragraphs: list[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            func(paragraph)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def link_index_block(link_count: int) -> str:
+    return ' '.join(f"[Page number {i}](https://example.com/pages/{i}.html)" for i in range(link_count))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare text_to_text_nodes with the chained split pipeline.")
+    parser.add_argument('--size-mb', type=float, default=4.0, help="total size of the generated paragraphs")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--links', type=int, default=10_000, help="number of links in the link index block")
+    args = parser.parse_args()
+
+    for link_count in (args.links // 10, args.links):
+        node = TextNode(link_index_block(link_count), TextType.TEXT)
+        assert split_nodes_link([node]) == split_pattern_nodes_link([node])
+        split_pattern_time = time_call(lambda n: split_pattern_nodes_link([n]), [node], args.repeat)
+        offsets_time = time_call(lambda n: split_nodes_link([n]), [node], args.repeat)
+        print(
+            f"link index of {link_count} links in one block: "
+            f"split on link source {split_pattern_time:.3f}s, match offsets {offsets_time:.3f}s, "
+            f"speedup x{split_pattern_time / offsets_time:.2f}"
+        )
+
+    for pieces_per_paragraph in (10, 100, 1000):
+        paragraphs = generate_paragraphs(int(args.size_mb * 1024 * 1024), pieces_per_paragraph)
+        for paragraph in paragraphs[:10]:
+            assert text_to_text_nodes(paragraph) == split_pipeline_text_to_text_nodes(paragraph)
+        pipeline_time = time_call(split_pipeline_text_to_text_nodes, paragraphs, args.repeat)
+        tokenizer_time = time_call(text_to_text_nodes, paragraphs, args.repeat)
+        print(
+            f"{args.size_mb:.1f} MB, {len(paragraphs)} paragraphs of {pieces_per_paragraph} pieces: "
+            f"split pipeline {pipeline_time:.3f}s, tokenizer {tokenizer_time:.3f}s, "
+            f"speedup x{pipeline_time / tokenizer_time:.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from block_markdown import iter_mapped_blocks, iter_markdown_blocks, markdown_to_blocks
+from markdown_corpus import generate_document
+
+
+CHUNK_BYTES = 1024 * 1024
+
+
+def whole_document(path: str):
+    with open(path, 'rb') as file:
+        return markdown_to_blocks(file.read().decode('utf-8'))
+
+def streamed(path: str):
+    with open(path, encoding='utf-8') as file:
+        yield from iter_markdown_blocks(file)
+
+READERS = {
+    'markdown_to_blocks': whole_document,
+    'iter_markdown_blocks': streamed,
+    'iter_mapped_blocks': iter_mapped_blocks,
+}
+
+
+def write_markdown_file(path: str, size_bytes: int) -> None:
+    chunks = [generate_document(CHUNK_BYTES, seed) for seed in range(4)]
+    written = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        while written < size_bytes:
+            chunk = chunks[written // CHUNK_BYTES % len(chunks)]
+            file.write(chunk)
+            file.write('\n')
+            written += len(chunk) + 1
+
+def run_reader(name: str, path: str) -> None:
+    """Splits the file with one reader and prints its timing and peak rss as json, run in a fresh process."""
+    start = time.perf_counter()
+    block_count = 0
+    largest_block = 0
+    for block in READERS[name](path):
+        block_count += 1
+        largest_block = max(largest_block, len(block))
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({'seconds': elapsed, 'blocks': block_count, 'largest_block': largest_block, 'peak_rss': peak_rss}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the peak rss of the block splitters on a large markdown file.")
+    parser.add_argument('--size-mb', type=float, default=500.0, help="size of the generated markdown file")
+    parser.add_argument('--readers', nargs='+', choices=list(READERS), default=list(READERS))
+    parser.add_argument('--child', nargs=2, metavar=('READER', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_reader(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'document.md')
+        write_markdown_file(path, int(args.size_mb * 1024 * 1024))
+        print(f"{os.path.getsize(path) / 1024 / 1024:.0f} MB file")
+        results = {}
+        for name in args.readers:
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', name, path], check=True, capture_output=True, text=True
+            ).stdout
+            results[name] = result = json.loads(output)
+            print(
+                f"{name}: {result['blocks']} blocks in {result['seconds']:.2f}s, "
+                f"peak rss {result['peak_rss'] / 1024 / 1024:.1f} MB, largest block {result['largest_block'] / 1024:.1f} KB"
+            )
+        assert len({result['blocks'] for result in results.values()}) == 1, "the readers found different blocks"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from block_cache import BlockCache
+from block_markdown import markdown_to_blocks
+from markdown_corpus import generate_document
+from markdown_html import markdown_to_html, render_blocks
+
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the render of a large page after one of its paragraphs is edited.")
+    parser.add_argument('--blocks', type=int, default=2000, help="blocks of the page")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    blocks = markdown_to_blocks(generate_document(args.blocks * 400))[:args.blocks]
+    original = '\n\n'.join(blocks)
+    blocks[len(blocks) // 2] = "A paragraph that was **edited** since the last render."
+    edited = '\n\n'.join(blocks)
+
+    previous = render_blocks(original)
+    assert render_blocks(edited, previous).to_html() == markdown_to_html(edited)
+    block_cache = BlockCache()
+    markdown_to_html(original, block_cache)
+
+    full_time = best_time(lambda: markdown_to_html(edited), args.repeat)
+    cache_time = best_time(lambda: markdown_to_html(edited, block_cache), args.repeat)
+    diff_time = best_time(lambda: render_blocks(edited, previous), args.repeat)
+    print(
+        f"{len(blocks)} blocks, one edited: full render {full_time * 1000:.2f}ms, "
+        f"block cache {cache_time * 1000:.2f}ms, block diff {diff_time * 1000:.2f}ms"
+    )
+
+
+if __name__ == '__main__':
+    main()
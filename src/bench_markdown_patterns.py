@@ -0,0 +1,80 @@
+import argparse
+import re
+import timeit
+
+from block_markdown import block_to_block_type, BlockType, extract_number, markdown_to_blocks
+from inline_markdown import extract_markdown_images, extract_markdown_links
+
+
+def literal_markdown_to_blocks(markdown: str) -> list[str]:
+    normalized_markdown = re.sub(r'[\t ]+\n', '\n', markdown)
+    normalized_markdown = re.sub(r'\n{2,}', '\n\n', normalized_markdown)
+    return [block for block in map(str.strip, normalized_markdown.split('\n\n')) if block]
+
+def literal_extract_number(line: str) -> int | None:
+    match = re.match(r'^(\d+)\.', line)
+    if match:
+        return int(match.group(1))
+    return None
+
+def literal_block_to_block_type(markdown_block: str) -> BlockType:
+    lines = markdown_block.split('\n')
+    is_ordered_list = True
+    previous_num = 0
+    for line in lines:
+        number = literal_extract_number(line)
+        if number is None or number < previous_num or number != (previous_num + 1):
+            is_ordered_list = False
+            break
+        previous_num += 1
+    if re.findall(r'^#{1,6} .*', lines[0]):
+        return BlockType.HEADING
+    elif len(lines) > 1 and markdown_block.startswith('```') and markdown_block.endswith('```'):
+        return BlockType.CODE
+    elif all([line.startswith('>') for line in lines]):
+        return BlockType.QUOTE
+    elif all([line.startswith('- ') for line in lines]):
+        return BlockType.UNORDERED_LIST
+    elif is_ordered_list:
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def literal_extract_markdown_images(text: str) -> list[tuple[str, str]]:
+    return re.findall(r'!\[([^\[\]]*)\]\(([^\(\)]*)\)', text)
+
+def literal_extract_markdown_links(text: str) -> list[tuple[str, str]]:
+    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+
+MARKDOWN = "# Heading  \n\n\n\nA paragraph\nwith two lines\t\n\n- one\n- two\n\n1. one\n2. two\n" * 5
+LINE = "12. ordered list item"
+HEADING = "### A heading"
+ORDERED_LIST = "1. one\n2. two\n3. three\n4. four"
+INLINE = "text ![image](https://example.com/a.png) and a [link](https://example.com) " * 5
+
+CASES = [
+    ('markdown_to_blocks', literal_markdown_to_blocks, markdown_to_blocks, MARKDOWN),
+    ('extract_number', literal_extract_number, extract_number, LINE),
+    ('block_to_block_type (heading)', literal_block_to_block_type, block_to_block_type, HEADING),
+    ('block_to_block_type (ordered list)', literal_block_to_block_type, block_to_block_type, ORDERED_LIST),
+    ('extract_markdown_images', literal_extract_markdown_images, extract_markdown_images, INLINE),
+    ('extract_markdown_links', literal_extract_markdown_links, extract_markdown_links, INLINE),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare regex calls with string literals against the precompiled patterns.")
+    parser.add_argument('--number', type=int, default=100_000, help="calls per measurement")
+    args = parser.parse_args()
+
+    for name, literal_func, compiled_func, argument in CASES:
+        assert literal_func(argument) == compiled_func(argument)
+        literal_time = min(timeit.repeat(lambda: literal_func(argument), number=args.number, repeat=3))
+        compiled_time = min(timeit.repeat(lambda: compiled_func(argument), number=args.number, repeat=3))
+        print(
+            f"{name}: string literal {literal_time / args.number * 1e9:.0f}ns, "
+            f"precompiled {compiled_time / args.number * 1e9:.0f}ns per call"
+        )
+
+
+if __name__ == '__main__':
+    main()
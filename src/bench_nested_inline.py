@@ -0,0 +1,32 @@
+import argparse
+import time
+
+from markdown_corpus import WORST_CASE_INLINE_TEXTS
+from nested_inline import parse_nested_inline
+
+
+def best_time(text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_nested_inline(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parse_nested_inline on the inputs that make a naive parser quadratic.")
+    parser.add_argument('--size', type=int, default=2000, help="repetitions of the worst case pattern in the small input")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for name, make in WORST_CASE_INLINE_TEXTS.items():
+        small_time = best_time(make(args.size), args.repeat)
+        large_time = best_time(make(args.size * 4), args.repeat)
+        print(
+            f"{name}: {args.size} repetitions {small_time:.4f}s, {args.size * 4} repetitions {large_time:.4f}s, "
+            f"ratio x{large_time / small_time:.2f} (linear x4, quadratic x16)"
+        )
+
+
+if __name__ == '__main__':
+    main()
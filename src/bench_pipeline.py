@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from block_markdown import block_to_block_type, markdown_to_blocks
+from inline_markdown import text_to_text_nodes
+from markdown_corpus import generate_document
+from markdown_html import block_inline_texts, markdown_to_html_node
+from textnode import text_node_to_html_node
+
+
+RESULTS_VERSION = 1
+STAGES = ('markdown_to_blocks', 'block_to_block_type', 'text_to_text_nodes', 'text_node_to_html_node', 'to_html')
+
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_stages(markdown: str, repeat: int) -> dict[str, dict]:
+    """
+    Times every pipeline stage on the output of the previous one, so each timing only covers its own stage.
+
+    :return: for every stage, the best time in seconds and the number of items it processed
+    """
+    blocks = markdown_to_blocks(markdown)
+    block_types = [block_to_block_type(block) for block in blocks]
+    texts = [text for block, block_type in zip(blocks, block_types) for text in block_inline_texts(block, block_type)]
+    text_nodes = [text_node for text in texts for text_node in text_to_text_nodes(text)]
+    root = markdown_to_html_node(markdown)
+
+    stages = {
+        'markdown_to_blocks': (lambda: markdown_to_blocks(markdown), 1),
+        'block_to_block_type': (lambda: [block_to_block_type(block) for block in blocks], len(blocks)),
+        'text_to_text_nodes': (lambda: [text_to_text_nodes(text) for text in texts], len(texts)),
+        'text_node_to_html_node': (lambda: [text_node_to_html_node(node, trusted=True) for node in text_nodes], len(text_nodes)),
+        'to_html': (root.to_html, 1),
+    }
+    return {name: {'seconds': best_time(func, repeat), 'items': items} for name, (func, items) in stages.items()}
+
+def check_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Returns a message for every stage slower than its baseline time by more than tolerance (0.2 is 20%)."""
+    if baseline.get('corpus') != results['corpus']:
+        return [f"baseline corpus {baseline.get('corpus')} differs from {results['corpus']}, rerun with --update-baseline"]
+    regressions = []
+    for name, stage in results['stages'].items():
+        baseline_stage = baseline['stages'].get(name)
+        if baseline_stage is None:
+            continue
+        ratio = stage['seconds'] / baseline_stage['seconds']
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: {stage['seconds'] * 1000:.3f}ms against {baseline_stage['seconds'] * 1000:.3f}ms in the baseline (x{ratio:.2f})"
+            )
+    return regressions
+
+def write_json(path: str, data: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every stage of the markdown to html pipeline on a generated corpus.")
+    parser.add_argument('--size-kb', type=int, default=512, help="size of the generated document")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='.build/bench_pipeline.json', help="where the json results are written")
+    parser.add_argument('--baseline', default='.build/bench_pipeline_baseline.json', help="results the run is compared against")
+    parser.add_argument('--update-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="slowdown allowed before a stage counts as a regression")
+    args = parser.parse_args()
+
+    markdown = generate_document(args.size_kb * 1024, args.seed)
+    results = {
+        'version': RESULTS_VERSION,
+        'corpus': {'size_kb': args.size_kb, 'seed': args.seed},
+        'python': platform.python_version(),
+        'stages': run_stages(markdown, args.repeat),
+    }
+    for name, stage in results['stages'].items():
+        print(f"{name}: {stage['seconds'] * 1000:.3f}ms for {stage['items']} items")
+    write_json(args.output, results)
+
+    if args.update_baseline:
+        write_json(args.baseline, results)
+        print(f"baseline stored in {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline in {args.baseline}, store one with --update-baseline")
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = check_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"no stage slower than the baseline by more than {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
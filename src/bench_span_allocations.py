@@ -0,0 +1,87 @@
+import argparse
+import io
+import time
+import tracemalloc
+
+from bench_inline_markdown import generate_paragraphs, split_pipeline_text_to_text_nodes
+from inline_markdown import bytes_to_span_stream, text_to_span_stream, text_to_text_nodes
+from textnode import text_node_to_html_node, text_span_stream_to_html
+
+
+class CountingSink:
+    """Binary output that only counts what is written, so the output buffer is not part of the measures."""
+    def __init__(self) -> None:
+        self.size = 0
+
+    def write(self, data) -> None:
+        self.size += len(data)
+
+
+def render_nodes(nodes, sink: CountingSink) -> None:
+    sink.write(''.join([text_node_to_html_node(node, trusted=True).to_html() for node in nodes]).encode('utf-8'))
+
+def pipelines(paragraphs: list[str], document: bytes) -> dict[str, callable]:
+    """Every pipeline renders paragraph i of the document to utf-8 html written to a sink."""
+    view = memoryview(document)
+    ranges = []
+    position = 0
+    for paragraph in paragraphs:
+        size = len(paragraph.encode('utf-8'))
+        ranges.append((position, position + size))
+        position += size + 2  # the blank line separating the paragraphs
+
+    return {
+        'split pipeline': lambda i, sink: render_nodes(split_pipeline_text_to_text_nodes(paragraphs[i]), sink),
+        'tokenizer': lambda i, sink: render_nodes(text_to_text_nodes(paragraphs[i]), sink),
+        'span stream': lambda i, sink: sink.write(text_span_stream_to_html(text_to_span_stream(paragraphs[i])).encode('utf-8')),
+        'byte spans': lambda i, sink: bytes_to_span_stream(view[ranges[i][0]:ranges[i][1]]).write_html(sink),
+    }
+
+def measure(render, count: int) -> tuple[float, int, int, int]:
+    """
+    Renders the count paragraphs once timed, once traced.
+
+    :return: seconds, bytes allocated at the peak of every paragraph summed over the paragraphs,
+        largest of those peaks, size of the html written
+    """
+    sink = CountingSink()
+    start = time.perf_counter()
+    for i in range(count):
+        render(i, sink)
+    elapsed = time.perf_counter() - start
+
+    total = largest = 0
+    tracemalloc.start()
+    for i in range(count):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        render(i, CountingSink())
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - before
+        largest = max(largest, peak - before)
+    tracemalloc.stop()
+    return elapsed, total, largest, sink.size
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory allocated by the inline pipelines rendering paragraphs to html.")
+    parser.add_argument('--size-mb', type=float, default=2.0, help="total size of the generated paragraphs")
+    parser.add_argument('--pieces', type=int, nargs='+', default=[10, 1000], help="pieces per paragraph of each run")
+    args = parser.parse_args()
+
+    for pieces in args.pieces:
+        paragraphs = generate_paragraphs(int(args.size_mb * 1024 * 1024), pieces)
+        document = '\n\n'.join(paragraphs).encode('utf-8')
+        print(f"{len(paragraphs)} paragraphs of {pieces} pieces, {len(document) / 1024 / 1024:.1f} MB")
+        sizes = set()
+        for name, render in pipelines(paragraphs, document).items():
+            elapsed, total, largest, size = measure(render, len(paragraphs))
+            sizes.add(size)
+            print(
+                f"  {name}: {elapsed:.3f}s, {total / len(document):.2f} bytes allocated per source byte, "
+                f"largest paragraph peak {largest / 1024:.1f} kB"
+            )
+        assert len(sizes) == 1, "the pipelines wrote different html"
+
+
+if __name__ == '__main__':
+    main()
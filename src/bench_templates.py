@@ -0,0 +1,80 @@
+import argparse
+import os
+import tempfile
+import time
+
+from templates import compile_template, get_template
+
+
+TEMPLATE = """<!doctype html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{{ Title }}</title>
+    <link rel="stylesheet" href="/index.css">
+</head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/blog/">Blog</a> <a href="/about.html">About</a></nav></header>
+<article>
+{{ Content }}
+</article>
+<footer>{{ Title }}, built by the static site generator</footer>
+</body>
+</html>
+"""
+
+
+def replace_fill(template: str, title: str, content: str) -> str:
+    """The fill_template implementation that scanned the whole template once per placeholder."""
+    return template.replace('{{ Title }}', title).replace('{{ Content }}', content)
+
+def padded_template(style_kb: float) -> str:
+    """TEMPLATE with style_kb of inline css in its head, like sites that inline their stylesheet."""
+    rule = "body { margin: 0 }\n"
+    return TEMPLATE.replace('</head>', f"<style>\n{rule * int(style_kb * 1024 / len(rule))}</style>\n</head>")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time wrapping rendered pages in a template, str.replace against a compiled template.")
+    parser.add_argument('--pages', type=int, default=50_000)
+    parser.add_argument('--content-kb', type=float, default=4, help="size of the html of every page")
+    parser.add_argument('--style-kb', type=float, nargs='+', default=[0, 16, 64], help="inline css added to the template")
+    args = parser.parse_args()
+
+    paragraph = "<p>Some <b>rendered</b> text of the page</p>"
+    content = paragraph * max(int(args.content_kb * 1024) // len(paragraph), 1)
+    pages = [(f"Page {i}", content) for i in range(args.pages)]
+    print(f"{args.pages} pages of {len(content)} characters")
+
+    for style_kb in args.style_kb:
+        template = padded_template(style_kb)
+        compiled = compile_template(template)
+        for title, html in pages[:100]:
+            assert compiled.render({'Title': title, 'Content': html}) == replace_fill(template, title, html)
+
+        # the pages are not kept, like a build writing every one before rendering the next
+        start = time.perf_counter()
+        for title, html in pages:
+            replace_fill(template, title, html)
+        replace_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for title, html in pages:
+            compiled.render({'Title': title, 'Content': html})
+        compiled_seconds = time.perf_counter() - start
+        print(
+            f"template of {len(template)} characters: str.replace {replace_seconds:.3f}s, "
+            f"compiled {compiled_seconds:.3f}s, x{replace_seconds / compiled_seconds:.2f}"
+        )
+
+    with tempfile.TemporaryDirectory() as root:
+        template_path = os.path.join(root, 'template.html')
+        with open(template_path, 'w') as file:
+            file.write(TEMPLATE)
+        start = time.perf_counter()
+        for _ in range(args.pages):
+            get_template(template_path)
+        print(f"get_template from the cache: {(time.perf_counter() - start) / args.pages * 1e6:.2f}us per lookup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+from htmlnode import LeafNode
+from inline_markdown import text_to_span_stream, text_to_text_nodes
+from textnode import (
+    clear_interned_html_nodes, interned_html_nodes_info, TextNode, TextType, text_node_to_html_node, text_span_stream_to_html,
+)
+
+
+# docs paragraphs repeat the same nav links, labels and identifiers over and over
+DOCS_SPANS = [
+    "See the [installation guide](/docs/install.html) ",
+    "or the [API reference](/docs/api.html). ",
+    "**Note:** ",
+    "**Warning:** ",
+    "call `build` with ",
+    "the `source` and `target` arguments, ",
+    "_optional_ ",
+    "![logo](/static/logo.png) ",
+    "the build renders every page of the site. ",
+    "pages are written to the output directory. ",
+]
+
+
+class DictTextNode:
+    """TextNode as it was before __slots__: same validation, per-instance __dict__."""
+    def __init__(self, text: str, text_type: TextType, url: str | None = None) -> None:
+        if not isinstance(text, str):
+            raise TypeError('text must be a string')
+        if not isinstance(text_type, TextType):
+            raise TypeError('text_type must be a TextType')
+        if url is not None and not isinstance(url, str):
+            raise TypeError('url must be a string')
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode:
+    """LeafNode as it was before __slots__: same validation, per-instance __dict__."""
+    def __init__(self, tag: str | None, value: str, props: dict[str, str] | None = None) -> None:
+        if tag == '':
+            tag = None
+        if tag is not None and not isinstance(tag, str):
+            raise TypeError("tag must be a string")
+        if value is not None and not isinstance(value, str):
+            raise TypeError("value must be a string")
+        if props is not None and not isinstance(props, dict):
+            raise TypeError("props must be a dictionary")
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def measure(build, count: int) -> tuple[float, int]:
+    texts = [f"span {i}" for i in range(count)]
+    start = time.perf_counter()
+    nodes = [build(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    del nodes
+
+    # timed and traced separately, tracemalloc slows every allocation down
+    tracemalloc.start()
+    nodes = [build(text) for text in texts]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del nodes
+    return elapsed, size
+
+def docs_paragraphs(paragraph_count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [''.join(rng.choice(DOCS_SPANS) for _ in range(12)) for _ in range(paragraph_count)]
+
+def docs_text_nodes(paragraph_count: int, seed: int = 0) -> list[TextNode]:
+    return [text_node for paragraph in docs_paragraphs(paragraph_count, seed) for text_node in text_to_text_nodes(paragraph)]
+
+def measure_span_storage(paragraphs: list[str], parse) -> tuple[float, int]:
+    """Time to parse the paragraphs and memory held by the parsed spans, the paragraphs themselves excluded."""
+    start = time.perf_counter()
+    parsed = [parse(paragraph) for paragraph in paragraphs]
+    elapsed = time.perf_counter() - start
+    del parsed
+
+    tracemalloc.start()
+    parsed = [parse(paragraph) for paragraph in paragraphs]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parsed
+    return elapsed, size
+
+def measure_conversion(text_nodes: list[TextNode], intern: bool) -> tuple[float, int, int]:
+    clear_interned_html_nodes()
+    start = time.perf_counter()
+    html_nodes = [text_node_to_html_node(text_node, intern) for text_node in text_nodes]
+    elapsed = time.perf_counter() - start
+    del html_nodes
+
+    clear_interned_html_nodes()
+    tracemalloc.start()
+    html_nodes = [text_node_to_html_node(text_node, intern) for text_node in text_nodes]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    distinct_nodes = len({id(html_node) for html_node in html_nodes})
+    return elapsed, size, distinct_nodes
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure construction time and memory of the node classes.")
+    parser.add_argument('--count', type=int, default=500_000, help="number of nodes built per case")
+    parser.add_argument('--paragraphs', type=int, default=20_000, help="paragraphs of the docs corpus converted to html nodes")
+    args = parser.parse_args()
+
+    text_nodes = docs_text_nodes(args.paragraphs)
+    for intern in (False, True):
+        elapsed, size, distinct_nodes = measure_conversion(text_nodes, intern)
+        print(
+            f"text_node_to_html_node intern={intern}: {len(text_nodes)} text nodes in {elapsed:.3f}s, "
+            f"{distinct_nodes} html node objects, {size / 1024 / 1024:.2f} MB allocated"
+        )
+    print(f"interned nodes cache: {interned_html_nodes_info()}")
+
+    paragraphs = docs_paragraphs(args.paragraphs)
+    for name, parse, render in [
+        ('list of TextNode', text_to_text_nodes, lambda nodes: ''.join([text_node_to_html_node(node, trusted=True).to_html() for node in nodes])),
+        ('TextSpanStream', text_to_span_stream, text_span_stream_to_html),
+    ]:
+        elapsed, size = measure_span_storage(paragraphs, parse)
+        parsed = [parse(paragraph) for paragraph in paragraphs]
+        start = time.perf_counter()
+        for spans in parsed:
+            render(spans)
+        render_seconds = time.perf_counter() - start
+        print(
+            f"{name}: {len(paragraphs)} paragraphs parsed in {elapsed:.3f}s holding {size / 1024 / 1024:.2f} MB, "
+            f"rendered in {render_seconds:.3f}s"
+        )
+
+    cases = [
+        ('TextNode with __dict__', lambda text: DictTextNode(text, TextType.BOLD)),
+        ('TextNode', lambda text: TextNode(text, TextType.BOLD)),
+        ('TextNode.trusted', lambda text: TextNode.trusted(text, TextType.BOLD)),
+        ('LeafNode with __dict__', lambda text: DictLeafNode("b", text)),
+        ('LeafNode', lambda text: LeafNode("b", text)),
+        ('LeafNode.trusted', lambda text: LeafNode.trusted("b", text)),
+    ]
+    for name, build in cases:
+        elapsed, size = measure(build, args.count)
+        # the list holding the nodes is part of the traced size, it is the same for every case
+        print(f"{name}: {args.count} nodes in {elapsed:.3f}s, {size / args.count:.1f} bytes per node")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from bench_build import TEMPLATE, write_corpus
+from watch import scan_markdown_files, SiteWatcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the rebuilds of watch mode after a single page is saved.")
+    parser.add_argument('--pages', type=int, default=10_000)
+    parser.add_argument('--blocks', type=int, default=20, help="blocks per page")
+    parser.add_argument('--edits', type=int, default=20, help="saves of a page to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir = os.path.join(root, 'content')
+        template_path = os.path.join(root, 'template.html')
+        with open(template_path, 'w') as file:
+            file.write(TEMPLATE)
+        write_corpus(content_dir, args.pages, args.blocks)
+
+        watcher = SiteWatcher(content_dir, os.path.join(root, 'public'), template_path)
+        start = time.perf_counter()
+        watcher.start()
+        print(f"{args.pages} pages of {args.blocks} blocks, first build {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        scan_markdown_files(content_dir)
+        print(f"scan of the sources: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        latencies = []
+        for edit in range(args.edits):
+            path = os.path.join(content_dir, f"section{edit % 20}", f"page{edit}.md")
+            with open(path, 'a') as file:
+                file.write(f"\n\nA paragraph added by edit {edit}.")
+            report = watcher.poll()
+            assert report.rendered == [os.path.relpath(path, content_dir)]
+            latencies.append(report.seconds)
+        print(
+            f"rebuild after a save: median {statistics.median(latencies) * 1000:.1f}ms, "
+            f"max {max(latencies) * 1000:.1f}ms over {args.edits} edits"
+        )
+
+
+if __name__ == '__main__':
+    main()
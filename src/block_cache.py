@@ -0,0 +1,124 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+
+# bump whenever block rendering changes, fragments stored by another version are dropped on load
+BLOCK_CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 50_000
+
+
+def block_key(block: str) -> str:
+    return hashlib.blake2b(block.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class BlockCache:
+    """
+    Bounded LRU cache of rendered html fragments, keyed by the content hash of a normalized block.
+
+    The cache can be stored as json between builds, blocks that did not change since then
+    skip classification and inline parsing altogether.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: str | None = None) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries: int = max_entries
+        self.path: str | None = path
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.record_added: bool = False
+        self._fragments: OrderedDict[str, str] = OrderedDict()
+        self._added: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> "BlockCache":
+        """
+        Returns the cache stored in path, or an empty one when there is none or it can't be used:
+        written by another version, or truncated or corrupt, like after a crash during save.
+        """
+        cache = cls(max_entries, path)
+        if not os.path.exists(path):
+            return cache
+        try:
+            with open(path) as file:
+                data = json.load(file)
+            if data.get('version') != BLOCK_CACHE_VERSION:
+                return cache
+            # stored from least to most recently used, so the newest survive a smaller max_entries
+            fragments = OrderedDict((key, fragment) for key, fragment in data['fragments'][-max_entries:])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return cache  # a cache is never worth failing a build for
+        if not all(isinstance(key, str) and isinstance(fragment, str) for key, fragment in fragments.items()):
+            return cache
+        cache._fragments = fragments
+        return cache
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, 'w') as file:
+                json.dump({'version': BLOCK_CACHE_VERSION, 'fragments': list(self._fragments.items())}, file)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            # a failed or interrupted save must not leave a partial file behind
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def get(self, key: str) -> str | None:
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            self.misses += 1
+            return None
+        self._fragments.move_to_end(key)
+        self.hits += 1
+        return fragment
+
+    def put(self, key: str, fragment: str) -> None:
+        self._store(key, fragment)
+        if self.record_added:
+            self._added[key] = fragment
+
+    def _store(self, key: str, fragment: str) -> None:
+        self._fragments[key] = fragment
+        self._fragments.move_to_end(key)
+        while len(self._fragments) > self.max_entries:
+            self._fragments.popitem(last=False)
+            self.evictions += 1
+
+    def take_added(self) -> dict[str, str]:
+        """
+        Returns the fragments put since the last call, they are only recorded when record_added is set.
+
+        Build workers use it to send the fragments they rendered back to the cache of the main process.
+        """
+        added = self._added
+        self._added = {}
+        return added
+
+    def merge(self, fragments: dict[str, str], hits: int = 0, misses: int = 0) -> None:
+        """Adds the fragments and lookup counts collected by another cache, like the one of a build worker."""
+        for key, fragment in fragments.items():
+            self._store(key, fragment)
+        self.hits += hits
+        self.misses += misses
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"BlockCache({len(self._fragments)}/{self.max_entries} entries, hits={self.hits}, "
+            f"misses={self.misses}, evictions={self.evictions})"
+        )
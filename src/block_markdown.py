@@ -1,5 +1,18 @@
+from collections.abc import Iterable, Iterator
 from enum import Enum
-import re
+import mmap
+import os
+
+from markdown_patterns import (
+    BLANK_LINES_PATTERN,
+    BLOCK_BOUNDARY_BYTES_PATTERN,
+    HEADING_PATTERN,
+    ORDERED_LIST_ITEM_PATTERN,
+    TRAILING_WHITESPACE_PATTERN,
+)
+
+# mapped pages already split into blocks are handed back to the kernel every that many bytes
+MAPPED_RELEASE_BYTES = 8 * 1024 * 1024
 
 
 class BlockType(Enum):
@@ -11,38 +24,112 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
 
 def markdown_to_blocks(markdown: str) -> list[str]:
-    normalized_markdown = re.sub(r'[\t ]+\n', '\n', markdown)
-    normalized_markdown = re.sub(r'\n{2,}', '\n\n', normalized_markdown)
+    normalized_markdown = TRAILING_WHITESPACE_PATTERN.sub('\n', markdown)
+    normalized_markdown = BLANK_LINES_PATTERN.sub('\n\n', normalized_markdown)
     blocks: list[str] = normalized_markdown.split('\n\n')
-    blocks = [block.strip() for block in blocks if block.strip()]
+    blocks = [block for block in map(str.strip, blocks) if block]
     return blocks
 
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming version of markdown_to_blocks, yields the same blocks one at a time.
+
+    Only the lines of the block being built are kept in memory, so an open file can be
+    split into blocks without reading the whole document first.
+
+    :param lines: an open text file or any other iterable of lines, with or without their trailing newline
+    :return: iterator over the normalized blocks
+    """
+    block_lines: list[str] = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\t ')
+        if line:
+            block_lines.append(line)
+            continue
+        if block_lines:
+            block = '\n'.join(block_lines).strip()
+            block_lines = []
+            if block:
+                yield block
+    if block_lines:
+        block = '\n'.join(block_lines).strip()
+        if block:
+            yield block
+
+def iter_mapped_blocks(path: str, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Memory-mapped version of markdown_to_blocks for large files, yields the same blocks one at a time.
+
+    The block boundaries are found on the raw bytes of the mapping and only the block being yielded is
+    decoded, so the file is never held as a whole str. The pages already read are released as the scan
+    moves on, keeping the resident memory close to the size of the largest block.
+
+    :param path: the markdown file, in an encoding where newlines, tabs and spaces are single ASCII bytes
+    :param encoding: encoding of the file
+    :return: iterator over the normalized blocks
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return  # an empty file can't be mapped
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            can_release = hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+            released = 0
+            start = 0
+            for boundary in BLOCK_BOUNDARY_BYTES_PATTERN.finditer(mapped):
+                block = _normalize_block(mapped[start:boundary.start()].decode(encoding))
+                start = boundary.end()
+                if block:
+                    yield block
+                if can_release and start - released >= MAPPED_RELEASE_BYTES:
+                    end = start - start % mmap.PAGESIZE
+                    mapped.madvise(mmap.MADV_DONTNEED, released, end - released)
+                    released = end
+            block = _normalize_block(mapped[start:].decode(encoding))
+            if block:
+                yield block
+
+def _normalize_block(text: str) -> str:
+    # most blocks have no trailing whitespace, the substitution would try a match at every space
+    if ' \n' in text or '\t\n' in text:
+        text = TRAILING_WHITESPACE_PATTERN.sub('\n', text)
+    return text.strip()
+
 def extract_number(line: str) -> int | None:
-    match = re.match(r'^(\d+)\.', line)
+    match = ORDERED_LIST_ITEM_PATTERN.match(line)
     if match:
         return int(match.group(1))
     return None
 
+def _all_lines_start_with(markdown_block: str, prefix: str) -> bool:
+    # every line after the first starts right after a newline, so counting both is enough
+    return markdown_block.startswith(prefix) and markdown_block.count('\n') == markdown_block.count('\n' + prefix)
+
+def _is_ordered_list(markdown_block: str) -> bool:
+    # TODO: at the end of the project update the first number to 0 to allow 0. as a start for a ordered list -> update the related html generation code
+    if extract_number(markdown_block) != 1:
+        return False  # checked before splitting, so paragraphs are rejected on their first characters
+    for expected_number, line in enumerate(markdown_block.split('\n'), start=1):
+        if extract_number(line) != expected_number:
+            return False  # if no number, or it doesnt go up by one each line, then it is not a valid ordered list
+    return True
+
 def block_to_block_type(markdown_block: str) -> BlockType:
-    lines = markdown_block.split('\n')
+    """
+    Classifies a block dispatching on its first character, only the check that can match is run.
 
-    is_ordered_list = True
-    # TODO: at the end of the project update this value to -1 to allow 0. as a start for a ordered list -> update the related html generation code
-    previous_num = 0
-    for line in lines:
-        number: int | None = extract_number(line)
-        if number is None or number < previous_num or number != (previous_num + 1):
-            is_ordered_list = False
-            break  # if no number, list doesnt start with 0, or doesnt go up by one each line, then it is not a valid ordered list
-        previous_num += 1
-    if re.findall(r'^#{1,6} .*', lines[0]):
-        return BlockType.HEADING
-    elif len(lines) > 1 and markdown_block.startswith('```') and markdown_block.endswith('```'):
-        return BlockType.CODE
-    elif all([line.startswith('>') for line in lines]):
-        return BlockType.QUOTE
-    elif all([line.startswith('- ') for line in lines]):
-        return BlockType.UNORDERED_LIST
-    elif is_ordered_list:
+    Headings and code fences are recognized from the first and last characters of the block,
+    the other checks stop at the first line that does not fit.
+    """
+    first_char = markdown_block[:1]
+    if first_char == '#':
+        return BlockType.HEADING if HEADING_PATTERN.match(markdown_block) else BlockType.PARAGRAPH
+    if first_char == '`':
+        is_code = '\n' in markdown_block and markdown_block.startswith('```') and markdown_block.endswith('```')
+        return BlockType.CODE if is_code else BlockType.PARAGRAPH
+    if first_char == '>':
+        return BlockType.QUOTE if _all_lines_start_with(markdown_block, '>') else BlockType.PARAGRAPH
+    if first_char == '-':
+        return BlockType.UNORDERED_LIST if _all_lines_start_with(markdown_block, '- ') else BlockType.PARAGRAPH
+    if _is_ordered_list(markdown_block):
         return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
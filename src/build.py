@@ -0,0 +1,433 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import hashlib
+import json
+import os
+
+from block_cache import BlockCache
+from dependency_graph import DependencyGraph, resolve_link_target
+from markdown_html import render_blocks, RenderedBlocks
+from templates import CompiledTemplate, get_template
+
+
+MANIFEST_VERSION = 3
+MARKDOWN_EXTENSION = '.md'
+BATCHES_PER_WORKER = 4
+ASYNC_IO_CONCURRENCY = 16
+ASYNC_QUEUE_SIZE = 64
+
+# (output hash, whether the output was written, urls of the links and images) of a rendered page
+PageResult = tuple[str, bool, list[str]]
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def find_markdown_files(content_dir: str) -> list[str]:
+    """Returns the paths of the markdown files under content_dir, relative to it and sorted."""
+    sources = []
+    for directory, _, file_names in os.walk(content_dir):
+        for file_name in file_names:
+            if file_name.endswith(MARKDOWN_EXTENSION):
+                sources.append(os.path.relpath(os.path.join(directory, file_name), content_dir))
+    sources.sort()
+    return sources
+
+def output_path_for(source: str) -> str:
+    return source[:-len(MARKDOWN_EXTENSION)] + '.html'
+
+def page_paths(content_dir: str, output_dir: str, source: str) -> tuple[str, str, str]:
+    """Returns the (source_path, output_path, fallback_title) render_pages expects for a source of content_dir."""
+    fallback_title = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(content_dir, source), os.path.join(output_dir, output_path_for(source)), fallback_title
+
+def fill_template(template: CompiledTemplate, title: str, content: str) -> str:
+    return template.render({'Title': title, 'Content': content})
+
+def fill_rendered_page(template: CompiledTemplate, rendered: RenderedBlocks, fallback_title: str = '') -> str:
+    # the title comes from the pass over the blocks that rendered them
+    title = rendered.title if rendered.title is not None else fallback_title
+    return fill_template(template, title, rendered.to_html())
+
+def read_source(source_path: str) -> str:
+    with open(source_path, 'rb') as file:
+        return file.read().decode('utf-8')
+
+def _write_atomically(output_path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # renamed over the output once complete, readers see either the old page or the new one
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, 'wb') as file:
+            file.write(data)
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        # a failed or interrupted write must not leave a partial file in the output directory
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+def write_if_changed(output_path: str, html: str, previous_hash: str | None = None) -> tuple[str, bool]:
+    """
+    Writes html to output_path unless previous_hash, the hash of the html the last build wrote there,
+    matches the new one and the file still exists. Unchanged pages keep their mtime.
+
+    :return: the hash of the html and whether the file was written
+    """
+    data = html.encode('utf-8')
+    output_hash = hash_bytes(data)
+    if output_hash == previous_hash and os.path.exists(output_path):
+        return output_hash, False
+    _write_atomically(output_path, data)
+    return output_hash, True
+
+def render_pages(
+        pages: list[tuple[str, str, str]], template: CompiledTemplate, block_cache: BlockCache | None = None,
+        output_hashes: dict[str, str] | None = None, rendered_pages: list[RenderedBlocks] | None = None) -> list[PageResult]:
+    """
+    Renders a batch of pages and writes their html, this is the unit of work sent to the build workers.
+
+    :param pages: (source_path, output_path, fallback_title) of every page of the batch
+    :param template: the compiled page template
+    :param block_cache: cache of rendered block fragments, optional
+    :param output_hashes: hashes of the html the last build wrote, by output path, pages rendering to the same html are not written
+    :param rendered_pages: list the rendered blocks of every page are appended to, in the order of pages, optional
+    :return: the output hash of every page, whether it was written, see write_if_changed, and its link urls
+    """
+    output_hashes = output_hashes or {}
+    results = []
+    for source_path, output_path, fallback_title in pages:
+        rendered = render_blocks(read_source(source_path), None, block_cache)
+        html = fill_rendered_page(template, rendered, fallback_title)
+        output_hash, written = write_if_changed(output_path, html, output_hashes.get(output_path))
+        results.append((output_hash, written, rendered.urls))
+        if rendered_pages is not None:
+            rendered_pages.append(rendered)
+    return results
+
+def split_batches(items: list, batch_count: int) -> list[list]:
+    """Splits items in at most batch_count contiguous batches of nearly the same size."""
+    batch_size = max(-(-len(items) // max(batch_count, 1)), 1)
+    return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+_worker_block_cache: BlockCache | None = None
+
+def _init_render_worker(block_cache_path: str | None, block_cache_entries: int) -> None:
+    global _worker_block_cache
+    if not block_cache_entries:
+        return
+    if block_cache_path is None:
+        _worker_block_cache = BlockCache(block_cache_entries)
+    else:
+        _worker_block_cache = BlockCache.load(block_cache_path, block_cache_entries)
+        _worker_block_cache.path = None  # only the main process writes the store
+    _worker_block_cache.record_added = True
+
+def _take_worker_cache_changes() -> tuple[dict[str, str], int, int] | None:
+    block_cache = _worker_block_cache
+    if block_cache is None:
+        return None
+    hits, misses = block_cache.hits, block_cache.misses
+    block_cache.hits = block_cache.misses = 0
+    return block_cache.take_added(), hits, misses
+
+def _render_worker_batch(
+        pages: list[tuple[str, str, str]], template: CompiledTemplate,
+        output_hashes: dict[str, str]) -> tuple[list[PageResult], tuple[dict[str, str], int, int] | None]:
+    results = render_pages(pages, template, _worker_block_cache, output_hashes)
+    return results, _take_worker_cache_changes()
+
+def _render_worker_page(
+        markdown: str, template: CompiledTemplate, fallback_title: str) -> tuple[str, list[str], tuple[dict[str, str], int, int] | None]:
+    rendered = render_blocks(markdown, None, _worker_block_cache)
+    return fill_rendered_page(template, rendered, fallback_title), rendered.urls, _take_worker_cache_changes()
+
+def render_in_workers(
+        pages: list[tuple[str, str, str]], template: CompiledTemplate, workers: int, block_cache: BlockCache | None = None,
+        output_hashes: dict[str, str] | None = None) -> list[PageResult]:
+    """
+    Spreads the pages over a pool of worker processes, in batches so that every task carries many paths.
+
+    Each page is written by exactly one worker and its html only depends on its source and the template,
+    so the output does not depend on the number of workers or on the order batches complete in.
+    Every worker starts from the stored block cache and sends the fragments it rendered back to block_cache.
+
+    :return: the results of render_pages, in the order of pages
+    """
+    output_hashes = output_hashes or {}
+    if workers <= 1 or len(pages) <= 1:
+        return render_pages(pages, template, block_cache, output_hashes)
+    batches = split_batches(pages, workers * BATCHES_PER_WORKER)
+    initargs = (block_cache.path, block_cache.max_entries) if block_cache is not None else (None, 0)
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches)), initializer=_init_render_worker, initargs=initargs) as executor:
+        futures = []
+        for batch in batches:
+            batch_hashes = {output_path: output_hashes[output_path] for _, output_path, _ in batch if output_path in output_hashes}
+            futures.append(executor.submit(_render_worker_batch, batch, template, batch_hashes))
+        for future in futures:
+            batch_results, changes = future.result()
+            results.extend(batch_results)
+            if changes is not None:
+                block_cache.merge(*changes)
+    return results
+
+async def _render_pipeline(
+        pages: list[tuple[str, str, str]], template: CompiledTemplate, workers: int, block_cache: BlockCache | None,
+        output_hashes: dict[str, str], results: list[PageResult | None],
+        io_executor: Executor, io_concurrency: int, render_executor: Executor | None, queue_size: int) -> None:
+    loop = asyncio.get_running_loop()
+    # items carry the index of their page, the results are stored in the order of pages
+    sources: asyncio.Queue[tuple[int, str, str, str] | None] = asyncio.Queue(queue_size)
+    outputs: asyncio.Queue[tuple[int, str, str, list[str]] | None] = asyncio.Queue(queue_size)
+    pending_pages = enumerate(pages)  # shared by the readers, every page is read once
+
+    async def read() -> None:
+        for index, (source_path, output_path, fallback_title) in pending_pages:
+            markdown = await loop.run_in_executor(io_executor, read_source, source_path)
+            await sources.put((index, markdown, output_path, fallback_title))
+
+    async def render() -> None:
+        while (item := await sources.get()) is not None:
+            index, markdown, output_path, fallback_title = item
+            if render_executor is None:
+                # the parsing holds the gil anyway, a thread would only add a hand-off per page
+                rendered = render_blocks(markdown, None, block_cache)
+                html, urls = fill_rendered_page(template, rendered, fallback_title), rendered.urls
+            else:
+                html, urls, changes = await loop.run_in_executor(
+                    render_executor, _render_worker_page, markdown, template, fallback_title
+                )
+                if changes is not None:
+                    block_cache.merge(*changes)
+            await outputs.put((index, output_path, html, urls))
+
+    async def write() -> None:
+        while (item := await outputs.get()) is not None:
+            index, output_path, html, urls = item
+            output_hash, written = await loop.run_in_executor(
+                io_executor, write_if_changed, output_path, html, output_hashes.get(output_path)
+            )
+            results[index] = (output_hash, written, urls)
+
+    async def close_stages(readers: list[asyncio.Task], renderers: list[asyncio.Task], writer_count: int) -> None:
+        await asyncio.gather(*readers)
+        for _ in renderers:
+            await sources.put(None)
+        await asyncio.gather(*renderers)
+        for _ in range(writer_count):
+            await outputs.put(None)
+
+    async with asyncio.TaskGroup() as group:
+        for _ in range(io_concurrency):
+            group.create_task(write())
+        # two pages per worker process in flight, one rendering while the other one is sent or received
+        renderers = [group.create_task(render()) for _ in range(workers * 2 if render_executor is not None else 1)]
+        readers = [group.create_task(read()) for _ in range(io_concurrency)]
+        group.create_task(close_stages(readers, renderers, io_concurrency))
+
+def render_async(
+        pages: list[tuple[str, str, str]], template: CompiledTemplate, workers: int = 1, block_cache: BlockCache | None = None,
+        output_hashes: dict[str, str] | None = None,
+        io_concurrency: int = ASYNC_IO_CONCURRENCY, queue_size: int = ASYNC_QUEUE_SIZE) -> list[PageResult]:
+    """
+    Renders the pages with an asyncio pipeline overlapping the reads of the sources, the rendering and the writes.
+
+    Reads and writes run in a pool of io_concurrency threads, so slow file systems are kept busy with many
+    requests at once. Pages go from stage to stage through queues of queue_size items, which bounds the
+    sources and html held in memory. With one worker the pages are rendered by the event loop thread while
+    the I/O threads wait on the file system, with more in worker processes like render_in_workers.
+
+    :return: the results of render_pages, in the order of pages
+    """
+    if not pages:
+        return []
+    results: list[PageResult | None] = [None] * len(pages)
+    render_executor = None
+    if workers > 1:
+        initargs = (block_cache.path, block_cache.max_entries) if block_cache is not None else (None, 0)
+        render_executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker, initargs=initargs)
+    with ThreadPoolExecutor(max_workers=io_concurrency) as io_executor:
+        try:
+            asyncio.run(_render_pipeline(
+                pages, template, workers, block_cache, output_hashes or {}, results,
+                io_executor, io_concurrency, render_executor, queue_size
+            ))
+        except ExceptionGroup as group:
+            raise group.exceptions[0] from None  # raise what the sequential build raises, like the ValueError of a bad page
+        finally:
+            if render_executor is not None:
+                render_executor.shutdown()
+    return results
+
+
+class BuildManifest:
+    """
+    Content hashes of the last build, stored as json between builds.
+
+    Every page entry keeps the hash of its markdown source, along with the size and mtime the source had
+    when it was hashed so unchanged files are not read again, and the hash of the html written to its output.
+    The templates, includes and link targets the pages depend on are kept in the dependency graph.
+    """
+    def __init__(self, path: str | None, pages: dict[str, dict] | None = None, graph: DependencyGraph | None = None) -> None:
+        self.path: str | None = path
+        self.pages: dict[str, dict] = pages if pages is not None else {}
+        self.graph: DependencyGraph = graph if graph is not None else DependencyGraph()
+
+    @classmethod
+    def load(cls, path: str | None) -> "BuildManifest":
+        """
+        Returns the manifest stored in path, or an empty one, which makes a full build, when there is none
+        or it can't be used: written by another version, or truncated or corrupt, like after a crash during save.
+        """
+        if path is None or not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path) as file:
+                data = json.load(file)
+            if data.get('version') != MANIFEST_VERSION:
+                return cls(path)  # written by another version, start from a full build
+            pages, graph = data['pages'], DependencyGraph.from_dict(data['graph'])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return cls(path)
+        if not all(isinstance(entries, dict) for entries in (pages, graph.pages, graph.templates)):
+            return cls(path)
+        return cls(path, pages, graph)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, 'w') as file:
+                data = {'version': MANIFEST_VERSION, 'pages': self.pages, 'graph': self.graph.to_dict()}
+                json.dump(data, file, indent=1, sort_keys=True)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            # a failed or interrupted save must not leave a partial file behind
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def source_hash(self, source: str, source_path: str, stat: os.stat_result) -> str:
+        """Returns the hash of a source file, reusing the stored one when its size and mtime did not change."""
+        entry = self.pages.get(source)
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['source_hash']
+        with open(source_path, 'rb') as file:
+            return hash_bytes(file.read())
+
+
+class BuildReport:
+    """
+    Pages of a build: rendered are split between written and unchanged, the pages that rendered
+    to the same html as the last build and were not written again.
+    """
+    def __init__(self) -> None:
+        self.rendered: list[str] = []
+        self.skipped: list[str] = []
+        self.removed: list[str] = []
+        self.written: list[str] = []
+        self.unchanged: list[str] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"BuildReport(rendered={len(self.rendered)}, skipped={len(self.skipped)}, removed={len(self.removed)}, "
+            f"written={len(self.written)}, unchanged={len(self.unchanged)})"
+        )
+
+
+def build_site(
+        content_dir: str, output_dir: str, template_path: str,
+        manifest_path: str | None = None, workers: int = 1, block_cache: BlockCache | None = None,
+        async_io: bool = False, rendered_pages: dict[str, RenderedBlocks] | None = None) -> BuildReport:
+    """
+    Renders every markdown file of content_dir into an html file of output_dir.
+
+    Pages whose markdown hash matches the one stored in the manifest, and whose output still exists,
+    are skipped unless the dependency graph of the manifest reaches them from a template or include
+    whose content changed. The link targets of the pages are recorded in the graph, but adding or removing
+    one doesn't change the html of the pages linking to it and doesn't render them. Rendered pages are only
+    written when their html hash differs from the one stored in the manifest, atomically.
+    Outputs of sources deleted since the last build are removed.
+
+    :param content_dir: directory holding the markdown sources
+    :param output_dir: directory the html pages are written to
+    :param template_path: html template with the {{ Title }} and {{ Content }} placeholders and {{> name }} includes
+    :param manifest_path: where the manifest is kept between builds, without one every page is rendered
+    :param workers: number of processes rendering the pages, 1 renders them in the calling process
+    :param block_cache: cache of rendered block fragments, saved at the end of the build when it has a path
+    :param async_io: render through the asyncio pipeline of render_async, overlapping reads, rendering and writes
+    :param rendered_pages: filled with the rendered blocks of every rendered page, by source, like a watch session
+        keeps them to diff the next saves against. The pages are then rendered in the calling process,
+        whatever workers and async_io say.
+    :return: the report of rendered, skipped and removed pages, and of the written ones
+    """
+    manifest = BuildManifest.load(manifest_path)
+    graph = manifest.graph
+    report = BuildReport()
+    template = get_template(template_path)
+
+    sources = find_markdown_files(content_dir)
+    current_sources = set(sources)
+
+    affected = graph.affected_pages(graph.changed_template_files(template))
+    pending: list[tuple[str, str, str]] = []
+    pending_entries: dict[str, dict] = {}
+    output_hashes: dict[str, str] = {}
+    for source in sources:
+        page = page_paths(content_dir, output_dir, source)
+        source_path, output_path, _ = page
+        stat = os.stat(source_path)
+        source_hash = manifest.source_hash(source, source_path, stat)
+        entry = manifest.pages.get(source)
+        dependencies = graph.pages.get(source)
+        if (entry is not None and entry['source_hash'] == source_hash and source not in affected
+                and dependencies is not None and dependencies['template'] == template_path
+                and os.path.exists(output_path)):
+            entry['size'] = stat.st_size  # touched but unchanged, next build can trust the stat again
+            entry['mtime_ns'] = stat.st_mtime_ns
+            report.skipped.append(source)
+            continue
+
+        pending.append(page)
+        if entry is not None and 'output_hash' in entry:
+            output_hashes[output_path] = entry['output_hash']
+        pending_entries[source] = {
+            'source_hash': source_hash,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    if rendered_pages is not None:
+        rendered: list[RenderedBlocks] = []
+        results = render_pages(pending, template.compiled, block_cache, output_hashes, rendered)
+        rendered_pages.update(zip(pending_entries, rendered))
+    elif async_io:
+        results = render_async(pending, template.compiled, workers, block_cache, output_hashes)
+    else:
+        results = render_in_workers(pending, template.compiled, workers, block_cache, output_hashes)
+    for source, (output_hash, written, urls) in zip(pending_entries, results):
+        pending_entries[source]['output_hash'] = output_hash
+        (report.written if written else report.unchanged).append(source)
+        links = (resolve_link_target(source, url) for url in urls)
+        graph.set_page(source, template_path, (link for link in links if link is not None))
+    manifest.pages.update(pending_entries)
+    report.rendered.extend(pending_entries)
+
+    for source in sorted(set(manifest.pages) - current_sources):
+        output_path = os.path.join(output_dir, output_path_for(source))
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        del manifest.pages[source]
+        graph.remove_page(source)
+        report.removed.append(source)
+    graph.set_template(template)
+
+    manifest.save()
+    if block_cache is not None:
+        block_cache.save()
+    return report
@@ -0,0 +1,103 @@
+from collections.abc import Iterable
+import os
+import posixpath
+
+from templates import LoadedTemplate
+
+
+# url schemes of links leaving the site, their targets are never tracked
+EXTERNAL_URL_PREFIXES = ('http:', 'https:', 'mailto:', 'tel:', 'data:', 'ftp:', '//', '#')
+
+
+def resolve_link_target(page: str, url: str) -> str | None:
+    """
+    Returns the file of the content directory a link or image of page points to, or None for external urls.
+
+    Absolute urls start from the content directory, relative ones from the directory of the page.
+    Html pages resolve to their markdown source and directory urls to their index.md.
+
+    :param page: path of the linking source, relative to the content directory
+    :param url: the url of the link or image
+    """
+    if url.startswith(EXTERNAL_URL_PREFIXES):
+        return None
+    path = url.split('#', 1)[0].split('?', 1)[0]
+    if not path:
+        return None
+    if path.startswith('/'):
+        target = path.lstrip('/')
+    else:
+        target = posixpath.join(posixpath.dirname(page.replace(os.sep, '/')), path)
+    if path.endswith('/'):
+        target += 'index.md'
+    target = posixpath.normpath(target)
+    if target == '..' or target.startswith('../'):
+        return None  # outside of the content directory
+    if target.endswith('.html'):
+        target = target[:-len('.html')] + '.md'
+    return target.replace('/', os.sep)
+
+
+class DependencyGraph:
+    """
+    What every page of the last build depended on, stored in the build manifest.
+
+    The html of a page depends on the content of its template and of the files the template includes.
+    Its link and image targets are recorded too, but the html of a page doesn't depend on them, so adding
+    or removing a target never makes the pages pointing to it rebuild.
+    The edges are kept in the direction they are found in, from a page or a template to its dependencies,
+    and reversed when the affected pages are computed.
+    """
+    def __init__(self, pages: dict[str, dict] | None = None, templates: dict[str, dict] | None = None) -> None:
+        # page -> {'template': template path, 'links': [link targets]}
+        self.pages: dict[str, dict] = pages if pages is not None else {}
+        # template or include path -> {'hash': content hash, 'includes': [included paths]}
+        self.templates: dict[str, dict] = templates if templates is not None else {}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DependencyGraph":
+        return cls(data['pages'], data['templates'])
+
+    def to_dict(self) -> dict:
+        return {'pages': self.pages, 'templates': self.templates}
+
+    def set_page(self, page: str, template_path: str, links: Iterable[str]) -> None:
+        self.pages[page] = {'template': template_path, 'links': sorted(set(links))}
+
+    def remove_page(self, page: str) -> None:
+        self.pages.pop(page, None)
+
+    def set_template(self, template: LoadedTemplate) -> None:
+        """Records the files of the template the pages are rendered with, a build renders every page with one template."""
+        self.templates = {
+            path: {'hash': file_hash, 'includes': template.includes[path]} for path, file_hash in template.files.items()
+        }
+
+    def changed_template_files(self, template: LoadedTemplate) -> set[str]:
+        """Returns the files of template whose content differs from the one recorded, or that were not recorded."""
+        return {
+            path for path, file_hash in template.files.items()
+            if self.templates.get(path, {}).get('hash') != file_hash
+        }
+
+    def affected_pages(self, changed_files: Iterable[str] = ()) -> set[str]:
+        """
+        Returns the pages to rebuild when changed_files, templates or included files, changed content.
+
+        The changed files are followed up the reversed include edges to every template using them,
+        then to the pages rendered with those templates.
+        """
+        included_by: dict[str, list[str]] = {}
+        for path, entry in self.templates.items():
+            for include in entry['includes']:
+                included_by.setdefault(include, []).append(path)
+        reached = set()
+        pending = list(changed_files)
+        while pending:
+            path = pending.pop()
+            if path not in reached:
+                reached.add(path)
+                pending.extend(included_by.get(path, ()))
+
+        return {page for page, entry in self.pages.items() if entry['template'] in reached}
+
@@ -1,4 +1,67 @@
+from collections.abc import Iterator
+from types import MappingProxyType
+from typing import TextIO
+
+
+PROPS_TABLE_MAX_SIZE = 4096
+
+# (copy of the props the string was serialized from, attribute string), shared by the nodes with the same props
+PropsEntry = tuple[dict[str, str], str]
+
+# entries shared by every node, keyed by the items of their props, in two generations:
+# the recent one takes the sets used since it was started, and becomes the old one once it holds
+# PROPS_TABLE_MAX_SIZE of them. A set found in the old generation moves back to the recent one,
+# so the sets in use stay shared and the others are dropped with the old generation, an LRU by halves.
+_props_tables: list[dict[tuple[tuple[str, str], ...], PropsEntry]] = [{}, {}]
+# hashes of the sets seen once since the table was first full, see serialize_props
+_props_seen_once: set[int] = set()
+
+
+def _props_entry(props: dict[str, str], props_items: tuple[tuple[str, str], ...]) -> PropsEntry:
+    return dict(props), ''.join([f' {key}="{val}"' for key, val in props_items if key and val])
+
+def serialize_props(props: dict[str, str]) -> PropsEntry:
+    """
+    Returns the table entry of the props, shared by every node with the same attribute set while it is in use.
+
+    Once the table was full, a set only enters it the second time it is seen, so the urls used once,
+    like most links of a large site, don't push the shared sets out.
+    """
+    props_items = tuple(props.items())
+    recent = _props_tables[0]
+    try:
+        entry = recent.get(props_items)
+    except TypeError:  # unhashable values, not worth sharing
+        return _props_entry(props, props_items)
+    if entry is None:
+        entry = _props_tables[1].get(props_items)
+        if entry is None:
+            entry = _props_entry(props, props_items)
+            if _props_tables[1]:
+                props_hash = hash(props_items)
+                if props_hash not in _props_seen_once:
+                    if len(_props_seen_once) >= PROPS_TABLE_MAX_SIZE * 4:
+                        _props_seen_once.clear()
+                    _props_seen_once.add(props_hash)
+                    return entry
+        if len(recent) >= PROPS_TABLE_MAX_SIZE:
+            _props_tables[1] = recent
+            recent = _props_tables[0] = {}
+        recent[props_items] = entry
+    return entry
+
+def clear_props_table() -> None:
+    _props_tables[:] = [{}, {}]
+    _props_seen_once.clear()
+
+def props_table_size() -> int:
+    """Number of attribute sets shared, at most twice PROPS_TABLE_MAX_SIZE."""
+    return len(_props_tables[0]) + len(_props_tables[1])
+
+
 class HTMLNode:
+    __slots__ = ('tag', 'value', 'children', 'props', '_props_cache')
+
     def __init__(
             self, tag: str | None = None,
             value: str | None = None,
@@ -17,15 +80,35 @@ class HTMLNode:
         self.value: str = value
         self.children: list["HTMLNode"] = children
         self.props: dict[str, str] = props
+        self._props_cache: PropsEntry | None = None
 
     def to_html(self) -> str:
         raise NotImplementedError()
 
+    def iter_html(self) -> Iterator[str]:
+        """Yields the html of the node in chunks, joining them gives the same string as to_html."""
+        yield self.to_html()
+
+    def write_html(self, stream: TextIO) -> None:
+        """Writes the html of the node to a file-like object chunk by chunk, without building the whole string."""
+        write = stream.write
+        for chunk in self.iter_html():
+            write(chunk)
+
     def props_to_html(self) -> str:
-        if not self.props:
+        """
+        Returns the props as an html attribute string, cached on the node with a copy of the props it was built from.
+
+        The copy is compared with the current props on every call, so replacing or mutating props
+        invalidates the cache without any bookkeeping on assignment.
+        """
+        props = self.props
+        if not props:
             return ""
-        attrs_string = ''.join([f' {key}="{val}"' for key, val in self.props.items() if key and val])
-        return attrs_string
+        entry = self._props_cache
+        if entry is None or entry[0] != props:
+            entry = self._props_cache = serialize_props(props)
+        return entry[1]
 
     def __eq__(self, other: "HTMLNode") -> bool:
         tag_is_equal = self.tag == other.tag
@@ -39,11 +122,28 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str | None, value: str, props: dict[str, str] | None = None) -> None:
         if tag == '':
             tag = None
         super().__init__(tag, value, None, props)
 
+    @classmethod
+    def trusted(cls, tag: str | None, value: str, props: dict[str, str] | None = None) -> "LeafNode":
+        """
+        Builds a leaf without validating the arguments, tag must already be None instead of ''.
+
+        Meant for internal paths, like text_node_to_html_node, that already produce values of the right types.
+        """
+        node = object.__new__(cls)
+        node.tag = tag
+        node.value = value
+        node.children = None
+        node.props = props
+        node._props_cache = None
+        return node
+
     def to_html(self) -> str:
         if self.value is None:
             raise ValueError("value can't be empty. All leaf nodes must have a value.")
@@ -55,20 +155,81 @@ class LeafNode(HTMLNode):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
+class FrozenLeafNode(LeafNode):
+    """
+    Immutable leaf that renders its html once, so one instance can be shared by any number of trees.
+
+    Its props are a read-only copy of the given dict, and setting any attribute raises AttributeError.
+    """
+    __slots__ = ('_html',)
+
+    def __init__(self, tag: str | None, value: str, props: dict[str, str] | None = None) -> None:
+        super().__init__(tag, value, props)
+        self._freeze()
+
+    @classmethod
+    def trusted(cls, tag: str | None, value: str, props: dict[str, str] | None = None) -> "FrozenLeafNode":
+        node = super().trusted(tag, value, props)
+        node._freeze()
+        return node
+
+    def _freeze(self) -> None:
+        if self.props is not None:
+            object.__setattr__(self, 'props', MappingProxyType(dict(self.props)))
+        object.__setattr__(self, '_html', LeafNode.to_html(self))
+
+    def __setattr__(self, name: str, value) -> None:
+        if hasattr(self, '_html'):
+            raise AttributeError(f"{type(self).__name__} is immutable, can't set {name}")
+        object.__setattr__(self, name, value)
+
+    def to_html(self) -> str:
+        return self._html
+
+    def __repr__(self) -> str:
+        props = dict(self.props) if self.props is not None else None
+        return f"FrozenLeafNode({self.tag}, {self.value}, {props})"
+
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list[HTMLNode], props: dict[str, str] | None = None) -> None:
         super().__init__(tag, None, children, props)
 
     def to_html(self) -> str:
+        return ''.join(self.iter_html())
+
+    def iter_html(self) -> Iterator[str]:
+        """
+        Yields the html of the subtree walking it with an explicit stack instead of recursion,
+        so the nesting depth is not limited by the interpreter recursion limit.
+        """
+        self._check_renderable()
+        yield f"<{self.tag}>"
+        stack: list[tuple[str, Iterator[HTMLNode]]] = [(self.tag, iter(self.children))]
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                child_type = type(child)
+                if child_type is ParentNode:
+                    child._check_renderable()
+                    yield f"<{child.tag}>"
+                    stack.append((child.tag, iter(child.children)))
+                    break
+                if child_type is LeafNode or child_type is FrozenLeafNode:
+                    yield child.to_html()
+                else:
+                    yield from child.iter_html()
+            else:
+                stack.pop()
+                yield f"</{tag}>"
+
+    def _check_renderable(self) -> None:
         if not self.tag:
             raise ValueError('tag value cannot be None, empty or missing')
         if not self.children:
             raise ValueError('children value cannot be None, empty or missing')
-        tagged_content = f"<{self.tag}>"
-        for child in self.children:
-            tagged_content += child.to_html()
-        tagged_content += f"</{self.tag}>"
-        return tagged_content
 
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
@@ -1,14 +1,34 @@
 import re
+from collections.abc import Iterator
 
-from textnode import TextNode, TextType
+from markdown_patterns import IMAGE_PATTERN, LINK_PATTERN
+from textnode import ByteSpanStream, TextNode, TextSpanStream, TextType
 
 
 ALLOWED_DELIMITERS = {'**': TextType.BOLD, '*': TextType.ITALIC, '_': TextType.ITALIC, '```': TextType.CODE, '`': TextType.CODE}
+DELIMITER_LEVELS: tuple[tuple[str, TextType], ...] = tuple(ALLOWED_DELIMITERS.items())
+_LEVEL_BY_DELIMITER: dict[str, int] = {delimiter: level for level, (delimiter, _) in enumerate(DELIMITER_LEVELS)}
+
+# Images are matched over the whole text first, like split_nodes_image does before split_nodes_link runs,
+# so a link whose url holds the start of an image can't swallow it. Links and delimiters are then matched
+# by a single alternation in the text between the images, so a paragraph is scanned only once more.
+# The longer delimiters come first, the same way str.split consumes them from the left, and the leading
+# lookahead lets the regex engine skip plain text without trying every alternative at each position.
+INLINE_IMAGE_PATTERN = re.compile(r'(?P<image>!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\))')
+INLINE_TOKEN_PATTERN = re.compile(
+    r'(?=[\[*_`])(?:'
+    r'(?P<link>\[(?<!!\[)(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\))'
+    r'|(?P<delimiter>' + '|'.join(re.escape(delimiter) for delimiter in sorted(ALLOWED_DELIMITERS, key=len, reverse=True)) + r'))'
+)
+# The same patterns over utf-8 bytes: every syntax character is ascii and no byte of a multi-byte
+# sequence is, so they find the same tokens at the byte offsets of the characters.
+INLINE_IMAGE_BYTES_PATTERN = re.compile(INLINE_IMAGE_PATTERN.pattern.encode('ascii'))
+INLINE_TOKEN_BYTES_PATTERN = re.compile(INLINE_TOKEN_PATTERN.pattern.encode('ascii'))
+_LEVEL_BY_DELIMITER_BYTES: dict[bytes, int] = {delimiter.encode('ascii'): level for delimiter, level in _LEVEL_BY_DELIMITER.items()}
 
 def split_nodes_delimiter(old_nodes: list, delimiter: str, text_type: TextType) -> list[TextNode | None]:
     """
-    At the moment the function does not support nested inline elements.
-    TODO: Implement nested inline handling.
+    The function does not support nested inline elements, see nested_inline.parse_nested_inline for a parser that does.
 
     :param old_nodes:
     :param delimiter:
@@ -32,13 +52,13 @@ def split_nodes_delimiter(old_nodes: list, delimiter: str, text_type: TextType)
         nodes = []
 
         if len(node) == 1:
-            nodes.append(TextNode(node[0], old_node.text_type))
+            nodes.append(TextNode.trusted(node[0], old_node.text_type))
         elif (len(node) - 3) % 2 == 0:
             for i in range(0, len(node)):
                 if i % 2 == 0:
-                    nodes.append(TextNode(node[i], old_node.text_type))
+                    nodes.append(TextNode.trusted(node[i], old_node.text_type))
                 else:
-                    nodes.append(TextNode(node[i], text_type))
+                    nodes.append(TextNode.trusted(node[i], text_type))
         else:
             raise ValueError("Invalid node sequence length.")
         new_nodes.extend(nodes)
@@ -46,13 +66,11 @@ def split_nodes_delimiter(old_nodes: list, delimiter: str, text_type: TextType)
     return new_nodes
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
-    pattern: str = r'!\[([^\[\]]*)\]\(([^\(\)]*)\)'
-    result: list[tuple[str, str]] = re.findall(pattern, text)
+    result: list[tuple[str, str]] = IMAGE_PATTERN.findall(text)
     return result
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
-    pattern: str = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    result: list[tuple[str, str]] = re.findall(pattern, text)
+    result: list[tuple[str, str]] = LINK_PATTERN.findall(text)
     return result
 
 def process_split(old_nodes: list, node_type: str) -> list[TextNode]:
@@ -62,12 +80,10 @@ def process_split(old_nodes: list, node_type: str) -> list[TextNode]:
     match node_type:
         case "image":
             text_type = TextType.IMAGE
-            exception_msg = "invalid markdown, image section not closed"
-            extraction_func = extract_markdown_images
+            pattern = IMAGE_PATTERN
         case "link":
             text_type = TextType.LINK
-            exception_msg = "invalid markdown, link section not closed"
-            extraction_func = extract_markdown_links
+            pattern = LINK_PATTERN
         case _:
             raise ValueError("invalid node type")
 
@@ -78,23 +94,19 @@ def process_split(old_nodes: list, node_type: str) -> list[TextNode]:
             new_nodes.append(old_node)
             continue
 
+        # the match offsets delimit the sections, so the text is walked once no matter how many matches it has
         original_text = old_node.text
-        extraction_tuple = extraction_func(original_text)
-        if not extraction_tuple:
+        section_start = 0
+        for match in pattern.finditer(original_text):
+            match_start, match_end = match.span()
+            if match_start > section_start:
+                new_nodes.append(TextNode.trusted(original_text[section_start:match_start], old_node.text_type))
+            new_nodes.append(TextNode.trusted(match.group(1), text_type, match.group(2)))
+            section_start = match_end
+        if section_start == 0:
             new_nodes.append(old_node)
-            continue
-
-        for extraction_alt, extraction_link in extraction_tuple:
-            split_pattern = f'{"!" if node_type == "image" else ""}[{extraction_alt}]({extraction_link})'
-            sections = original_text.split(split_pattern, 1)
-            if len(sections) != 2:
-                raise ValueError(exception_msg)
-            if sections[0]:
-                new_nodes.append(TextNode(sections[0], old_node.text_type))
-            new_nodes.append(TextNode(extraction_alt, text_type, extraction_link))
-            original_text = sections[1]
-        if original_text:
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
+        elif section_start < len(original_text):
+            new_nodes.append(TextNode.trusted(original_text[section_start:], TextType.TEXT))
 
     return new_nodes
 
@@ -104,22 +116,152 @@ def split_nodes_image(old_nodes: list) -> list[TextNode]:
 def split_nodes_link(old_nodes: list) -> list[TextNode]:
     return process_split(old_nodes, "link")
 
+def _split_delimited_range(
+        start: int, end: int, tokens: list[tuple[int, int, int]],
+        spans: list[tuple[TextType, int, int, str | None]], error_level: int) -> int:
+    """
+    Splits text[start:end] on the delimiter tokens found inside of it.
+
+    The range is split on the highest priority delimiter present (the first one in ALLOWED_DELIMITERS),
+    the delimited sections become spans of that delimiter type and every section in between is split
+    again on the remaining delimiters, which is what chaining split_nodes_delimiter calls does.
+
+    :param start: first index of the range inside the scanned text
+    :param end: index right after the end of the range
+    :param tokens: (start, end, level) of every delimiter inside the range, in text order
+    :param spans: output list the produced spans get appended to
+    :param error_level: lowest delimiter level that had an odd count so far
+    :return: the updated error level
+    """
+    if not tokens:
+        spans.append((TextType.TEXT, start, end, None))
+        return error_level
+
+    level = min(token[2] for token in tokens)
+    if sum(1 for token in tokens if token[2] == level) % 2 != 0:
+        return min(error_level, level)
+
+    text_type = DELIMITER_LEVELS[level][1]
+    section_start = start
+    section_tokens = []
+    is_delimited = False
+    for token_start, token_end, token_level in tokens:
+        if token_level != level:
+            if not is_delimited:
+                section_tokens.append((token_start, token_end, token_level))
+            continue
+        if is_delimited:
+            spans.append((text_type, section_start, token_start, None))
+        else:
+            error_level = _split_delimited_range(section_start, token_start, section_tokens, spans, error_level)
+            section_tokens = []
+        section_start = token_end
+        is_delimited = not is_delimited
+    return _split_delimited_range(section_start, end, section_tokens, spans, error_level)
+
+def tokenize_inline(text: str) -> list[tuple[TextType, int, int, str | None]]:
+    """
+    Scans the text once from left to right and returns its inline spans.
+
+    Every span is a (text_type, start, end, url) tuple where text[start:end] is the span text,
+    the result matches the TextNode stream produced by chaining split_nodes_image, split_nodes_link
+    and split_nodes_delimiter (in ALLOWED_DELIMITERS order), errors included: images are found over
+    the whole text before the links, as split_nodes_image does.
+
+    :param text: markdown text of a single block
+    :return: list of (text_type, start, end, url) tuples
+    """
+    spans: list[tuple[TextType, int, int, str | None]] = []
+    _tokenize_into(text, spans)
+    return spans
+
+def text_to_span_stream(text: str) -> TextSpanStream:
+    """Returns the spans of tokenize_inline as a columnar TextSpanStream, without building a list of them first."""
+    if not isinstance(text, str):
+        raise ValueError(f"provide text has invalid type, found {type(text)} instead of str")
+    stream = TextSpanStream(text)
+    _tokenize_into(text, stream)
+    return stream
+
+def bytes_to_span_stream(data: bytes | memoryview) -> ByteSpanStream:
+    """
+    Returns the spans of tokenize_inline for the utf-8 encoded text in data, as offsets into data.
+
+    Nothing of data is copied, not even the urls: a memoryview over a part of a larger buffer,
+    like a whole source file, can be parsed in place and written with ByteSpanStream.write_html.
+    """
+    stream = ByteSpanStream(data)
+    _tokenize_into(
+        data, stream, INLINE_IMAGE_BYTES_PATTERN, INLINE_TOKEN_BYTES_PATTERN, _LEVEL_BY_DELIMITER_BYTES, url_spans=True
+    )
+    return stream
+
+def _inline_matches(
+        text: str | bytes | memoryview, image_pattern: re.Pattern = INLINE_IMAGE_PATTERN,
+        pattern: re.Pattern = INLINE_TOKEN_PATTERN) -> Iterator[re.Match]:
+    """Yields the image, link and delimiter matches of the text in order, the links and delimiters only between images."""
+    position = 0
+    for image in image_pattern.finditer(text):
+        yield from pattern.finditer(text, position, image.start())
+        yield image
+        position = image.end()
+    yield from pattern.finditer(text, position)
+
+def _tokenize_into(
+        text: str | bytes | memoryview, spans: list[tuple[TextType, int, int, str | None]] | TextSpanStream,
+        image_pattern: re.Pattern = INLINE_IMAGE_PATTERN, pattern: re.Pattern = INLINE_TOKEN_PATTERN,
+        levels: dict = _LEVEL_BY_DELIMITER, url_spans: bool = False) -> None:
+    """
+    The scan of tokenize_inline, appending every span to spans, a list or a TextSpanStream.
+
+    With url_spans, the url of a link or image span is the (start, end) of the url in text instead of a copy of it.
+    """
+    error_level = len(DELIMITER_LEVELS)
+    tokens: list[tuple[int, int, int]] = []
+    segment_start = 0
+
+    for match in _inline_matches(text, image_pattern, pattern):
+        kind = match.lastgroup
+        match_start, match_end = match.span()
+        if kind == 'delimiter':
+            tokens.append((match_start, match_end, levels[match.group()]))
+            continue
+
+        if match_start > segment_start:
+            error_level = _split_delimited_range(segment_start, match_start, tokens, spans, error_level)
+        tokens = []
+        if kind == 'image':
+            url = match.span('image_url') if url_spans else match.group('image_url')
+            spans.append((TextType.IMAGE, match.start('image_alt'), match.end('image_alt'), url))
+        else:
+            url = match.span('link_url') if url_spans else match.group('link_url')
+            spans.append((TextType.LINK, match.start('link_text'), match.end('link_text'), url))
+        segment_start = match_end
+
+    if segment_start < len(text):
+        error_level = _split_delimited_range(segment_start, len(text), tokens, spans, error_level)
+
+    if error_level < len(DELIMITER_LEVELS):
+        delimiter = DELIMITER_LEVELS[error_level][0]
+        raise ValueError(f'provided old_nodes contains an invalid Markdown syntax, the number of "{delimiter}" delimiters is odd.')
+
+def extract_link_urls(text: str) -> list[str]:
+    """
+    Returns the urls of the images and links of the text, in order, found by the same scan as tokenize_inline
+    but without checking the delimiters, so it never raises.
+    """
+    urls = []
+    for match in _inline_matches(text):
+        kind = match.lastgroup
+        if kind == 'image':
+            urls.append(match.group('image_url'))
+        elif kind == 'link':
+            urls.append(match.group('link_url'))
+    return urls
+
 def text_to_text_nodes(text: str) -> list[TextNode]:
     if not isinstance(text, str):
         raise ValueError(f"provide text has invalid type, found {type(text)} instead of str")
     if not text:
         return []
-    nodes = [TextNode(text=text, text_type=TextType.TEXT)]
-    images_are_present = len(extract_markdown_images(text)) > 0
-    links_are_present = len(extract_markdown_links(text)) > 0
-
-    if images_are_present:
-        nodes = split_nodes_image(nodes)
-
-    if links_are_present:
-        nodes = split_nodes_link(nodes)
-    
-    for delimiter, text_type in ALLOWED_DELIMITERS.items():
-        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
-    
-    return nodes
+    return [TextNode.trusted(text[start:end], text_type, url) for text_type, start, end, url in tokenize_inline(text)]
@@ -0,0 +1,199 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+import cProfile
+import functools
+import inspect
+import os
+import sys
+import time
+
+import block_markdown
+import build
+import htmlnode
+import inline_markdown
+import markdown_html
+from markdown_html import markdown_to_html
+import textnode
+
+
+class StageStats:
+    """
+    Counters of one pipeline stage.
+
+    seconds, bytes and nodes are counted for the outermost calls only, a stage calling itself again,
+    like a LeafNode rendered inside a ParentNode.to_html, is not counted twice. calls counts every call.
+    bytes counts the characters of the text the stage read or, for to_html, wrote.
+    """
+    __slots__ = ('calls', 'seconds', 'bytes', 'nodes', '_depth')
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.seconds: float = 0.0
+        self.bytes: int = 0
+        self.nodes: int = 0
+        self._depth: int = 0
+
+    def as_dict(self) -> dict[str, int | float]:
+        return {'calls': self.calls, 'seconds': self.seconds, 'bytes': self.bytes, 'nodes': self.nodes}
+
+    def __repr__(self) -> str:
+        return f"StageStats(calls={self.calls}, seconds={self.seconds:.6f}, bytes={self.bytes}, nodes={self.nodes})"
+
+
+# (stage, owner, attribute, measure) of every instrumented function,
+# measure(first argument, result) returns (bytes, nodes), the first argument whether passed by position or keyword
+_TARGETS: list[tuple[str, object, str, Callable[[object, object], tuple[int, int]]]] = [
+    ('markdown_to_blocks', block_markdown, 'markdown_to_blocks', lambda markdown, blocks: (len(markdown), len(blocks))),
+    ('block_to_block_type', block_markdown, 'block_to_block_type', lambda block, _: (len(block), 0)),
+    ('text_to_text_nodes', inline_markdown, 'text_to_text_nodes', lambda text, nodes: (len(text), len(nodes))),
+    ('text_node_to_html_node', textnode, 'text_node_to_html_node', lambda text_node, _: (len(text_node.text), 1)),
+    ('to_html', htmlnode.LeafNode, 'to_html', lambda _, html: (len(html), 1)),
+    ('to_html', htmlnode.FrozenLeafNode, 'to_html', lambda _, html: (len(html), 1)),
+    ('to_html', htmlnode.ParentNode, 'to_html', lambda _, html: (len(html), 1)),
+]
+# the modules of the site generator importing stage functions by name, their bindings are patched too
+_IMPORTING_MODULES = (block_markdown, inline_markdown, textnode, markdown_html, build)
+STAGES: tuple[str, ...] = tuple(dict.fromkeys(stage for stage, _, _, _ in _TARGETS))
+
+_stats: dict[str, StageStats] = {stage: StageStats() for stage in STAGES}
+# (namespace owner, attribute, original) of every patched binding, empty while disabled
+_patched: list[tuple[object, str, Callable]] = []
+
+
+def _instrument(func: Callable, stats: StageStats, measure: Callable[[object, object], tuple[int, int]]) -> Callable:
+    perf_counter = time.perf_counter
+    first_parameter = next(iter(inspect.signature(func).parameters))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stats.calls += 1
+        stats._depth += 1
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            stats._depth -= 1
+            if not stats._depth:
+                stats.seconds += perf_counter() - start
+        if not stats._depth:
+            # the call succeeded, so its first argument was given one way or the other
+            size, nodes = measure(args[0] if args else kwargs[first_parameter], result)
+            stats.bytes += size
+            stats.nodes += nodes
+        return result
+    return wrapper
+
+def enable() -> None:
+    """
+    Replaces the stage functions by timing wrappers, in their own module and in the modules of the site generator
+    that imported them. Other modules holding a stage function, like tests or benchmarks, keep the original.
+
+    The original functions are put back by disable(), so instrumentation costs nothing while it is off.
+    """
+    if _patched:
+        return
+    for stage, owner, attribute, measure in _TARGETS:
+        original = vars(owner)[attribute]
+        wrapper = _instrument(original, _stats[stage], measure)
+        setattr(owner, attribute, wrapper)
+        _patched.append((owner, attribute, original))
+        if isinstance(owner, type):
+            continue  # methods are looked up on the class, the imported class objects see the wrapper
+        for module in _IMPORTING_MODULES:
+            if module is not owner and getattr(module, attribute, None) is original:
+                setattr(module, attribute, wrapper)
+                _patched.append((module, attribute, original))
+
+def disable() -> None:
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+
+def is_enabled() -> bool:
+    return bool(_patched)
+
+def reset() -> None:
+    for stage in STAGES:
+        _stats[stage] = StageStats()
+    # the wrappers hold the StageStats they update, rebind them to the new counters
+    if _patched:
+        disable()
+        enable()
+
+def stats() -> dict[str, StageStats]:
+    return dict(_stats)
+
+@contextmanager
+def instrumented() -> Iterator[dict[str, StageStats]]:
+    """Resets the counters and instruments the stages for the duration of the block."""
+    was_enabled = is_enabled()
+    reset()
+    enable()
+    try:
+        yield _stats
+    finally:
+        if not was_enabled:
+            disable()
+
+def format_stats(stage_stats: dict[str, StageStats] | None = None) -> str:
+    stage_stats = stage_stats if stage_stats is not None else _stats
+    lines = [f"{'stage':<24}{'calls':>10}{'seconds':>12}{'bytes':>14}{'nodes':>10}"]
+    for stage, entry in stage_stats.items():
+        lines.append(f"{stage:<24}{entry.calls:>10}{entry.seconds:>12.4f}{entry.bytes:>14}{entry.nodes:>10}")
+    return '\n'.join(lines)
+
+
+def _frame_name(frame, event: str, arg) -> str:
+    if event == 'c_call':
+        name = f"{getattr(arg, '__module__', None) or 'builtins'}.{getattr(arg, '__qualname__', repr(arg))}"
+    else:
+        code = frame.f_code
+        name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name.replace(';', ':')
+
+def collapsed_stacks(func: Callable, *args, **kwargs) -> dict[str, int]:
+    """
+    Runs func and returns the self time, in microseconds, of every call stack it went through,
+    keyed by the frame names of the stack joined by ';' as in the folded format of flamegraph tools.
+    """
+    totals: dict[str, float] = {}
+    # [stack key, start time, time spent in callees] of every active call
+    frames: list[list] = []
+    perf_counter = time.perf_counter
+
+    def profiler(frame, event, arg):
+        now = perf_counter()
+        if event == 'call' or event == 'c_call':
+            parent = frames[-1][0] + ';' if frames else ''
+            frames.append([parent + _frame_name(frame, event, arg), now, 0.0])
+        elif frames:
+            key, start, callees = frames.pop()
+            elapsed = now - start
+            totals[key] = totals.get(key, 0.0) + elapsed - callees
+            if frames:
+                frames[-1][2] += elapsed
+
+    sys.setprofile(profiler)
+    try:
+        func(*args, **kwargs)
+    finally:
+        sys.setprofile(None)
+    return {key: round(seconds * 1e6) for key, seconds in totals.items() if seconds > 0}
+
+def profile_page(markdown: str, output_path: str) -> None:
+    """
+    Profiles the rendering of one page. A path ending in .folded gets flamegraph compatible collapsed stacks,
+    any other path a cProfile dump readable with pstats or snakeviz.
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if output_path.endswith('.folded'):
+        stacks = collapsed_stacks(markdown_to_html, markdown)
+        with open(output_path, 'w') as file:
+            for key, microseconds in sorted(stacks.items()):
+                file.write(f"{key} {microseconds}\n")
+        return
+    profiler = cProfile.Profile()
+    profiler.runcall(markdown_to_html, markdown)
+    profiler.dump_stats(output_path)
@@ -1,14 +1,84 @@
-from textnode import TextNode, TextType
+import argparse
+import os
+import time
 
+from block_cache import BlockCache, DEFAULT_MAX_ENTRIES
+from build import build_site
+import instrumentation
+from watch import RebuildReport, SiteWatcher
 
-def main():
-    text = 'This is some anchor text'
-    text_type = TextType.LINK
-    url = 'https://www.boot.dev'
-    my_text_node: TextNode = TextNode(text, text_type, url)
-    print(my_text_node)
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert a directory of markdown documents into an html website.")
+    parser.add_argument('command', nargs='?', default='build', choices=['build', 'watch', 'profile'])
+    parser.add_argument('page', nargs='?', help="markdown source rendered by the profile command")
+    parser.add_argument('--content', default='content', help="directory holding the markdown sources")
+    parser.add_argument('--output', default='public', help="directory the html pages are written to")
+    parser.add_argument('--template', default='template.html', help="page template with {{ Title }} and {{ Content }}")
+    parser.add_argument('--manifest', default='.build/manifest.json', help="content hashes kept between builds")
+    parser.add_argument('--workers', type=int, default=1, help="processes rendering pages, 0 uses one per cpu")
+    parser.add_argument('--async-io', action='store_true', help="overlap reading, rendering and writing pages with asyncio")
+    parser.add_argument('--block-cache', default='.build/blocks.json', help="rendered block fragments kept between builds")
+    parser.add_argument('--block-cache-size', type=int, default=DEFAULT_MAX_ENTRIES, help="fragments kept in the block cache, 0 disables it")
+    parser.add_argument('--interval', type=float, default=0.1, help="seconds between two scans of the watch command")
+    parser.add_argument('--stats', action='store_true', help="print per-stage call counts and timings, renders in a single process")
+    parser.add_argument('--profile-output', default='.build/profile.pstats', help="profile of the page, collapsed stacks for a .folded path")
+    return parser.parse_args(argv)
+
+def profile(args: argparse.Namespace) -> None:
+    if args.page is None:
+        raise SystemExit("profile needs the path of a markdown page")
+    with open(args.page) as file:
+        markdown = file.read()
+    instrumentation.profile_page(markdown, args.profile_output)
+    print(f"profile of {args.page} written to {args.profile_output}")
+
+
+def print_rebuild(report: RebuildReport) -> None:
+    changes = [f"{len(report.rendered)} rendered"]
+    if report.removed:
+        changes.append(f"{len(report.removed)} removed")
+    print(f"rebuilt in {report.seconds * 1000:.1f}ms: {', '.join(changes)}")
+    for source, error in report.failed.items():
+        print(f"  {source} not rendered: {error}")
+
+def watch(args: argparse.Namespace, block_cache: BlockCache | None) -> None:
+    watcher = SiteWatcher(args.content, args.output, args.template, args.manifest, block_cache)
+    print_rebuild(watcher.start())
+    print(f"watching {args.content} and {args.template}, press ctrl-c to stop")
+    watcher.run(args.interval, print_rebuild)
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.command == 'profile':
+        profile(args)
+        return
+    if args.command == 'watch':
+        block_cache = BlockCache.load(args.block_cache, args.block_cache_size) if args.block_cache_size > 0 else None
+        watch(args, block_cache)
+        return
+    workers = args.workers or os.cpu_count() or 1
+    if args.stats:
+        workers = 1  # the counters live in the process doing the rendering
+        instrumentation.reset()
+        instrumentation.enable()
+    block_cache = BlockCache.load(args.block_cache, args.block_cache_size) if args.block_cache_size > 0 else None
+    start = time.perf_counter()
+    try:
+        report = build_site(args.content, args.output, args.template, args.manifest, workers, block_cache, args.async_io)
+    finally:
+        instrumentation.disable()
+    elapsed = time.perf_counter() - start
+    print(
+        f"built {args.output} in {elapsed:.3f}s: {len(report.rendered)} rendered "
+        f"({len(report.written)} written, {len(report.unchanged)} identical to the previous output), "
+        f"{len(report.skipped)} unchanged, {len(report.removed)} removed"
+    )
+    if block_cache is not None:
+        print(f"block cache: {block_cache.hits} hits, {block_cache.misses} misses, {len(block_cache)} fragments stored")
+    if args.stats:
+        print(instrumentation.format_stats())
 
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,124 @@
+from collections.abc import Callable
+import random
+
+from block_markdown import BlockType
+from textnode import TextType
+
+
+WORDS = [
+    "site", "page", "build", "render", "template", "content", "markdown", "output", "heading", "list",
+    "quote", "paragraph", "static", "generator", "fast", "simple", "link", "image", "text", "node",
+]
+DEFAULT_BLOCK_MIX: dict[BlockType, float] = {
+    BlockType.HEADING: 1.0,
+    BlockType.PARAGRAPH: 4.0,
+    BlockType.CODE: 1.0,
+    BlockType.QUOTE: 1.0,
+    BlockType.UNORDERED_LIST: 2.0,
+    BlockType.ORDERED_LIST: 1.0,
+}
+DEFAULT_INLINE_MIX: dict[TextType, float] = {
+    TextType.TEXT: 6.0,
+    TextType.BOLD: 1.0,
+    TextType.ITALIC: 1.0,
+    TextType.CODE: 1.0,
+    TextType.LINK: 1.0,
+    TextType.IMAGE: 0.5,
+}
+
+
+class CorpusGenerator:
+    """
+    Deterministic generator of markdown documents, the same seed and mixes always give the same text.
+
+    Block and inline span types are drawn with the weights of block_mix and inline_mix. The spans never nest
+    and never contain delimiters of their own, so every generated document renders without errors.
+    """
+    def __init__(
+            self, seed: int = 0,
+            block_mix: dict[BlockType, float] | None = None,
+            inline_mix: dict[TextType, float] | None = None) -> None:
+        self.block_mix: dict[BlockType, float] = block_mix if block_mix is not None else DEFAULT_BLOCK_MIX
+        self.inline_mix: dict[TextType, float] = inline_mix if inline_mix is not None else DEFAULT_INLINE_MIX
+        if not any(weight > 0 for weight in self.block_mix.values()):
+            raise ValueError("block_mix needs at least one positive weight")
+        if not any(weight > 0 for weight in self.inline_mix.values()):
+            raise ValueError("inline_mix needs at least one positive weight")
+        self._rng = random.Random(seed)
+        self._block_types = list(self.block_mix)
+        self._block_weights = list(self.block_mix.values())
+        self._text_types = list(self.inline_mix)
+        self._text_weights = list(self.inline_mix.values())
+
+    def words(self, count: int) -> str:
+        return ' '.join(self._rng.choices(WORDS, k=count))
+
+    def span(self, text_type: TextType) -> str:
+        match text_type:
+            case TextType.BOLD:
+                return f"**{self.words(2)}**"
+            case TextType.ITALIC:
+                return f"_{self.words(1)}_" if self._rng.random() < 0.5 else f"*{self.words(2)}*"
+            case TextType.CODE:
+                return f"`{self.words(1)}()`"
+            case TextType.LINK:
+                return f"[{self.words(2)}](https://example.com/{self.words(1)}/{self._rng.randrange(1000)}.html)"
+            case TextType.IMAGE:
+                return f"![{self.words(1)}](/static/{self.words(1)}{self._rng.randrange(100)}.png)"
+            case _:
+                return self.words(self._rng.randint(3, 8))
+
+    def inline_text(self, spans: int) -> str:
+        text_types = self._rng.choices(self._text_types, self._text_weights, k=spans)
+        return ' '.join(self.span(text_type) for text_type in text_types)
+
+    def block(self, block_type: BlockType) -> str:
+        rng = self._rng
+        match block_type:
+            case BlockType.HEADING:
+                return f"{'#' * rng.randint(1, 6)} {self.inline_text(rng.randint(1, 3))}"
+            case BlockType.CODE:
+                lines = [f"{self.words(1)} = {self.words(1)}({rng.randrange(100)})" for _ in range(rng.randint(1, 6))]
+                return '```\n' + '\n'.join(lines) + '\n```'
+            case BlockType.QUOTE:
+                return '\n'.join(f"> {self.inline_text(rng.randint(2, 5))}" for _ in range(rng.randint(1, 4)))
+            case BlockType.UNORDERED_LIST:
+                return '\n'.join(f"- {self.inline_text(rng.randint(1, 4))}" for _ in range(rng.randint(2, 6)))
+            case BlockType.ORDERED_LIST:
+                return '\n'.join(f"{i}. {self.inline_text(rng.randint(1, 4))}" for i in range(1, rng.randint(2, 6) + 1))
+            case _:
+                return '\n'.join(self.inline_text(rng.randint(4, 10)) for _ in range(rng.randint(1, 4)))
+
+    def document(self, size_bytes: int) -> str:
+        """
+        Returns a document of at least size_bytes characters, starting with one block of every type
+        of the mix with a positive weight so that even small documents cover all of them.
+        """
+        blocks = [self.block(block_type) for block_type, weight in self.block_mix.items() if weight > 0]
+        size = sum(len(block) + 2 for block in blocks)
+        while size < size_bytes:
+            block = self.block(self._rng.choices(self._block_types, self._block_weights)[0])
+            blocks.append(block)
+            size += len(block) + 2
+        return '\n\n'.join(blocks) + '\n'
+
+
+def generate_document(
+        size_bytes: int, seed: int = 0,
+        block_mix: dict[BlockType, float] | None = None,
+        inline_mix: dict[TextType, float] | None = None) -> str:
+    return CorpusGenerator(seed, block_mix, inline_mix).document(size_bytes)
+
+
+# inline texts that make a naive delimiter matching quadratic, or overflow a recursive tree walk,
+# by the number of repetitions of their pattern
+WORST_CASE_INLINE_TEXTS: dict[str, Callable[[int], str]] = {
+    'unclosed openers': lambda n: "*a " * n,
+    'closers without openers': lambda n: "a* " * n,
+    'closers over openers of another kind': lambda n: "_a " * n + "b* " * n,
+    'alternating delimiters': lambda n: "*_" * n + "a",
+    'unclosed backtick runs': lambda n: "`a" + " ``b" * n,
+    'openers of every length': lambda n: "".join("*" * (i % 7 + 1) + "a " for i in range(n)),
+    'rule of 3 misses': lambda n: "a**b" + "*c" * n,
+    'unclosed links': lambda n: "[a](" * n,
+}
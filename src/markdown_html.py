@@ -0,0 +1,229 @@
+from block_cache import block_key, BlockCache
+from block_markdown import block_to_block_type, BlockType, markdown_to_blocks
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from inline_markdown import extract_link_urls, text_to_text_nodes
+from textnode import text_node_to_html_node
+
+
+def text_to_children(text: str) -> list[HTMLNode]:
+    children: list[HTMLNode] = [text_node_to_html_node(text_node, trusted=True) for text_node in text_to_text_nodes(text)]
+    if not children:
+        children.append(LeafNode(None, ''))  # a ParentNode can't be rendered without children
+    return children
+
+def _heading_level(block: str) -> int:
+    return len(block) - len(block.lstrip('#'))
+
+def _quote_text(block: str) -> str:
+    return ' '.join(line.lstrip('>').strip() for line in block.split('\n'))
+
+def _unordered_list_item_texts(block: str) -> list[str]:
+    return [line[2:] for line in block.split('\n')]
+
+def _ordered_list_item_texts(block: str) -> list[str]:
+    return [line.split('.', 1)[1].lstrip() for line in block.split('\n')]
+
+def _paragraph_text(block: str) -> str:
+    return ' '.join(block.split('\n'))
+
+def block_inline_texts(block: str, block_type: BlockType) -> list[str]:
+    """The texts of a block that are parsed as inline markdown, code blocks have none."""
+    match block_type:
+        case BlockType.HEADING:
+            return [block[_heading_level(block) + 1:]]
+        case BlockType.CODE:
+            return []
+        case BlockType.QUOTE:
+            return [_quote_text(block)]
+        case BlockType.UNORDERED_LIST:
+            return _unordered_list_item_texts(block)
+        case BlockType.ORDERED_LIST:
+            return _ordered_list_item_texts(block)
+        case _:
+            return [_paragraph_text(block)]
+
+def heading_to_html_node(block: str) -> ParentNode:
+    level = _heading_level(block)
+    return ParentNode(f"h{level}", text_to_children(block[level + 1:]))
+
+def code_to_html_node(block: str) -> ParentNode:
+    # the first line holds the opening fence (and the optional language), the block ends with the closing one
+    code = block[block.index('\n') + 1:-3]
+    return ParentNode("pre", [LeafNode("code", code)])
+
+def quote_to_html_node(block: str) -> ParentNode:
+    return ParentNode("blockquote", text_to_children(_quote_text(block)))
+
+def unordered_list_to_html_node(block: str) -> ParentNode:
+    items: list[HTMLNode] = [ParentNode("li", text_to_children(text)) for text in _unordered_list_item_texts(block)]
+    return ParentNode("ul", items)
+
+def ordered_list_to_html_node(block: str) -> ParentNode:
+    items: list[HTMLNode] = [ParentNode("li", text_to_children(text)) for text in _ordered_list_item_texts(block)]
+    return ParentNode("ol", items)
+
+def paragraph_to_html_node(block: str) -> ParentNode:
+    return ParentNode("p", text_to_children(_paragraph_text(block)))
+
+def block_to_html_node(block: str) -> ParentNode:
+    return _typed_block_to_html_node(block, block_to_block_type(block))
+
+def _typed_block_to_html_node(block: str, block_type: BlockType) -> ParentNode:
+    match block_type:
+        case BlockType.HEADING:
+            return heading_to_html_node(block)
+        case BlockType.CODE:
+            return code_to_html_node(block)
+        case BlockType.QUOTE:
+            return quote_to_html_node(block)
+        case BlockType.UNORDERED_LIST:
+            return unordered_list_to_html_node(block)
+        case BlockType.ORDERED_LIST:
+            return ordered_list_to_html_node(block)
+        case _:
+            return paragraph_to_html_node(block)
+
+def markdown_to_html_node(markdown: str) -> ParentNode:
+    children: list[HTMLNode] = [block_to_html_node(block) for block in markdown_to_blocks(markdown)]
+    if not children:
+        children.append(LeafNode(None, ''))
+    return ParentNode("div", children)
+
+def _block_html(block: str, block_cache: BlockCache | None, block_type: BlockType | None = None) -> str:
+    if block_cache is None:
+        return _typed_block_to_html_node(block, block_type or block_to_block_type(block)).to_html()
+    key = block_key(block)
+    fragment = block_cache.get(key)
+    if fragment is None:
+        fragment = _typed_block_to_html_node(block, block_type or block_to_block_type(block)).to_html()
+        block_cache.put(key, fragment)
+    return fragment
+
+def markdown_to_html(markdown: str, block_cache: BlockCache | None = None) -> str:
+    """
+    Renders a document to the same html as markdown_to_html_node(markdown).to_html().
+
+    With a block cache, the fragment of every block is looked up by its content hash first
+    and only the blocks missing from the cache are parsed and rendered.
+    """
+    if block_cache is None:
+        return markdown_to_html_node(markdown).to_html()
+    fragments = [_block_html(block, block_cache) for block in markdown_to_blocks(markdown)]
+    return f"<div>{''.join(fragments)}</div>"
+
+
+class RenderedBlocks:
+    """
+    The blocks of a rendered document along with the html fragment, the type and the link urls of each one,
+    and what a build records about the document: its title, None without an h1 heading, and the urls
+    of its links and images.
+    """
+    __slots__ = ('blocks', 'fragments', 'reparsed', 'block_types', 'block_urls', 'title_index', 'title', 'urls')
+
+    def __init__(
+            self, blocks: list[str], fragments: list[str], reparsed: int,
+            block_types: list[BlockType], block_urls: list[list[str]], title_index: int | None) -> None:
+        self.blocks: list[str] = blocks
+        self.fragments: list[str] = fragments
+        self.reparsed: int = reparsed
+        self.block_types: list[BlockType] = block_types
+        self.block_urls: list[list[str]] = block_urls
+        self.title_index: int | None = title_index
+        self.title: str | None = _heading_title(blocks[title_index]) if title_index is not None else None
+        self.urls: list[str] = [url for urls in block_urls for url in urls]
+
+    def to_html(self) -> str:
+        return f"<div>{''.join(self.fragments)}</div>"
+
+    def __repr__(self) -> str:
+        return f"RenderedBlocks({len(self.blocks)} blocks, reparsed={self.reparsed}, title={self.title!r}, {len(self.urls)} urls)"
+
+
+def _block_link_urls(block: str, block_type: BlockType) -> list[str]:
+    return extract_link_urls(block) if block_type is not BlockType.CODE else []
+
+def _first_title_index(blocks: list[str], start: int, end: int) -> int | None:
+    for index in range(start, end):
+        if blocks[index].startswith('# '):
+            return index
+    return None
+
+def render_blocks(markdown: str, previous: RenderedBlocks | None = None, block_cache: BlockCache | None = None) -> RenderedBlocks:
+    """
+    Renders a document block by block, reusing the fragments of the blocks that did not change since previous.
+
+    The new blocks are diffed against the previous ones: the common prefix and suffix are kept in place,
+    and the blocks of the edited range are matched by content, so moved or duplicated blocks are not parsed again.
+    The other blocks go through the block cache when there is one. to_html() of the result is byte-identical
+    to markdown_to_html(markdown).
+
+    The title, the text of the first h1 heading, and the urls of the links and images outside of code blocks
+    are collected per block in the same pass, and kept from previous along with the fragments, so only
+    the blocks not found in previous are typed and scanned for links. The urls are scanned on whole blocks,
+    so they also cover the blocks served by the block cache.
+
+    :param markdown: the document
+    :param previous: the result of the last render of the same page, if any
+    :param block_cache: cache of rendered block fragments, optional
+    :return: the blocks, their fragments, types and urls, the number of blocks that were not found in previous,
+        and the title
+    """
+    blocks = markdown_to_blocks(markdown)
+    if previous is None:
+        block_types = [block_to_block_type(block) for block in blocks]
+        block_urls = [_block_link_urls(block, block_type) for block, block_type in zip(blocks, block_types)]
+        fragments = [_block_html(block, block_cache, block_type) for block, block_type in zip(blocks, block_types)]
+        return RenderedBlocks(blocks, fragments, len(blocks), block_types, block_urls, _first_title_index(blocks, 0, len(blocks)))
+
+    old_blocks = previous.blocks
+    limit = min(len(blocks), len(old_blocks))
+    prefix = 0
+    while prefix < limit and blocks[prefix] == old_blocks[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and blocks[-1 - suffix] == old_blocks[-1 - suffix]:
+        suffix += 1
+
+    edited_end = len(blocks) - suffix
+    old_edited_end = len(old_blocks) - suffix
+    old_indexes = {old_blocks[index]: index for index in range(prefix, old_edited_end)}
+    edited_fragments = []
+    edited_types = []
+    edited_urls = []
+    reparsed = 0
+    for index in range(prefix, edited_end):
+        block = blocks[index]
+        old_index = old_indexes.get(block)
+        if old_index is None:
+            block_type = block_to_block_type(block)
+            edited_fragments.append(_block_html(block, block_cache, block_type))
+            edited_types.append(block_type)
+            edited_urls.append(_block_link_urls(block, block_type))
+            reparsed += 1
+        else:
+            edited_fragments.append(previous.fragments[old_index])
+            edited_types.append(previous.block_types[old_index])
+            edited_urls.append(previous.block_urls[old_index])
+
+    old_title_index = previous.title_index
+    if old_title_index is not None and old_title_index < prefix:
+        title_index = old_title_index
+    else:
+        title_index = _first_title_index(blocks, prefix, edited_end)
+        if title_index is None:
+            if old_title_index is not None and old_title_index >= old_edited_end:
+                title_index = old_title_index - old_edited_end + edited_end
+            elif old_title_index is not None:  # the old title was edited away, an h1 further down becomes the title
+                title_index = _first_title_index(blocks, edited_end, len(blocks))
+
+    return RenderedBlocks(
+        blocks,
+        previous.fragments[:prefix] + edited_fragments + previous.fragments[old_edited_end:],
+        reparsed,
+        previous.block_types[:prefix] + edited_types + previous.block_types[old_edited_end:],
+        previous.block_urls[:prefix] + edited_urls + previous.block_urls[old_edited_end:],
+        title_index,
+    )
+
+def _heading_title(block: str) -> str:
+    return block[2:].split('\n', 1)[0].strip()
@@ -0,0 +1,14 @@
+import re
+
+
+# Block parsing
+TRAILING_WHITESPACE_PATTERN = re.compile(r'[\t ]+\n')
+BLANK_LINES_PATTERN = re.compile(r'\n{2,}')
+HEADING_PATTERN = re.compile(r'#{1,6} ')
+ORDERED_LIST_ITEM_PATTERN = re.compile(r'(\d+)\.')
+# a newline followed by lines holding only tabs and spaces, where markdown_to_blocks starts a new block
+BLOCK_BOUNDARY_BYTES_PATTERN = re.compile(rb'\n(?:[\t ]*\n)+')
+
+# Inline parsing
+IMAGE_PATTERN = re.compile(r'!\[([^\[\]]*)\]\(([^\(\)]*)\)')
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
@@ -0,0 +1,266 @@
+import re
+import string
+import unicodedata
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from markdown_patterns import IMAGE_PATTERN, LINK_PATTERN
+
+
+# characters starting an inline construct, everything else is plain text
+_SPECIAL_PATTERN = re.compile(r'[`*_!\[]')
+_RUN_PATTERN = re.compile(r'`+|\*+|_+')
+_BACKTICK_RUNS_PATTERN = re.compile(r'`+')
+_ASCII_PUNCTUATION = frozenset(string.punctuation)
+
+# kinds of the items of the inline list
+_TEXT, _NODE, _DELIMITER, _EMPHASIS = range(4)
+
+
+class _Item:
+    """
+    An element of the doubly linked inline list: plain text, a finished node (code span, link or image),
+    a run of * or _ delimiters, or an emphasis holding the sublist of its children.
+
+    Delimiter runs are also linked to each other through dprev and dnext, which forms the delimiter stack.
+    """
+    __slots__ = (
+        'kind', 'text', 'node', 'tag', 'first', 'prev', 'next',
+        'char', 'count', 'length', 'index', 'can_open', 'can_close', 'dprev', 'dnext',
+    )
+
+    def __init__(self, kind: int, text: str = '', node: HTMLNode | None = None) -> None:
+        self.kind: int = kind
+        self.text: str = text
+        self.node: HTMLNode | None = node
+        self.tag: str | None = None
+        self.first: _Item | None = None
+        self.prev: _Item | None = None
+        self.next: _Item | None = None
+
+
+def _is_punctuation(char: str) -> bool:
+    return char in _ASCII_PUNCTUATION or (char > '\x7f' and unicodedata.category(char)[0] in 'PS')
+
+def _delimiter_run(text: str, start: int, end: int) -> _Item:
+    """Builds the item of the delimiter run text[start:end], with the CommonMark flanking rules."""
+    char = text[start]
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    before_space, after_space = before.isspace(), after.isspace()
+    before_punctuation, after_punctuation = _is_punctuation(before), _is_punctuation(after)
+    left_flanking = not after_space and (not after_punctuation or before_space or before_punctuation)
+    right_flanking = not before_space and (not before_punctuation or after_space or after_punctuation)
+
+    item = _Item(_DELIMITER)
+    item.char = char
+    item.count = item.length = end - start
+    item.index = start
+    if char == '*':
+        item.can_open, item.can_close = left_flanking, right_flanking
+    else:  # _ can't open or close inside a word
+        item.can_open = left_flanking and (not right_flanking or before_punctuation)
+        item.can_close = right_flanking and (not left_flanking or after_punctuation)
+    item.dprev = item.dnext = None
+    return item
+
+def _unlink(item: _Item) -> None:
+    # the list always starts with a sentinel, an item to remove has a prev
+    item.prev.next = item.next
+    if item.next is not None:
+        item.next.prev = item.prev
+
+def _remove_delimiter(delimiter: _Item) -> None:
+    if delimiter.dprev is not None:
+        delimiter.dprev.dnext = delimiter.dnext
+    if delimiter.dnext is not None:
+        delimiter.dnext.dprev = delimiter.dprev
+
+def _process_emphasis(first_delimiter: _Item | None) -> None:
+    """
+    Matches the delimiter runs of the stack into emphasis items, the "process emphasis" procedure of CommonMark.
+
+    For every closer, the stack is walked down to the nearest matching opener, and openers_bottom remembers
+    where the last search for the same kind of closer failed, so no part of the stack is searched twice
+    in vain and the procedure stays linear. The items between a matched pair become the children of an
+    emphasis item by relinking the ends of their sublist, whatever their number.
+    """
+    # (char, closer can open, closer length % 3) -> index the openers are searched down to, excluded.
+    # An index rather than the delimiter itself, which can leave the stack when it is matched later.
+    openers_bottom: dict[tuple[str, bool, int], int] = {}
+    closer = first_delimiter
+    while closer is not None:
+        if not closer.can_close:
+            closer = closer.dnext
+            continue
+        key = (closer.char, closer.can_open, closer.length % 3)
+        bottom = openers_bottom.get(key, -1)
+        opener = closer.dprev
+        while opener is not None and opener.index > bottom:
+            if opener.char == closer.char and opener.can_open:
+                # rule of 3: runs that can both open and close don't match when their lengths add up to a multiple of 3,
+                # which keeps the ** of *foo**bar* literal
+                both_sides = opener.can_close or closer.can_open
+                lengths = opener.length + closer.length
+                if not (both_sides and lengths % 3 == 0 and (opener.length % 3 or closer.length % 3)):
+                    break
+            opener = opener.dprev
+        else:
+            openers_bottom[key] = closer.dprev.index if closer.dprev is not None else -1
+            next_closer = closer.dnext
+            if not closer.can_open:
+                _remove_delimiter(closer)
+            closer = next_closer
+            continue
+
+        used = 2 if opener.count >= 2 and closer.count >= 2 else 1
+        opener.count -= used
+        closer.count -= used
+        emphasis = _Item(_EMPHASIS)
+        emphasis.tag = 'b' if used == 2 else 'i'
+        if opener.next is not closer:
+            emphasis.first = opener.next
+            emphasis.first.prev = None
+            closer.prev.next = None
+        emphasis.prev, emphasis.next = opener, closer
+        opener.next = closer.prev = emphasis
+        # the delimiters in between are now plain text of the emphasis
+        opener.dnext, closer.dprev = closer, opener
+
+        if opener.count == 0:
+            _unlink(opener)
+            _remove_delimiter(opener)
+        if closer.count == 0:
+            next_closer = closer.dnext
+            _unlink(closer)
+            _remove_delimiter(closer)
+            closer = next_closer
+
+def _to_nodes(first: _Item | None) -> list[HTMLNode]:
+    """Converts the inline list into html nodes with an explicit stack, the nesting depth is not limited."""
+    nodes: list[HTMLNode] = []
+    # (item to convert next, list its nodes are appended to)
+    pending: list[tuple[_Item | None, list[HTMLNode]]] = [(first, nodes)]
+    while pending:
+        item, out = pending.pop()
+        texts = []  # adjacent texts and unmatched delimiters become one leaf
+        while item is not None:
+            kind = item.kind
+            if kind == _TEXT:
+                texts.append(item.text)
+                item = item.next
+                continue
+            if kind == _DELIMITER:
+                texts.append(item.char * item.count)
+                item = item.next
+                continue
+            if texts:
+                out.append(LeafNode.trusted(None, ''.join(texts)))
+                texts = []
+            if kind == _NODE:
+                out.append(item.node)
+                item = item.next
+                continue
+            children: list[HTMLNode] = []
+            out.append(ParentNode(item.tag, children))
+            if item.first is None:
+                children.append(LeafNode.trusted(None, ''))
+                item = item.next
+                continue
+            pending.append((item.next, out))
+            item, out = item.first, children
+        if texts:
+            out.append(LeafNode.trusted(None, ''.join(texts)))
+    return nodes
+
+def parse_nested_inline(text: str) -> list[HTMLNode]:
+    """
+    Parses the inline markdown of a block into html nodes where emphasis can nest to any depth,
+    like **bold _and italic_** or *italic **and bold***.
+
+    Code spans are opened by a run of backticks and closed by the next run of the same length, their content
+    is literal. Links and images have the syntax of text_to_text_nodes. Runs of * and _ follow the CommonMark
+    emphasis rules: a run can open or close depending on the characters around it, ** makes <b> and * <i>,
+    and delimiters that don't match are kept as text, so any input parses without errors.
+
+    Unlike text_to_text_nodes, the result doesn't depend on the order of ALLOWED_DELIMITERS. The time is
+    linear in the length of the text, including for unclosed delimiters and backtick runs.
+
+    :param text: markdown text of a single block
+    :return: the children nodes of the block
+    """
+    if not isinstance(text, str):
+        raise ValueError(f"provide text has invalid type, found {type(text)} instead of str")
+
+    # the start of every backtick run by length, with the index of the first one a closer can still be
+    backtick_runs: dict[int, list[int]] = {}
+    for match in _BACKTICK_RUNS_PATTERN.finditer(text):
+        backtick_runs.setdefault(match.end() - match.start(), []).append(match.start())
+    next_backtick_run: dict[int, int] = dict.fromkeys(backtick_runs, 0)
+
+    head = tail = _Item(_TEXT)  # sentinel, every other item has a prev
+    first_delimiter = last_delimiter = None
+
+    def append(item: _Item) -> None:
+        nonlocal tail
+        item.prev = tail
+        tail.next = item
+        tail = item
+
+    position = 0
+    length = len(text)
+    while position < length:
+        match = _SPECIAL_PATTERN.search(text, position)
+        if match is None:
+            append(_Item(_TEXT, text[position:]))
+            break
+        start = match.start()
+        if start > position:
+            append(_Item(_TEXT, text[position:start]))
+        char = text[start]
+
+        if char == '!' or char == '[':
+            link = (IMAGE_PATTERN if char == '!' else LINK_PATTERN).match(text, start)
+            if link is None:
+                append(_Item(_TEXT, char))
+                position = start + 1
+            elif char == '!':
+                append(_Item(_NODE, node=LeafNode.trusted("img", '', {'src': link.group(2), 'alt': link.group(1)})))
+                position = link.end()
+            else:
+                append(_Item(_NODE, node=LeafNode.trusted("a", link.group(1), {'href': link.group(2)})))
+                position = link.end()
+            continue
+
+        end = _RUN_PATTERN.match(text, start).end()
+        if char == '`':
+            run_length = end - start
+            runs = backtick_runs[run_length]
+            index = next_backtick_run[run_length]
+            while index < len(runs) and runs[index] < end:
+                index += 1
+            next_backtick_run[run_length] = index
+            if index < len(runs):
+                closer_start = runs[index]
+                append(_Item(_NODE, node=LeafNode.trusted("code", text[end:closer_start])))
+                position = closer_start + run_length
+            else:
+                append(_Item(_TEXT, text[start:end]))  # no closer of this length left
+                position = end
+            continue
+
+        delimiter = _delimiter_run(text, start, end)
+        append(delimiter)
+        if delimiter.can_open or delimiter.can_close:
+            if last_delimiter is None:
+                first_delimiter = delimiter
+            else:
+                last_delimiter.dnext = delimiter
+                delimiter.dprev = last_delimiter
+            last_delimiter = delimiter
+        position = end
+
+    _process_emphasis(first_delimiter)
+    nodes = _to_nodes(head.next)
+    if not nodes:
+        nodes.append(LeafNode.trusted(None, ''))
+    return nodes
@@ -0,0 +1,142 @@
+import hashlib
+import os
+import re
+
+
+# {{> header.html }} is replaced by the file header.html, resolved from the directory of the including file
+INCLUDE_PATTERN = re.compile(r'\{\{>\s*(\S+?)\s*\}\}')
+# {{ Title }} is a slot filled with the value named Title for every page
+SLOT_PATTERN = re.compile(r'\{\{ *(\w+) *\}\}')
+
+# (size, mtime_ns) of a template file when it was loaded
+Signature = tuple[int, int]
+
+
+class CompiledTemplate:
+    """
+    A template split once into its literal text and its slots, so a page is rendered with a single join
+    instead of scanning the whole template for every placeholder.
+
+    parts holds the literals with the placeholder text at the place of every slot, slots the (index, name)
+    of the slots in parts. A slot without a value keeps its placeholder text.
+    """
+    __slots__ = ('parts', 'slots')
+
+    def __init__(self, parts: list[str], slots: tuple[tuple[int, str], ...]) -> None:
+        self.parts: list[str] = parts
+        self.slots: tuple[tuple[int, str], ...] = slots
+
+    def render(self, values: dict[str, str]) -> str:
+        parts = self.parts.copy()
+        get = values.get
+        for index, name in self.slots:
+            parts[index] = get(name, parts[index])
+        return ''.join(parts)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({len(self.parts)} parts, slots={[name for _, name in self.slots]})"
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    parts = []
+    slots = []
+    position = 0
+    for match in SLOT_PATTERN.finditer(text):
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        slots.append((len(parts), match.group(1)))
+        parts.append(match.group())
+        position = match.end()
+    if position < len(text):
+        parts.append(text[position:])
+    return CompiledTemplate(parts, tuple(slots))
+
+
+class LoadedTemplate:
+    """
+    A template with its includes expanded, and compiled.
+
+    files holds the content hash of the template and of every file it includes, directly or not,
+    and includes the files each of them includes, which is what the dependency graph of a build records.
+    signatures holds the size and mtime every file had when it was read.
+    """
+    __slots__ = ('path', 'text', 'files', 'includes', 'signatures', 'compiled')
+
+    def __init__(
+            self, path: str, text: str, files: dict[str, str], includes: dict[str, list[str]],
+            signatures: dict[str, Signature] | None = None) -> None:
+        self.path: str = path
+        self.text: str = text
+        self.files: dict[str, str] = files
+        self.includes: dict[str, list[str]] = includes
+        self.signatures: dict[str, Signature] = signatures if signatures is not None else {}
+        self.compiled: CompiledTemplate = compile_template(text)
+
+    def __repr__(self) -> str:
+        return f"LoadedTemplate({self.path!r}, {len(self.files)} files)"
+
+
+def load_template(template_path: str) -> LoadedTemplate:
+    """
+    Reads a template and expands its {{> name }} includes, recursively.
+
+    :raises FileNotFoundError: if the template or one of its includes does not exist
+    :raises ValueError: if a file includes itself, directly or through other includes
+    """
+    files: dict[str, str] = {}
+    includes: dict[str, list[str]] = {}
+    signatures: dict[str, Signature] = {}
+
+    def expand(path: str, including: tuple[str, ...]) -> str:
+        if path in including:
+            raise ValueError(f"template {path} includes itself through {' -> '.join(including + (path,))}")
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            data = file.read()
+        signatures[path] = (stat.st_size, stat.st_mtime_ns)
+        files[path] = hashlib.sha256(data).hexdigest()
+        included = includes.setdefault(path, [])
+        directory = os.path.dirname(path)
+
+        def include(match: re.Match) -> str:
+            include_path = os.path.normpath(os.path.join(directory, match.group(1)))
+            if include_path not in included:
+                included.append(include_path)
+            return expand(include_path, including + (path,))
+
+        return INCLUDE_PATTERN.sub(include, data.decode('utf-8'))
+
+    text = expand(template_path, ())
+    return LoadedTemplate(template_path, text, files, includes, signatures)
+
+
+_template_cache: dict[str, LoadedTemplate] = {}
+
+def _signature(path: str) -> Signature | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def get_template(template_path: str) -> LoadedTemplate:
+    """
+    Returns the loaded template of template_path, from a cache kept for the life of the process
+    so that the pages of a build, and consecutive builds like those of the watch mode, share one compilation.
+
+    The cached template is returned as is while none of its files changed size or mtime. When one did,
+    the files are read again and the cached template is still returned if their hashes did not change,
+    so callers can compare the returned object to the previous one to know if the template changed.
+    """
+    cached = _template_cache.get(template_path)
+    if cached is not None and all(_signature(path) == signature for path, signature in cached.signatures.items()):
+        return cached
+    template = load_template(template_path)
+    if cached is not None and cached.files == template.files:
+        cached.signatures = template.signatures  # touched but unchanged
+        return cached
+    _template_cache[template_path] = template
+    return template
+
+def clear_template_cache() -> None:
+    _template_cache.clear()
@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from block_cache import block_key, BlockCache, BLOCK_CACHE_VERSION
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache(max_entries=10)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', '<p>a</p>')
+        self.assertEqual(cache.get('a'), '<p>a</p>')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = BlockCache(max_entries=2)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+        cache.get('a')
+        cache.put('c', 'C')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertEqual(cache.get('c'), 'C')
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError) as cm:
+            BlockCache(max_entries=0)
+        self.assertEqual(str(cm.exception), "max_entries must be at least 1")
+
+    def test_block_key(self):
+        self.assertEqual(block_key("# heading"), block_key("# heading"))
+        self.assertNotEqual(block_key("# heading"), block_key("## heading"))
+
+    def test_take_added_and_merge(self):
+        worker_cache = BlockCache()
+        worker_cache.record_added = True
+        worker_cache.put('a', 'A')
+        worker_cache.get('a')
+        self.assertEqual(worker_cache.take_added(), {'a': 'A'})
+        self.assertEqual(worker_cache.take_added(), {})
+
+        cache = BlockCache()
+        cache.merge({'a': 'A'}, hits=2, misses=1)
+        self.assertEqual(cache.get('a'), 'A')
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+
+class TestBlockCacheStore(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temporary_directory.name, 'cache', 'blocks.json')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_save_and_load(self):
+        cache = BlockCache(path=self.path)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+        cache.save()
+        loaded = BlockCache.load(self.path)
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.get('b'), 'B')
+
+    def test_load_keeps_most_recent(self):
+        cache = BlockCache(path=self.path)
+        for key in 'abc':
+            cache.put(key, key.upper())
+        cache.get('a')
+        cache.save()
+        loaded = BlockCache.load(self.path, max_entries=2)
+        self.assertIsNone(loaded.get('b'))
+        self.assertEqual(loaded.get('a'), 'A')
+        self.assertEqual(loaded.get('c'), 'C')
+
+    def test_missing_or_outdated_store(self):
+        self.assertEqual(len(BlockCache.load(self.path)), 0)
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as file:
+            json.dump({'version': BLOCK_CACHE_VERSION - 1, 'fragments': [['a', 'A']]}, file)
+        self.assertEqual(len(BlockCache.load(self.path)), 0)
+
+    def test_corrupt_store(self):
+        cache = BlockCache(path=self.path)
+        cache.put('a', 'A')
+        cache.save()
+        with open(self.path) as file:
+            stored = file.read()
+        contents = [
+            stored[:len(stored) // 2],
+            b"\xff\xfe",
+            "[]",
+            json.dumps({'version': BLOCK_CACHE_VERSION}),
+            json.dumps({'version': BLOCK_CACHE_VERSION, 'fragments': [['a']]}),
+            json.dumps({'version': BLOCK_CACHE_VERSION, 'fragments': [['a', 1]]}),
+        ]
+        for content in contents:
+            with open(self.path, 'wb' if isinstance(content, bytes) else 'w') as file:
+                file.write(content)
+            loaded = BlockCache.load(self.path)
+            self.assertEqual(len(loaded), 0, content)
+            self.assertEqual(loaded.path, self.path)
+
+    def test_failed_save_leaves_no_temporary_file(self):
+        cache = BlockCache(path=self.path)
+        cache.put('a', 'A')
+        with mock.patch('block_cache.json.dump', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                cache.save()
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
+import io
+import mmap
+import os
+import random
+import tempfile
 import unittest
+from unittest import mock
 
-from block_markdown import block_to_block_type, BlockType, markdown_to_blocks
+import block_markdown
+from block_markdown import block_to_block_type, BlockType, iter_mapped_blocks, iter_markdown_blocks, markdown_to_blocks
+from markdown_corpus import generate_document
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -151,6 +159,101 @@ This is the same paragraph on a new line
         )
 
 
+class TestIterMarkdownBlocks(unittest.TestCase):
+    def test_file_handle(self):
+        md = """
+# This is a heading  \t
+
+This is **bolded** paragraph
+This is the same paragraph on a new line
+
+
+
+- This is a list
+- with items
+"""
+        blocks = iter_markdown_blocks(io.StringIO(md))
+        self.assertEqual(
+            list(blocks),
+            [
+                "# This is a heading",
+                "This is **bolded** paragraph\nThis is the same paragraph on a new line",
+                "- This is a list\n- with items",
+            ],
+        )
+
+    def test_is_lazy(self):
+        def lines():
+            yield "first block\n"
+            yield "\n"
+            raise RuntimeError("read past the first block")
+
+        blocks = iter_markdown_blocks(lines())
+        self.assertEqual(next(blocks), "first block")
+
+    def test_lines_without_newlines(self):
+        lines = ["   ", "block one", "  ", "", "block two", "still block two   "]
+        self.assertEqual(list(iter_markdown_blocks(lines)), ["block one", "block two\nstill block two"])
+
+    def test_empty_input(self):
+        self.assertEqual(list(iter_markdown_blocks([])), [])
+        self.assertEqual(list(iter_markdown_blocks(io.StringIO("   \n\n   \n   "))), [])
+
+    def test_matches_markdown_to_blocks(self):
+        samples = [
+            "",
+            "single block",
+            "\n\n\n  a  \n\tb\t\n\n\n\nc\n",
+            "a\n\r\nb\n\n\x0c\n\nc \t \n",
+            "  ```\ncode  \n\n```  \n> quote\n> more\n\n\n1. one\n2. two",
+        ]
+        for md in samples:
+            self.assertEqual(list(iter_markdown_blocks(io.StringIO(md))), markdown_to_blocks(md), md)
+
+
+class TestIterMappedBlocks(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temporary_directory.name, 'document.md')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write(self, text: str) -> None:
+        with open(self.path, 'w', encoding='utf-8', newline='') as file:
+            file.write(text)
+
+    def assertSameBlocks(self, text: str) -> None:
+        self.write(text)
+        self.assertEqual(list(iter_mapped_blocks(self.path)), markdown_to_blocks(text))
+
+    def test_document(self):
+        self.assertSameBlocks(generate_document(50_000))
+
+    def test_normalization(self):
+        self.assertSameBlocks("\n\n# heading \t\n \t\nparagraph  \nnext line\n\n\n\n- item\t")
+        self.assertSameBlocks("first\r\n\r\nsecond\x0c\n\x0c\nthird \xa0\n")
+
+    def test_multibyte_characters(self):
+        self.assertSameBlocks("# Überschrift\n\nparagraphe accentué \u2014 \U0001f600\n\n- \u00e9l\u00e9ment")
+
+    def test_empty_files(self):
+        for text in ("", "\n\n\n", " \t\n\t \n"):
+            with self.subTest(text=text):
+                self.assertSameBlocks(text)
+
+    def test_random_documents(self):
+        rng = random.Random(0)
+        alphabet = ['a', 'b', '\n', '\n', '\n', ' ', '\t', '\r', '\x0c', '\xe9', '# ', '\xa0']
+        for _ in range(2_000):
+            self.assertSameBlocks(''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))))
+
+    def test_released_pages(self):
+        text = generate_document(200_000)
+        with mock.patch.object(block_markdown, 'MAPPED_RELEASE_BYTES', mmap.PAGESIZE):
+            self.assertSameBlocks(text)
+
+
 class TestMarkdownBlockToBlockType(unittest.TestCase):
     def test_headings(self):
         md = '# h1 heading'
@@ -302,6 +405,22 @@ class TestMarkdownBlockToBlockType(unittest.TestCase):
         self.assertEqual(result, BlockType.PARAGRAPH)
         # a test_invalid_paragraph doesnt exist because its supposed to be the default case
 
+    def test_empty_block(self):
+        self.assertEqual(block_to_block_type(''), BlockType.PARAGRAPH)
+
+    def test_multi_line_heading(self):
+        md = '## heading\nfollowed by text'
+        self.assertEqual(block_to_block_type(md), BlockType.HEADING)
+
+    def test_long_code_block(self):
+        md = '```\n' + '1. not a list item\n' * 5000 + '```'
+        self.assertEqual(block_to_block_type(md), BlockType.CODE)
+
+    def test_lines_checked_after_the_first(self):
+        self.assertEqual(block_to_block_type('- item\n-item'), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type('> quote\n\n> quote'), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type('1. item\n2. item\n2. item'), BlockType.PARAGRAPH)
+
 
 if __name__ == "__main__":
     unittest.main()
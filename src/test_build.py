@@ -0,0 +1,335 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from block_cache import BlockCache
+from build import (
+    build_site, BuildManifest, find_markdown_files, MANIFEST_VERSION, output_path_for, page_paths, render_async, split_batches, write_if_changed,
+)
+from templates import compile_template
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class BuildTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = self.temporary_directory.name
+        self.content_dir = os.path.join(self.root, 'content')
+        self.output_dir = os.path.join(self.root, 'public')
+        self.template_path = os.path.join(self.root, 'template.html')
+        self.manifest_path = os.path.join(self.root, '.build', 'manifest.json')
+        os.makedirs(self.content_dir)
+        self.write(self.template_path, TEMPLATE)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(text)
+
+    def write_page(self, source: str, markdown: str) -> None:
+        self.write(os.path.join(self.content_dir, source), markdown)
+
+    def read_output(self, output: str) -> str:
+        with open(os.path.join(self.output_dir, output)) as file:
+            return file.read()
+
+    def build(self):
+        return build_site(self.content_dir, self.output_dir, self.template_path, self.manifest_path)
+
+    def read_outputs(self) -> dict[str, str]:
+        outputs = {}
+        for directory, _, file_names in os.walk(self.output_dir):
+            for file_name in file_names:
+                path = os.path.join(directory, file_name)
+                with open(path) as file:
+                    outputs[os.path.relpath(path, self.output_dir)] = file.read()
+        return outputs
+
+
+class TestBuildSite(BuildTestCase):
+    def test_first_build_renders_every_page(self):
+        self.write_page('index.md', "# Home\n\nWelcome **in**")
+        self.write_page('blog/post.md', "A post without title")
+        report = self.build()
+        self.assertEqual(report.rendered, ['blog/post.md', 'index.md'])
+        self.assertEqual(self.read_output('index.html'), "<title>Home</title><main><div><h1>Home</h1><p>Welcome <b>in</b></p></div></main>")
+        self.assertEqual(self.read_output('blog/post.html'), "<title>post</title><main><div><p>A post without title</p></div></main>")
+
+    def test_unchanged_pages_are_skipped(self):
+        self.write_page('index.md', "# Home")
+        self.write_page('about.md', "# About")
+        self.build()
+        report = self.build()
+        self.assertEqual(report.rendered, [])
+        self.assertEqual(report.skipped, ['about.md', 'index.md'])
+
+    def test_only_changed_page_is_rendered(self):
+        self.write_page('index.md', "# Home")
+        self.write_page('about.md', "# About")
+        self.build()
+        self.write_page('about.md', "# About us")
+        report = self.build()
+        self.assertEqual(report.rendered, ['about.md'])
+        self.assertEqual(report.skipped, ['index.md'])
+        self.assertIn("About us", self.read_output('about.html'))
+
+    def test_touched_but_unchanged_page_is_skipped(self):
+        self.write_page('index.md', "# Home")
+        self.build()
+        self.write_page('index.md', "# Home")
+        os.utime(os.path.join(self.content_dir, 'index.md'), ns=(1, 1))
+        report = self.build()
+        self.assertEqual(report.skipped, ['index.md'])
+
+    def test_template_change_renders_every_page(self):
+        self.write_page('index.md', "# Home")
+        self.write_page('about.md', "# About")
+        self.build()
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        report = self.build()
+        self.assertEqual(report.rendered, ['about.md', 'index.md'])
+
+    def test_missing_output_is_rendered_again(self):
+        self.write_page('index.md', "# Home")
+        self.build()
+        os.remove(os.path.join(self.output_dir, 'index.html'))
+        report = self.build()
+        self.assertEqual(report.rendered, ['index.md'])
+
+    def test_deleted_source_removes_output(self):
+        self.write_page('index.md', "# Home")
+        self.write_page('old.md', "# Old")
+        self.build()
+        os.remove(os.path.join(self.content_dir, 'old.md'))
+        report = self.build()
+        self.assertEqual(report.removed, ['old.md'])
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'old.html')))
+        self.assertNotIn('old.md', BuildManifest.load(self.manifest_path).pages)
+
+    def test_without_manifest_every_page_is_rendered(self):
+        self.write_page('index.md', "# Home")
+        build_site(self.content_dir, self.output_dir, self.template_path)
+        report = build_site(self.content_dir, self.output_dir, self.template_path)
+        self.assertEqual(report.rendered, ['index.md'])
+
+
+class TestParallelBuild(BuildTestCase):
+    def test_output_does_not_depend_on_workers(self):
+        for i in range(12):
+            self.write_page(f"section{i % 3}/page{i}.md", f"# Page {i}\n\nSome **text** for page {i}")
+        sequential_report = build_site(self.content_dir, self.output_dir, self.template_path, workers=1)
+        sequential_outputs = self.read_outputs()
+        parallel_report = build_site(self.content_dir, self.output_dir, self.template_path, workers=3)
+        self.assertEqual(parallel_report.rendered, sequential_report.rendered)
+        self.assertEqual(self.read_outputs(), sequential_outputs)
+        self.assertEqual(len(sequential_outputs), 12)
+
+    def test_parallel_build_is_incremental(self):
+        for i in range(4):
+            self.write_page(f"page{i}.md", f"# Page {i}")
+        build_site(self.content_dir, self.output_dir, self.template_path, self.manifest_path, workers=2)
+        report = build_site(self.content_dir, self.output_dir, self.template_path, self.manifest_path, workers=2)
+        self.assertEqual(report.rendered, [])
+        self.assertEqual(len(report.skipped), 4)
+
+    def test_block_cache_collects_worker_fragments(self):
+        for i in range(6):
+            self.write_page(f"page{i}.md", f"# Page {i}\n\nshared footer")
+        block_cache = BlockCache(path=os.path.join(self.root, '.build', 'blocks.json'))
+        build_site(self.content_dir, self.output_dir, self.template_path, workers=2, block_cache=block_cache)
+        self.assertEqual(len(block_cache), 7)
+        self.assertEqual(block_cache.hits + block_cache.misses, 12)
+
+        stored_cache = BlockCache.load(block_cache.path)
+        build_site(self.content_dir, self.output_dir, self.template_path, workers=2, block_cache=stored_cache)
+        self.assertEqual((stored_cache.hits, stored_cache.misses), (12, 0))
+
+
+class TestAsyncBuild(BuildTestCase):
+    def write_pages(self, count: int) -> None:
+        for i in range(count):
+            self.write_page(f"section{i % 3}/page{i}.md", f"# Page {i}\n\nSome **text** for page {i}\n\nshared footer")
+
+    def test_same_output_as_sequential_build(self):
+        self.write_pages(40)
+        sequential_report = build_site(self.content_dir, self.output_dir, self.template_path)
+        sequential_outputs = self.read_outputs()
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                report = build_site(self.content_dir, self.output_dir, self.template_path, workers=workers, async_io=True)
+                self.assertEqual(report.rendered, sequential_report.rendered)
+                self.assertEqual(self.read_outputs(), sequential_outputs)
+
+    def test_small_queues(self):
+        self.write_pages(20)
+        pages = [page_paths(self.content_dir, self.output_dir, source) for source in find_markdown_files(self.content_dir)]
+        render_async(pages, compile_template(TEMPLATE), io_concurrency=2, queue_size=1)
+        self.assertEqual(len(self.read_outputs()), 20)
+
+    def test_block_cache(self):
+        self.write_pages(6)
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                block_cache = BlockCache()
+                build_site(self.content_dir, self.output_dir, self.template_path, workers=workers, block_cache=block_cache, async_io=True)
+                self.assertEqual(len(block_cache), 13)
+                self.assertEqual(block_cache.hits + block_cache.misses, 18)
+
+    def test_error_is_raised(self):
+        self.write_pages(5)
+        self.write_page('broken.md', "an *unclosed delimiter")
+        with self.assertRaises(ValueError):
+            build_site(self.content_dir, self.output_dir, self.template_path, async_io=True)
+
+    def test_no_pages(self):
+        report = build_site(self.content_dir, self.output_dir, self.template_path, async_io=True)
+        self.assertEqual(report.rendered, [])
+
+
+class TestOutputWriter(BuildTestCase):
+    def output_mtime(self, output: str) -> int:
+        return os.stat(os.path.join(self.output_dir, output)).st_mtime_ns
+
+    def set_output_mtime(self, output: str, mtime_ns: int) -> None:
+        os.utime(os.path.join(self.output_dir, output), ns=(mtime_ns, mtime_ns))
+
+    def test_identical_html_is_not_written(self):
+        self.write_page('index.md', "# Home")
+        self.write_page('about.md', "# About")
+        report = self.build()
+        self.assertEqual(report.written, ['about.md', 'index.md'])
+        self.set_output_mtime('index.html', 1_000_000_000)
+        self.write_page('index.md', "# Home  \n\n\n")  # renders to the same html
+        self.write_page('about.md', "# About us")
+        report = self.build()
+        self.assertEqual(report.rendered, ['about.md', 'index.md'])
+        self.assertEqual(report.written, ['about.md'])
+        self.assertEqual(report.unchanged, ['index.md'])
+        self.assertEqual(self.output_mtime('index.html'), 1_000_000_000)
+        self.assertEqual(self.read_output('about.html'), "<title>About us</title><main><div><h1>About us</h1></div></main>")
+
+    def assert_only_changed_html_written(self, **options) -> None:
+        for i in range(6):
+            self.write_page(f"page{i}.md", f"# Page {i}")
+        build_site(self.content_dir, self.output_dir, self.template_path, self.manifest_path, **options)
+        for i in range(6):
+            self.write_page(f"page{i}.md", f"# Page {i}\n" if i % 2 else f"# Page {i} changed")
+        report = build_site(self.content_dir, self.output_dir, self.template_path, self.manifest_path, **options)
+        self.assertEqual(report.unchanged, ['page1.md', 'page3.md', 'page5.md'])
+        self.assertEqual(report.written, ['page0.md', 'page2.md', 'page4.md'])
+
+    def test_parallel_build(self):
+        self.assert_only_changed_html_written(workers=2)
+
+    def test_async_build(self):
+        self.assert_only_changed_html_written(async_io=True)
+
+    def test_manifest_keeps_output_hash(self):
+        self.write_page('index.md', "# Home")
+        self.build()
+        entry = BuildManifest.load(self.manifest_path).pages['index.md']
+        with open(os.path.join(self.output_dir, 'index.html'), 'rb') as file:
+            self.assertEqual(entry['output_hash'], hashlib.sha256(file.read()).hexdigest())
+
+    def test_no_temporary_files_left(self):
+        self.write_page('blog/post.md', "# Post")
+        self.build()
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, 'blog')), ['post.html'])
+
+
+class TestWriteIfChanged(BuildTestCase):
+    def test_write_if_changed(self):
+        path = os.path.join(self.output_dir, 'page.html')
+        output_hash, written = write_if_changed(path, "<p>é</p>")
+        self.assertTrue(written)
+        self.assertEqual(output_hash, hashlib.sha256("<p>é</p>".encode('utf-8')).hexdigest())
+        self.assertEqual(write_if_changed(path, "<p>é</p>", output_hash), (output_hash, False))
+        self.assertTrue(write_if_changed(path, "<p>new</p>", output_hash)[1])
+        self.assertEqual(self.read_output('page.html'), "<p>new</p>")
+
+    def test_missing_file_is_written(self):
+        path = os.path.join(self.output_dir, 'page.html')
+        output_hash, _ = write_if_changed(path, "<p>page</p>")
+        os.remove(path)
+        self.assertEqual(write_if_changed(path, "<p>page</p>", output_hash), (output_hash, True))
+        self.assertEqual(self.read_output('page.html'), "<p>page</p>")
+
+    def test_failed_write_leaves_no_temporary_file(self):
+        path = os.path.join(self.output_dir, 'page.html')
+        write_if_changed(path, "<p>old</p>")
+        for error in (OSError("disk full"), KeyboardInterrupt()):
+            with mock.patch('build.os.replace', side_effect=error):
+                with self.assertRaises(type(error)):
+                    write_if_changed(path, "<p>new</p>")
+            self.assertEqual(os.listdir(self.output_dir), ['page.html'])
+            self.assertEqual(self.read_output('page.html'), "<p>old</p>")
+
+
+class TestBlockCacheBuild(BuildTestCase):
+    def test_template_change_reuses_fragments(self):
+        self.write_page('index.md', "# Home\n\nSome **text**")
+        block_cache = BlockCache(path=os.path.join(self.root, '.build', 'blocks.json'))
+        self.build_with(block_cache)
+        expected_output = self.read_output('index.html')
+        self.write(self.template_path, TEMPLATE + "<footer></footer>")
+        block_cache = BlockCache.load(block_cache.path)
+        report = self.build_with(block_cache)
+        self.assertEqual(report.rendered, ['index.md'])
+        self.assertEqual((block_cache.hits, block_cache.misses), (2, 0))
+        self.assertEqual(self.read_output('index.html'), expected_output + "<footer></footer>")
+
+    def build_with(self, block_cache: BlockCache):
+        return build_site(self.content_dir, self.output_dir, self.template_path, self.manifest_path, block_cache=block_cache)
+
+
+class TestBuildHelpers(BuildTestCase):
+    def test_find_markdown_files(self):
+        self.write_page('b.md', "b")
+        self.write_page('a/c.md', "c")
+        self.write_page('notes.txt', "not markdown")
+        self.assertEqual(find_markdown_files(self.content_dir), [os.path.join('a', 'c.md'), 'b.md'])
+
+    def test_split_batches(self):
+        self.assertEqual(split_batches(list(range(7)), 3), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(split_batches(list(range(2)), 8), [[0], [1]])
+        self.assertEqual(split_batches([], 4), [])
+
+    def test_output_path_for(self):
+        self.assertEqual(output_path_for(os.path.join('blog', 'post.md')), os.path.join('blog', 'post.html'))
+
+    def test_manifest_from_other_version_is_ignored(self):
+        self.write(self.manifest_path, '{"version": 0, "pages": {"index.md": {}}}')
+        self.assertEqual(BuildManifest.load(self.manifest_path).pages, {})
+
+    def test_corrupt_manifest_makes_a_full_build(self):
+        self.write_page('index.md', "# Home")
+        self.build()
+        with open(self.manifest_path) as file:
+            stored = file.read()
+        contents = [
+            stored[:len(stored) // 2],
+            '[]',
+            '{"version": %d, "pages": {}}' % MANIFEST_VERSION,
+            '{"version": %d, "pages": [], "graph": {"pages": {}, "templates": {}}}' % MANIFEST_VERSION,
+        ]
+        for content in contents:
+            self.write(self.manifest_path, content)
+            self.assertEqual(BuildManifest.load(self.manifest_path).pages, {}, content)
+            self.assertEqual(self.build().rendered, ['index.md'])
+
+    def test_failed_manifest_save_leaves_no_temporary_file(self):
+        manifest = BuildManifest(self.manifest_path, {'index.md': {}})
+        with mock.patch('build.os.replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                manifest.save()
+        self.assertEqual(os.listdir(os.path.dirname(self.manifest_path)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import unittest
+
+from dependency_graph import DependencyGraph, resolve_link_target
+from build import BuildManifest
+from test_build import BuildTestCase
+
+
+class TestResolveLinkTarget(unittest.TestCase):
+    def test_relative_page(self):
+        self.assertEqual(resolve_link_target('blog/post.md', 'other.html'), 'blog/other.md')
+        self.assertEqual(resolve_link_target('blog/post.md', '../about.html'), 'about.md')
+
+    def test_absolute_page(self):
+        self.assertEqual(resolve_link_target('blog/post.md', '/about.html'), 'about.md')
+
+    def test_directory(self):
+        self.assertEqual(resolve_link_target('index.md', '/blog/'), os.path.join('blog', 'index.md'))
+
+    def test_file(self):
+        self.assertEqual(resolve_link_target('blog/post.md', '/static/logo.png'), os.path.join('static', 'logo.png'))
+
+    def test_fragment_and_query(self):
+        self.assertEqual(resolve_link_target('index.md', 'about.html?lang=en#team'), 'about.md')
+
+    def test_external(self):
+        for url in ('https://example.com/about.html', 'mailto:me@example.com', '#top', '//cdn.example.com/a.png', ''):
+            self.assertIsNone(resolve_link_target('index.md', url))
+
+    def test_outside_content(self):
+        self.assertIsNone(resolve_link_target('index.md', '../secret.html'))
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph(
+            pages={
+                'a.md': {'template': 'page.html', 'links': ['b.md']},
+                'b.md': {'template': 'page.html', 'links': []},
+                'c.md': {'template': 'other.html', 'links': ['a.md', 'logo.png']},
+            },
+            templates={
+                'page.html': {'hash': '1', 'includes': ['header.html']},
+                'other.html': {'hash': '2', 'includes': ['nav.html']},
+                'nav.html': {'hash': '3', 'includes': ['header.html']},
+                'header.html': {'hash': '4', 'includes': []},
+            },
+        )
+
+    def test_template(self):
+        self.assertEqual(self.graph.affected_pages(['page.html']), {'a.md', 'b.md'})
+
+    def test_include_reaches_every_template_using_it(self):
+        self.assertEqual(self.graph.affected_pages(['nav.html']), {'c.md'})
+        self.assertEqual(self.graph.affected_pages(['header.html']), {'a.md', 'b.md', 'c.md'})
+
+    def test_nothing_changed(self):
+        self.assertEqual(self.graph.affected_pages(), set())
+
+    def test_round_trip(self):
+        graph = DependencyGraph.from_dict(self.graph.to_dict())
+        self.assertEqual(graph.affected_pages(['header.html']), {'a.md', 'b.md', 'c.md'})
+
+
+class TestMinimalRebuilds(BuildTestCase):
+    """
+    Every change of the corpus below must render exactly the pages whose output depends on it: the changed pages,
+    or every page for a template or include change. Pages linking to an added or removed page are not rendered.
+    """
+    def setUp(self):
+        super().setUp()
+        self.write(self.template_path, "<header>{{> partials/header.html }}</header>{{ Content }}")
+        self.header_path = os.path.join(self.root, 'partials', 'header.html')
+        self.nav_path = os.path.join(self.root, 'partials', 'nav.html')
+        self.write(self.header_path, "<h1>{{ Title }}</h1>{{> nav.html }}")
+        self.write(self.nav_path, "<nav>home</nav>")
+        self.write_page('index.md', "# Home\n\nSee the [blog](/blog/) and [about](about.html)")
+        self.write_page('about.md', "# About\n\n![logo](/static/logo.png)")
+        self.write_page('blog/index.md', "# Blog\n\n- [first](first.html)\n- [second](second.html)")
+        self.write_page('blog/first.md', "# First\n\nBack [home](../index.html), read [on](https://example.com)")
+        self.write_page('blog/second.md', "# Second\n\n```\n[not a link](third.html)\n```")
+        self.write_page('notes.md', "# Notes")
+        self.assertEqual(len(self.build().rendered), 6)
+
+    def assertRebuilds(self, expected: list[str]) -> None:
+        report = self.build()
+        self.assertEqual(sorted(report.rendered), sorted(expected))
+        self.assertEqual(self.build().rendered, [])
+
+    def test_nothing_changed(self):
+        self.assertRebuilds([])
+
+    def test_include_change_rebuilds_every_page(self):
+        self.write(self.nav_path, "<nav>home | blog</nav>")
+        self.assertRebuilds(['about.md', 'blog/first.md', 'blog/index.md', 'blog/second.md', 'index.md', 'notes.md'])
+        self.assertEqual(self.read_output('notes.html'), "<header><h1>Notes</h1><nav>home | blog</nav></header><div><h1>Notes</h1></div>")
+
+    def test_page_content_change_only_rebuilds_the_page(self):
+        # the pages linking to about.md only depend on its existence
+        self.write_page('about.md', "# About us")
+        self.assertRebuilds(['about.md'])
+
+    def test_added_link_target_only_renders_the_target(self):
+        # the html of the pages linking to a target doesn't depend on whether it exists
+        self.write_page('blog/third.md', "# Third")
+        self.assertRebuilds(['blog/third.md'])
+        self.write_page('static/logo.png', "png")
+        self.assertRebuilds([])
+        self.assertEqual(self.manifest_graph().pages['about.md']['links'], [os.path.join('static', 'logo.png')])
+
+    def test_removed_link_target_only_removes_the_target(self):
+        os.remove(os.path.join(self.content_dir, 'blog', 'first.md'))
+        report = self.build()
+        self.assertEqual(report.removed, [os.path.join('blog', 'first.md')])
+        self.assertEqual(report.rendered, [])
+        self.assertIn(os.path.join('blog', 'first.md'), self.manifest_graph().pages[os.path.join('blog', 'index.md')]['links'])
+
+    def test_removed_link_is_forgotten(self):
+        self.write_page('index.md', "# Home")
+        self.assertRebuilds(['index.md'])
+        os.remove(os.path.join(self.content_dir, 'about.md'))
+        self.assertEqual(self.build().rendered, [])
+
+    def manifest_graph(self) -> DependencyGraph:
+        return BuildManifest.load(self.manifest_path).graph
+
+    def test_graph_is_persisted(self):
+        with open(self.manifest_path) as file:
+            manifest = file.read()
+        self.assertIn('"links"', manifest)
+        self.assertIn(os.path.join('partials', 'nav.html'), manifest)
+
+
+if __name__ == '__main__':
+    unittest.main()
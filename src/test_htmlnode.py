@@ -1,6 +1,10 @@
+import io
+import sys
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import (
+    clear_props_table, FrozenLeafNode, HTMLNode, LeafNode, ParentNode, props_table_size, PROPS_TABLE_MAX_SIZE,
+)
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -338,5 +342,172 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(parent_node.to_html(), expecting_string)
 
 
+class TestCompactNodes(unittest.TestCase):
+    def test_slots(self):
+        for node in (HTMLNode("p", "text"), LeafNode("b", "text"), ParentNode("div", [LeafNode(None, "text")])):
+            self.assertFalse(hasattr(node, '__dict__'))
+
+    def test_leaf_trusted(self):
+        node = LeafNode.trusted("a", "link", {'href': 'https://boot.dev'})
+        self.assertIsInstance(node, LeafNode)
+        self.assertEqual(node, LeafNode("a", "link", {'href': 'https://boot.dev'}))
+        self.assertEqual(node.to_html(), '<a href="https://boot.dev">link</a>')
+        self.assertIsNone(LeafNode.trusted(None, "text").props)
+
+
+class TestFrozenLeafNode(unittest.TestCase):
+    def test_to_html(self):
+        props = {'href': 'https://boot.dev'}
+        node = FrozenLeafNode("a", "link", props)
+        self.assertEqual(node.to_html(), '<a href="https://boot.dev">link</a>')
+        self.assertEqual(node, LeafNode("a", "link", props))
+        props['href'] = 'https://example.com'  # the node keeps its own copy
+        self.assertEqual(node.to_html(), '<a href="https://boot.dev">link</a>')
+
+    def test_immutable(self):
+        node = FrozenLeafNode.trusted("b", "bold")
+        with self.assertRaises(AttributeError) as cm:
+            node.tag = "i"
+        self.assertEqual(str(cm.exception), "FrozenLeafNode is immutable, can't set tag")
+
+    def test_shared_between_parents(self):
+        shared = FrozenLeafNode("code", "x")
+        first = ParentNode("p", [shared, LeafNode(None, " and "), shared])
+        second = ParentNode("li", [shared])
+        self.assertEqual(first.to_html(), "<p><code>x</code> and <code>x</code></p>")
+        self.assertEqual(second.to_html(), "<li><code>x</code></li>")
+
+
+class TestPropsCache(unittest.TestCase):
+    def setUp(self):
+        clear_props_table()
+
+    def test_cached_per_node(self):
+        node = LeafNode("a", "link", {'href': 'https://boot.dev'})
+        self.assertEqual(node.props_to_html(), ' href="https://boot.dev"')
+        self.assertIs(node.props_to_html(), node.props_to_html())
+
+    def test_props_replaced(self):
+        node = LeafNode("a", "link", {'href': 'https://boot.dev'})
+        node.to_html()
+        node.props = {'href': 'https://example.com'}
+        self.assertEqual(node.to_html(), '<a href="https://example.com">link</a>')
+        node.props = None
+        self.assertEqual(node.to_html(), '<a>link</a>')
+
+    def test_props_mutated(self):
+        node = LeafNode("img", "", {'src': 'a.png', 'alt': 'a'})
+        self.assertEqual(node.props_to_html(), ' src="a.png" alt="a"')
+        node.props['alt'] = 'b'
+        self.assertEqual(node.props_to_html(), ' src="a.png" alt="b"')
+        del node.props['alt']
+        self.assertEqual(node.props_to_html(), ' src="a.png"')
+        node.props['alt'] = ''
+        self.assertEqual(node.props_to_html(), ' src="a.png"')
+
+    def test_props_mutated_after_render(self):
+        node = LeafNode("a", "x", {'href': '/a'})
+        self.assertEqual(node.to_html(), '<a href="/a">x</a>')
+        node.props['href'] = '/b'
+        self.assertEqual(node.to_html(), '<a href="/b">x</a>')
+
+    def test_shared_table(self):
+        first = LeafNode("a", "one", {'href': 'https://boot.dev'})
+        second = LeafNode.trusted("a", "two", {'href': 'https://boot.dev'})
+        self.assertIs(first.props_to_html(), second.props_to_html())
+        self.assertEqual(props_table_size(), 1)
+        LeafNode("a", "three", {'href': 'https://boot.dev', 'title': 'Boot'}).to_html()
+        self.assertEqual(props_table_size(), 2)
+
+    def test_shared_table_bounded(self):
+        for i in range(PROPS_TABLE_MAX_SIZE * 3 + 10):
+            LeafNode("a", "link", {'href': f"/page{i}"}).to_html()
+        self.assertLessEqual(props_table_size(), PROPS_TABLE_MAX_SIZE * 2)
+
+    def test_shared_table_keeps_recent_sets(self):
+        LeafNode("a", "link", {'href': "/home"}).to_html()
+        for i in range(PROPS_TABLE_MAX_SIZE * 3):
+            LeafNode("a", "link", {'href': f"/page{i}"}).to_html()
+            LeafNode("a", "link", {'href': "/home"}).to_html()
+        # the sets seen after the table filled up are shared too, and the ones not used for a while left
+        latest = {'href': f"/page{PROPS_TABLE_MAX_SIZE * 3 - 1}"}
+        self.assertIs(LeafNode("a", "one", latest).props_to_html(), LeafNode("a", "two", dict(latest)).props_to_html())
+        home = LeafNode("a", "one", {'href': "/home"}).props_to_html()
+        self.assertIs(home, LeafNode("a", "two", {'href': "/home"}).props_to_html())
+        self.assertLessEqual(props_table_size(), PROPS_TABLE_MAX_SIZE * 2)
+
+    def test_unhashable_values(self):
+        node = HTMLNode("p", "text", None, {'class': ['a', 'b']})
+        self.assertEqual(node.props_to_html(), " class=\"['a', 'b']\"")
+        self.assertEqual(props_table_size(), 0)
+
+
+class TestStreamingHTML(unittest.TestCase):
+    def setUp(self):
+        self.node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "Bold text"), LeafNode(None, "Normal text")]),
+                LeafNode("a", "link", {'href': 'https://boot.dev'}),
+            ],
+        )
+        self.expecting_string = '<div><p><b>Bold text</b>Normal text</p><a href="https://boot.dev">link</a></div>'
+
+    def test_iter_html(self):
+        chunks = list(self.node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), self.expecting_string)
+        self.assertEqual(''.join(chunks), self.node.to_html())
+
+    def test_write_html(self):
+        stream = io.StringIO()
+        self.node.write_html(stream)
+        self.assertEqual(stream.getvalue(), self.expecting_string)
+
+    def test_leaf_node(self):
+        node = LeafNode("i", "italic")
+        self.assertEqual(list(node.iter_html()), ["<i>italic</i>"])
+
+    def test_custom_child_node(self):
+        class CommentNode(HTMLNode):
+            def to_html(self) -> str:
+                return f"<!--{self.value}-->"
+
+        node = ParentNode("div", [CommentNode(value="note"), LeafNode(None, "text")])
+        self.assertEqual(''.join(node.iter_html()), "<div><!--note-->text</div>")
+
+    def test_invalid_child_raises(self):
+        node = ParentNode("div", [ParentNode("p", [])])
+        with self.assertRaises(ValueError) as cm:
+            node.write_html(io.StringIO())
+        self.assertEqual(str(cm.exception), "children value cannot be None, empty or missing")
+
+
+class TestDeepTrees(unittest.TestCase):
+    def nested_node(self, depth: int) -> ParentNode:
+        node = ParentNode("blockquote", [LeafNode(None, "deep")])
+        for _ in range(depth - 1):
+            node = ParentNode("blockquote", [node])
+        return node
+
+    def test_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 10
+        html = self.nested_node(depth).to_html()
+        self.assertEqual(html, "<blockquote>" * depth + "deep" + "</blockquote>" * depth)
+
+    def test_siblings_after_nested_children(self):
+        node = ParentNode("ul", [
+            ParentNode("li", [ParentNode("p", [LeafNode("b", "one")]), LeafNode(None, "tail")]),
+            LeafNode("li", "two"),
+        ])
+        self.assertEqual(node.to_html(), "<ul><li><p><b>one</b></p>tail</li><li>two</li></ul>")
+
+    def test_deep_invalid_child_raises(self):
+        node = ParentNode("div", [self.nested_node(5000), ParentNode("p", None)])
+        with self.assertRaises(ValueError) as cm:
+            node.to_html()
+        self.assertEqual(str(cm.exception), "children value cannot be None, empty or missing")
+
+
 if __name__ == "__main__":
     unittest.main()
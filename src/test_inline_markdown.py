@@ -1,14 +1,20 @@
+import io
+import random
 import unittest
 
 from inline_markdown import (
+    ALLOWED_DELIMITERS,
+    bytes_to_span_stream,
     extract_markdown_images,
     extract_markdown_links,
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
-    text_to_text_nodes
+    text_to_span_stream,
+    text_to_text_nodes,
+    tokenize_inline
 )
-from textnode import TextNode, TextType
+from textnode import TextNode, text_span_stream_to_html, TextType
 
 
 class TestSplitNodesDelimiter(unittest.TestCase):
@@ -323,6 +329,25 @@ class TestSplitNodesLink(unittest.TestCase):
         new_nodes = split_nodes_link([node])
         self.assertListEqual([TextNode("here is a simple text node", TextType.TEXT)], new_nodes)
 
+    def test_link_source_repeated_inside_image(self):
+        # the sections come from the match offsets, so the "[a](b)" inside the image is not split on
+        node = TextNode("![a](b) and [a](b)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertListEqual(
+            [
+                TextNode("![a](b) and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+            ],
+            new_nodes,
+        )
+
+    def test_many_links(self):
+        node = TextNode(''.join(f"[link {i}](/page/{i}) " for i in range(1000)), TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(len(new_nodes), 2000)
+        self.assertEqual(new_nodes[-2], TextNode("link 999", TextType.LINK, "/page/999"))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.TEXT))
+
 
 class TestTextToTextNode(unittest.TestCase):
     def test_multiple_node_types(self):
@@ -401,5 +426,139 @@ class TestTextToTextNode(unittest.TestCase):
         self.assertEqual(str(cm.exception), f"provide text has invalid type, found {type(text)} instead of str")
 
 
+def split_pipeline_text_to_text_nodes(text: str) -> list[TextNode]:
+    """Reference implementation: the chained split pipeline that tokenize_inline replaced."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    for delimiter, text_type in ALLOWED_DELIMITERS.items():
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    return nodes
+
+
+class TestTokenizeInline(unittest.TestCase):
+    def test_spans_are_offsets(self):
+        text = "a **b** ![c](d.png)"
+        result = tokenize_inline(text)
+        expected_result = [
+            (TextType.TEXT, 0, 2, None),
+            (TextType.BOLD, 4, 5, None),
+            (TextType.TEXT, 7, 8, None),
+            (TextType.IMAGE, 10, 11, "d.png"),
+        ]
+        self.assertEqual(result, expected_result)
+
+    def test_delimiters_inside_bold_are_kept(self):
+        text = "**a _b_ `c`** and _d_"
+        expected_result = [
+            TextNode("", TextType.TEXT),
+            TextNode("a _b_ `c`", TextType.BOLD),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("d", TextType.ITALIC),
+            TextNode("", TextType.TEXT),
+        ]
+        self.assertEqual(text_to_text_nodes(text), expected_result)
+
+    def test_lowest_delimiter_error_is_reported(self):
+        # both "_" and "`" are unbalanced, the split pipeline processes "_" first
+        with self.assertRaises(ValueError) as cm:
+            text_to_text_nodes("`a ![b](c) _d")
+        self.assertEqual(str(cm.exception), 'provided old_nodes contains an invalid Markdown syntax, the number of "_" delimiters is odd.')
+
+    def test_image_inside_link_url(self):
+        # the pipeline splits the images out first, so the link that would contain the image start is not one
+        for text in ["[a](x![y)](z)", "[x](_a**x`![`)]()", "[a](![b](c)"]:
+            try:
+                expected_result = split_pipeline_text_to_text_nodes(text)
+            except ValueError as error:
+                with self.assertRaises(ValueError) as cm:
+                    text_to_text_nodes(text)
+                self.assertEqual(str(cm.exception), str(error))
+                continue
+            self.assertEqual(text_to_text_nodes(text), expected_result, text)
+        self.assertEqual(
+            text_to_text_nodes("[a](x![y)](z)"),
+            [TextNode("[a](x", TextType.TEXT), TextNode("y)", TextType.IMAGE, "z")],
+        )
+
+    def test_matches_split_pipeline(self):
+        rng = random.Random(0)
+        # the link and image halves make links whose url holds the start of an image
+        pieces = ["a", " ", "*", "**", "_", "`", "```", "![x](y.png)", "[l](u)", "!", "[", "]", "(", ")", "[a](x", "![", "y)](z)"]
+        for _ in range(5000):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+            try:
+                expected_result = split_pipeline_text_to_text_nodes(text)
+            except ValueError as error:
+                with self.assertRaises(ValueError) as cm:
+                    text_to_text_nodes(text)
+                self.assertEqual(str(cm.exception), str(error))
+                continue
+            self.assertEqual(text_to_text_nodes(text), expected_result, text)
+
+
+class TestTextToSpanStream(unittest.TestCase):
+    def test_spans_are_columns(self):
+        stream = text_to_span_stream("a **b** [c](d.html)")
+        self.assertEqual(list(stream.starts), [0, 4, 7, 9])
+        self.assertEqual(list(stream.ends), [2, 5, 8, 10])
+        self.assertEqual(stream.urls, {3: "d.html"})
+        self.assertEqual(stream.kinds.typecode, 'B')
+
+    def test_view_matches_text_nodes(self):
+        rng = random.Random(1)
+        pieces = ["a", " ", "*", "**", "_", "`", "![x](y.png)", "[l](u)", "[", "]"]
+        for _ in range(2000):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            try:
+                expected_result = text_to_text_nodes(text)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    text_to_span_stream(text)
+                continue
+            stream = text_to_span_stream(text)
+            self.assertEqual(len(stream), len(expected_result))
+            self.assertEqual(list(stream), expected_result, text)
+            if expected_result:
+                self.assertEqual(stream[-1], expected_result[-1])
+
+    def test_invalid_text(self):
+        with self.assertRaises(ValueError):
+            text_to_span_stream(None)
+
+
+class TestBytesToSpanStream(unittest.TestCase):
+    def write_html(self, data) -> str:
+        out = io.BytesIO()
+        bytes_to_span_stream(data).write_html(out)
+        return out.getvalue().decode('utf-8')
+
+    def test_matches_text_spans(self):
+        rng = random.Random(2)
+        pieces = ["a", "é", " ", "*", "**", "_", "`", "![x](y.png)", "![ü](ñ.png)", "[l](u)", "[](/e)", "[", "]", "€"]
+        for _ in range(2000):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            try:
+                expected_result = text_to_text_nodes(text)
+            except ValueError as error:
+                with self.assertRaises(ValueError) as cm:
+                    bytes_to_span_stream(text.encode('utf-8'))
+                self.assertEqual(str(cm.exception), str(error))
+                continue
+            self.assertEqual(list(bytes_to_span_stream(text.encode('utf-8'))), expected_result, text)
+            self.assertEqual(self.write_html(text.encode('utf-8')), text_span_stream_to_html(text_to_span_stream(text)), text)
+
+    def test_offsets_are_bytes(self):
+        stream = bytes_to_span_stream("é **b** [c](d)".encode('utf-8'))
+        self.assertEqual(list(stream.starts), [0, 5, 8, 10])
+        self.assertEqual(stream.urls, {3: (13, 14)})
+
+    def test_view_of_a_larger_buffer(self):
+        data = "# title\n\nsome *text* [here](/h.html)\n\nnext".encode('utf-8')
+        start = data.index(b'some')
+        view = memoryview(data)[start:data.index(b'\n\nnext')]
+        self.assertEqual(self.write_html(view), 'some <i>text</i> <a href="/h.html">here</a>')
+
+
 if __name__ == '__main__':
     unittest.main()
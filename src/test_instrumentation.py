@@ -0,0 +1,109 @@
+import os
+import pstats
+import tempfile
+import unittest
+
+from block_markdown import markdown_to_blocks
+from htmlnode import LeafNode, ParentNode
+import instrumentation
+import markdown_html
+from markdown_html import markdown_to_html
+
+MARKDOWN = "# Title\n\nA paragraph with **bold** and a [link](https://boot.dev).\n\n- one\n- two"
+
+
+class TestInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_by_default(self):
+        self.assertFalse(instrumentation.is_enabled())
+        markdown_to_html(MARKDOWN)
+        self.assertEqual(instrumentation.stats()['text_to_text_nodes'].calls, 0)
+
+    def test_counts(self):
+        with instrumentation.instrumented() as stats:
+            html = markdown_to_html(MARKDOWN)
+        self.assertEqual(html, markdown_to_html(MARKDOWN))
+        self.assertEqual(stats['markdown_to_blocks'].calls, 1)
+        self.assertEqual(stats['markdown_to_blocks'].bytes, len(MARKDOWN))
+        self.assertEqual(stats['markdown_to_blocks'].nodes, 3)
+        self.assertEqual(stats['block_to_block_type'].calls, 3)
+        self.assertEqual(stats['text_to_text_nodes'].calls, 4)
+        self.assertEqual(stats['text_to_text_nodes'].nodes, 8)
+        self.assertEqual(stats['text_node_to_html_node'].calls, 8)
+        self.assertGreater(stats['to_html'].calls, 1)
+        self.assertGreater(stats['to_html'].seconds, 0)
+
+    def test_nested_calls_timed_once(self):
+        node = ParentNode("p", [LeafNode("b", "bold")] * 1000)
+        with instrumentation.instrumented() as stats:
+            node.to_html()
+        self.assertEqual(stats['to_html'].calls, 1001)
+        self.assertEqual(stats['to_html'].bytes, len(node.to_html()))
+        self.assertEqual(stats['to_html'].nodes, 1)
+
+    def test_keyword_arguments(self):
+        with instrumentation.instrumented() as stats:
+            blocks = instrumentation.block_markdown.markdown_to_blocks(markdown="a\n\nb")
+            nodes = markdown_html.text_to_text_nodes(text="a **b**")
+        self.assertEqual(blocks, ["a", "b"])
+        self.assertEqual(stats['markdown_to_blocks'].bytes, len("a\n\nb"))
+        self.assertEqual(stats['text_to_text_nodes'].nodes, len(nodes))
+
+    def test_only_site_modules_patched(self):
+        instrumentation.enable()
+        self.assertIsNot(markdown_html.markdown_to_blocks, markdown_to_blocks)
+        self.assertIs(globals()['markdown_to_blocks'], markdown_to_blocks)
+
+    def test_restores_functions(self):
+        original = markdown_html.text_to_text_nodes
+        original_to_html = LeafNode.to_html
+        instrumentation.enable()
+        self.assertIsNot(markdown_html.text_to_text_nodes, original)
+        self.assertIsNot(LeafNode.to_html, original_to_html)
+        instrumentation.disable()
+        self.assertIs(markdown_html.text_to_text_nodes, original)
+        self.assertIs(LeafNode.to_html, original_to_html)
+        self.assertIs(instrumentation.block_markdown.markdown_to_blocks, markdown_to_blocks)
+
+    def test_exception_still_counted(self):
+        with instrumentation.instrumented() as stats:
+            with self.assertRaises(ValueError):
+                markdown_html.text_to_children("an *unclosed delimiter")
+        self.assertEqual(stats['text_to_text_nodes'].calls, 1)
+        self.assertEqual(stats['text_to_text_nodes'].bytes, 0)
+
+    def test_format_stats(self):
+        with instrumentation.instrumented():
+            markdown_to_html(MARKDOWN)
+        lines = instrumentation.format_stats().split('\n')
+        self.assertEqual(len(lines), len(instrumentation.STAGES) + 1)
+        self.assertTrue(lines[1].startswith('markdown_to_blocks'))
+
+
+class TestProfilePage(unittest.TestCase):
+    def test_cprofile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'page.pstats')
+            instrumentation.profile_page(MARKDOWN, path)
+            functions = {name for _, _, name in pstats.Stats(path).stats}
+        self.assertIn('text_to_text_nodes', functions)
+
+    def test_collapsed_stacks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'page.folded')
+            instrumentation.profile_page(MARKDOWN, path)
+            with open(path) as file:
+                lines = file.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, microseconds = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith('markdown_to_html (markdown_html.py'))
+            self.assertGreater(int(microseconds), 0)
+        self.assertTrue(any('tokenize_inline' in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from block_markdown import block_to_block_type, BlockType, markdown_to_blocks
+from inline_markdown import text_to_text_nodes
+from markdown_corpus import CorpusGenerator, generate_document
+from markdown_html import markdown_to_html_node
+from textnode import TextType
+
+
+class TestCorpusGenerator(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(generate_document(10_000, seed=1), generate_document(10_000, seed=1))
+        self.assertNotEqual(generate_document(10_000, seed=1), generate_document(10_000, seed=2))
+
+    def test_size(self):
+        for size in (0, 1_000, 50_000):
+            self.assertGreaterEqual(len(generate_document(size)), size)
+        self.assertLess(len(generate_document(50_000)), 52_000)
+
+    def test_covers_every_block_type(self):
+        markdown = generate_document(0)
+        block_types = {block_to_block_type(block) for block in markdown_to_blocks(markdown)}
+        self.assertEqual(block_types, set(BlockType))
+
+    def test_covers_every_text_type(self):
+        generator = CorpusGenerator(seed=0)
+        text_types = {node.text_type for node in text_to_text_nodes(generator.inline_text(200))}
+        self.assertEqual(text_types, set(TextType))
+
+    def test_renders(self):
+        for seed in range(5):
+            html = markdown_to_html_node(generate_document(20_000, seed)).to_html()
+            self.assertTrue(html.startswith("<div>"))
+
+    def test_block_mix(self):
+        markdown = generate_document(5_000, block_mix={BlockType.CODE: 1.0, BlockType.QUOTE: 0.0})
+        block_types = {block_to_block_type(block) for block in markdown_to_blocks(markdown)}
+        self.assertEqual(block_types, {BlockType.CODE})
+
+    def test_inline_mix(self):
+        generator = CorpusGenerator(inline_mix={TextType.LINK: 1.0})
+        nodes = text_to_text_nodes(generator.inline_text(20))
+        self.assertEqual({node.text_type for node in nodes}, {TextType.TEXT, TextType.LINK})
+        self.assertEqual(sum(node.text_type == TextType.LINK for node in nodes), 20)
+
+    def test_empty_mix(self):
+        with self.assertRaises(ValueError):
+            CorpusGenerator(block_mix={BlockType.CODE: 0.0})
+        with self.assertRaises(ValueError):
+            CorpusGenerator(inline_mix={})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,247 @@
+import unittest
+from unittest import mock
+
+import random
+
+from block_cache import BlockCache
+from block_markdown import block_to_block_type, markdown_to_blocks
+from markdown_corpus import CorpusGenerator, generate_document
+import markdown_html
+from markdown_html import (
+    block_inline_texts, block_to_html_node, markdown_to_html, markdown_to_html_node, render_blocks,
+)
+
+
+class TestBlockToHTMLNode(unittest.TestCase):
+    def test_heading(self):
+        self.assertEqual(block_to_html_node("### A **bold** heading").to_html(), "<h3>A <b>bold</b> heading</h3>")
+
+    def test_code(self):
+        block = "```python\nprint('**not bold**')\n```"
+        self.assertEqual(block_to_html_node(block).to_html(), "<pre><code>print('**not bold**')\n</code></pre>")
+
+    def test_quote(self):
+        block = "> a quote\n>with _italic_ text"
+        self.assertEqual(block_to_html_node(block).to_html(), "<blockquote>a quote with <i>italic</i> text</blockquote>")
+
+    def test_unordered_list(self):
+        block = "- first\n- `second`"
+        self.assertEqual(block_to_html_node(block).to_html(), "<ul><li>first</li><li><code>second</code></li></ul>")
+
+    def test_ordered_list(self):
+        block = "1. first\n2. [second](https://boot.dev)"
+        self.assertEqual(
+            block_to_html_node(block).to_html(),
+            '<ol><li>first</li><li><a href="https://boot.dev">second</a></li></ol>',
+        )
+
+    def test_paragraph(self):
+        block = "a paragraph\non two lines"
+        self.assertEqual(block_to_html_node(block).to_html(), "<p>a paragraph on two lines</p>")
+
+
+class TestBlockInlineTexts(unittest.TestCase):
+    def test_block_types(self):
+        cases = {
+            "### A **bold** heading": ["A **bold** heading"],
+            "```python\nprint('**not bold**')\n```": [],
+            "> a quote\n>with _italic_ text": ["a quote with _italic_ text"],
+            "- first\n- `second`": ["first", "`second`"],
+            "1. first\n2. [second](https://boot.dev)": ["first", "[second](https://boot.dev)"],
+            "a paragraph\non two lines": ["a paragraph on two lines"],
+        }
+        for block, texts in cases.items():
+            self.assertEqual(block_inline_texts(block, block_to_block_type(block)), texts, block)
+
+    def test_texts_are_those_rendered(self):
+        with mock.patch.object(markdown_html, 'text_to_children', wraps=markdown_html.text_to_children) as text_to_children:
+            for block in markdown_to_blocks(generate_document(16 * 1024, 4)):
+                text_to_children.reset_mock()
+                block_to_html_node(block)
+                rendered = [call.args[0] for call in text_to_children.call_args_list]
+                self.assertEqual(block_inline_texts(block, block_to_block_type(block)), rendered, block)
+
+
+class TestMarkdownToHTMLNode(unittest.TestCase):
+    def test_document(self):
+        md = """
+# Title
+
+This is **bolded** paragraph
+text in a p
+tag here
+
+- item
+"""
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><h1>Title</h1><p>This is <b>bolded</b> paragraph text in a p tag here</p><ul><li>item</li></ul></div>",
+        )
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html_node("").to_html(), "<div></div>")
+
+
+class TestMarkdownToHTML(unittest.TestCase):
+    def test_cached_blocks_render_the_same(self):
+        md = "# Title\n\nshared **footer**\n\n- item\n\nshared **footer**"
+        cache = BlockCache()
+        self.assertEqual(markdown_to_html(md, cache), markdown_to_html_node(md).to_html())
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        self.assertEqual(markdown_to_html(md, cache), markdown_to_html(md))
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html("", BlockCache()), markdown_to_html_node("").to_html())
+
+
+class TestRenderBlocks(unittest.TestCase):
+    def setUp(self):
+        self.blocks = markdown_to_blocks(generate_document(5_000))
+
+    def render(self, blocks: list[str], previous=None, block_cache=None):
+        markdown = '\n\n'.join(blocks)
+        rendered = render_blocks(markdown, previous, block_cache)
+        self.assertEqual(rendered.to_html(), markdown_to_html(markdown))
+        return rendered
+
+    def test_first_render(self):
+        rendered = self.render(self.blocks)
+        self.assertEqual(rendered.reparsed, len(self.blocks))
+        self.assertEqual(rendered.blocks, self.blocks)
+
+    def test_unchanged(self):
+        previous = self.render(self.blocks)
+        self.assertEqual(self.render(self.blocks, previous).reparsed, 0)
+
+    def test_edited_block(self):
+        previous = self.render(self.blocks)
+        edited = self.blocks.copy()
+        edited[5] = "An edited **paragraph**"
+        self.assertEqual(self.render(edited, previous).reparsed, 1)
+
+    def test_inserted_and_removed_blocks(self):
+        previous = self.render(self.blocks)
+        edited = self.blocks[:3] + ["A new paragraph", "- a new list"] + self.blocks[3:-2]
+        self.assertEqual(self.render(edited, previous).reparsed, 2)
+        self.assertEqual(self.render(self.blocks[1:], previous).reparsed, 0)
+
+    def test_moved_blocks(self):
+        previous = self.render(self.blocks)
+        edited = self.blocks.copy()
+        edited[2], edited[7] = edited[7], edited[2]
+        self.assertEqual(self.render(edited, previous).reparsed, 0)
+
+    def test_empty_documents(self):
+        previous = self.render([])
+        self.assertEqual(previous.to_html(), "<div></div>")
+        rendered = self.render(self.blocks, previous)
+        self.assertEqual(self.render([], rendered).reparsed, 0)
+
+    def test_random_edits(self):
+        rng = random.Random(0)
+        generator = CorpusGenerator(seed=1)
+        blocks = self.blocks
+        previous = self.render(blocks)
+        for _ in range(200):
+            blocks = blocks.copy()
+            position = rng.randrange(len(blocks) + 1)
+            match rng.randrange(3):
+                case 0:
+                    blocks.insert(position, generator.block(rng.choice(list(generator.block_mix))))
+                case 1 if blocks:
+                    del blocks[min(position, len(blocks) - 1)]
+                case _:
+                    blocks[min(position, len(blocks) - 1):position + 1] = [generator.inline_text(3)]
+            previous = self.render(blocks, previous)
+
+    def test_block_cache(self):
+        block_cache = BlockCache()
+        previous = self.render(self.blocks, block_cache=block_cache)
+        edited = self.blocks + ["A new paragraph"]
+        self.render(edited, previous, block_cache)
+        self.assertEqual(block_cache.misses, len(set(self.blocks)) + 1)
+
+
+class TestRenderedTitleAndUrls(unittest.TestCase):
+    def test_links_and_images(self):
+        markdown = "# [Home](/index.html)\n\n![logo](/logo.png) and [about](about.html)\n\n- [a](a.html)\n- **b** [b](b.html)"
+        self.assertEqual(render_blocks(markdown).urls, ['/index.html', '/logo.png', 'about.html', 'a.html', 'b.html'])
+
+    def test_code_blocks_are_skipped(self):
+        self.assertEqual(render_blocks("```\n[a](a.html)\n```\n\n`code` [b](b.html)").urls, ['b.html'])
+
+    def test_title(self):
+        self.assertEqual(render_blocks("intro\n\n#  Hello  \n\n## Sub\n\n# Second").title, "Hello")
+
+    def test_same_with_block_cache(self):
+        for seed in range(5):
+            markdown = "intro\n\n# Title\n\n" + generate_document(3_000, seed)
+            rendered = render_blocks(markdown)
+            cached = render_blocks(markdown, block_cache=BlockCache())
+            self.assertEqual(rendered.to_html(), markdown_to_html(markdown))
+            self.assertEqual(cached.to_html(), rendered.to_html())
+            self.assertEqual(rendered.title, "Title")
+            self.assertEqual((cached.title, cached.urls), (rendered.title, rendered.urls))
+
+    def test_after_an_edit(self):
+        previous = render_blocks("# Old\n\n[a](a.html)\n\nkept")
+        rendered = render_blocks("# New\n\n[b](b.html)\n\nkept", previous)
+        self.assertEqual(rendered.title, "New")
+        self.assertEqual(rendered.urls, ['b.html'])
+
+    def test_without_title(self):
+        rendered = render_blocks("## Only a subtitle\n\n[a](a.html)")
+        self.assertIsNone(rendered.title)
+        self.assertEqual(rendered.urls, ['a.html'])
+
+    def test_one_pass_over_the_blocks(self):
+        markdown = generate_document(3_000)
+        with mock.patch.object(markdown_html, 'markdown_to_blocks', wraps=markdown_to_blocks) as split, \
+                mock.patch.object(markdown_html, 'block_to_block_type', wraps=markdown_html.block_to_block_type) as block_type:
+            render_blocks(markdown)
+        self.assertEqual(split.call_count, 1)
+        self.assertEqual(block_type.call_count, len(markdown_to_blocks(markdown)))
+
+    def test_one_block_edit_types_and_scans_one_block(self):
+        blocks = markdown_to_blocks("# Title\n\n" + generate_document(5_000))
+        previous = render_blocks('\n\n'.join(blocks))
+        blocks[len(blocks) // 2] = "An [edited](edited.html) paragraph"
+        edited = '\n\n'.join(blocks)
+        with mock.patch.object(markdown_html, 'block_to_block_type', wraps=markdown_html.block_to_block_type) as block_type, \
+                mock.patch.object(markdown_html, 'extract_link_urls', wraps=markdown_html.extract_link_urls) as link_urls:
+            rendered = render_blocks(edited, previous)
+        self.assertEqual(block_type.call_count, 1)
+        self.assertEqual(link_urls.call_count, 1)
+        self.assertEqual(rendered.title, "Title")
+        self.assertEqual(rendered.urls, render_blocks(edited).urls)
+
+    def test_matches_full_render_after_edits(self):
+        rng = random.Random(7)
+        blocks = markdown_to_blocks(generate_document(3_000)) + ["# First", "# Second", "[a](a.html)"]
+        previous = None
+        for _ in range(200):
+            edited = blocks.copy()
+            index = rng.randrange(len(edited))
+            match rng.randrange(4):
+                case 0:
+                    del edited[index]
+                case 1:
+                    edited.insert(index, rng.choice(["# Inserted", "[b](b.html)", "plain"]))
+                case 2:
+                    edited[index] = rng.choice(["# Replaced", "![c](c.png)", "more"])
+                case _:
+                    edited.insert(index, edited.pop(rng.randrange(len(edited))))
+            if not edited:
+                continue
+            blocks = edited
+            markdown = '\n\n'.join(blocks)
+            previous = render_blocks(markdown, previous)
+            expected = render_blocks(markdown)
+            self.assertEqual(previous.to_html(), expected.to_html())
+            self.assertEqual(previous.title, expected.title)
+            self.assertEqual(previous.urls, expected.urls)
+            self.assertEqual(previous.block_types, expected.block_types)
+
+if __name__ == "__main__":
+    unittest.main()
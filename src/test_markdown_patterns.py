@@ -0,0 +1,24 @@
+import unittest
+
+from markdown_patterns import HEADING_PATTERN, IMAGE_PATTERN, LINK_PATTERN, ORDERED_LIST_ITEM_PATTERN
+
+
+class TestMarkdownPatterns(unittest.TestCase):
+    def test_heading_is_anchored(self):
+        self.assertIsNotNone(HEADING_PATTERN.match('### h3 heading'))
+        self.assertIsNone(HEADING_PATTERN.match('not a ### heading'))
+        self.assertIsNone(HEADING_PATTERN.match('####### h7 heading'))
+        self.assertIsNone(HEADING_PATTERN.match('#no space'))
+
+    def test_ordered_list_item_is_anchored(self):
+        self.assertEqual(ORDERED_LIST_ITEM_PATTERN.match('12. item').group(1), '12')
+        self.assertIsNone(ORDERED_LIST_ITEM_PATTERN.match('item 12.'))
+
+    def test_link_is_not_an_image(self):
+        text = "![image](a.png) [link](b.html)"
+        self.assertEqual(IMAGE_PATTERN.findall(text), [('image', 'a.png')])
+        self.assertEqual(LINK_PATTERN.findall(text), [('link', 'b.html')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import unittest
+
+import nested_inline
+from htmlnode import LeafNode, ParentNode
+from markdown_corpus import CorpusGenerator, WORST_CASE_INLINE_TEXTS
+from markdown_html import text_to_children
+from nested_inline import parse_nested_inline
+
+
+def to_html(text: str) -> str:
+    return ''.join(node.to_html() for node in parse_nested_inline(text))
+
+
+class TestParseNestedInline(unittest.TestCase):
+    def test_nested_emphasis(self):
+        self.assertEqual(to_html("**bold _and italic_**"), "<b>bold <i>and italic</i></b>")
+        self.assertEqual(to_html("*italic **and bold***"), "<i>italic <b>and bold</b></i>")
+        self.assertEqual(to_html("***both***"), "<i><b>both</b></i>")
+        self.assertEqual(to_html("*a **b _c **d** c_ b** a*"), "<i>a <b>b <i>c <b>d</b> c</i> b</b> a</i>")
+
+    def test_tree(self):
+        nodes = parse_nested_inline("x **b _i_**")
+        self.assertEqual(len(nodes), 2)
+        self.assertIs(type(nodes[0]), LeafNode)
+        self.assertEqual(nodes[0].value, "x ")
+        self.assertIs(type(nodes[1]), ParentNode)
+        self.assertEqual(nodes[1].tag, "b")
+        self.assertEqual(nodes[1].children[1].tag, "i")
+
+    def test_order_of_delimiters_does_not_matter(self):
+        self.assertEqual(to_html("_a **b** c_"), "<i>a <b>b</b> c</i>")
+        self.assertEqual(to_html("**a _b_ c**"), "<b>a <i>b</i> c</b>")
+
+    def test_unmatched_delimiters_are_text(self):
+        self.assertEqual(to_html("*a"), "*a")
+        self.assertEqual(to_html("a * b"), "a * b")
+        self.assertEqual(to_html("**a*"), "*<i>a</i>")
+        self.assertEqual(to_html("*foo**bar*"), "<i>foo**bar</i>")
+
+    def test_intraword_underscores(self):
+        self.assertEqual(to_html("snake_case_name and *in*word"), "snake_case_name and <i>in</i>word")
+
+    def test_code_spans(self):
+        self.assertEqual(to_html("`a *b*` *c*"), "<code>a *b*</code> <i>c</i>")
+        self.assertEqual(to_html("``a ` b`` x"), "<code>a ` b</code> x")
+        self.assertEqual(to_html("**`code` inside**"), "<b><code>code</code> inside</b>")
+        self.assertEqual(to_html("`unclosed *x*"), "`unclosed <i>x</i>")
+
+    def test_links_and_images(self):
+        self.assertEqual(
+            to_html("**see [docs](/d.html) and ![logo](/l.png)**"),
+            '<b>see <a href="/d.html">docs</a> and <img src="/l.png" alt="logo"></img></b>'
+        )
+        self.assertEqual(to_html("![a]b [c](d)"), '![a]b <a href="d">c</a>')
+
+    def test_empty(self):
+        self.assertEqual(to_html(""), "")
+
+    def test_invalid_text(self):
+        with self.assertRaises(ValueError):
+            parse_nested_inline(None)
+
+    def test_matches_flat_parser_without_nesting(self):
+        generator = CorpusGenerator(3)
+        for _ in range(500):
+            text = generator.inline_text(8)
+            self.assertEqual(to_html(text), ''.join(node.to_html() for node in text_to_children(text)), text)
+
+
+class TestParseNestedInlineWorstCases(unittest.TestCase):
+    """Inputs that make a naive delimiter matching quadratic, or overflow a recursive tree walk."""
+    def executed_lines(self, text: str) -> int:
+        """The number of lines of nested_inline run while parsing text, a measure of work that does not depend on load."""
+        count = 0
+
+        def trace_line(frame, event, arg):
+            nonlocal count
+            if event == 'line':
+                count += 1
+            return trace_line
+
+        sys.settrace(lambda frame, event, arg: trace_line if frame.f_code.co_filename == nested_inline.__file__ else None)
+        try:
+            parse_nested_inline(text)
+        finally:
+            sys.settrace(None)
+        return count
+
+    def test_linear_work(self):
+        # four times the input runs about four times the lines, a quadratic parser sixteen times
+        for name, make in WORST_CASE_INLINE_TEXTS.items():
+            small, large = self.executed_lines(make(250)), self.executed_lines(make(1000))
+            self.assertLess(large / small, 5, name)
+
+    def test_deep_nesting(self):
+        depth = 5000
+        html = to_html("*a " * depth + "b" + " c*" * depth)
+        self.assertTrue(html.startswith("<i>a <i>a "))
+        self.assertEqual(html.count("<i>"), depth)
+
+    def test_many_unclosed_delimiters_are_kept(self):
+        text = "*a _b **c " * 1000
+        self.assertEqual(to_html(text), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+from templates import clear_template_cache, compile_template, get_template, load_template
+
+
+class TemplateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.root = self.temporary_directory.name
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+
+class TestLoadTemplate(TemplateTestCase):
+    def test_without_includes(self):
+        path = self.write('template.html', "<title>{{ Title }}</title>{{ Content }}")
+        template = load_template(path)
+        self.assertEqual(template.text, "<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(list(template.files), [path])
+        self.assertEqual(template.includes, {path: []})
+
+    def test_nested_includes(self):
+        path = self.write('template.html', "{{> partials/head.html }}<body>{{ Content }}</body>")
+        head_path = self.write('partials/head.html', "<head>{{>meta.html}}</head>")
+        meta_path = self.write('partials/meta.html', "<title>{{ Title }}</title>")
+        template = load_template(path)
+        self.assertEqual(template.text, "<head><title>{{ Title }}</title></head><body>{{ Content }}</body>")
+        self.assertEqual(template.includes, {path: [head_path], head_path: [meta_path], meta_path: []})
+        self.assertEqual(set(template.files), {path, head_path, meta_path})
+
+    def test_missing_include(self):
+        path = self.write('template.html', "{{> missing.html }}")
+        with self.assertRaises(FileNotFoundError):
+            load_template(path)
+
+    def test_include_cycle(self):
+        path = self.write('template.html', "{{> a.html }}")
+        self.write('a.html', "{{> b.html }}")
+        self.write('b.html', "{{> a.html }}")
+        with self.assertRaises(ValueError):
+            load_template(path)
+
+
+class TestCompileTemplate(unittest.TestCase):
+    def test_render(self):
+        template = compile_template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.parts, ["<title>", "{{ Title }}", "</title><main>", "{{ Content }}", "</main>"])
+        self.assertEqual(template.render({'Title': "Home", 'Content': "<p>hi</p>"}), "<title>Home</title><main><p>hi</p></main>")
+
+    def test_repeated_and_adjacent_slots(self):
+        template = compile_template("{{ Title }}{{Title}} {{ Content }}")
+        self.assertEqual(template.render({'Title': "a", 'Content': "b"}), "aa b")
+
+    def test_missing_value_keeps_the_placeholder(self):
+        template = compile_template("<p>{{ Date }}</p>{{ Content }}")
+        self.assertEqual(template.render({'Content': "x"}), "<p>{{ Date }}</p>x")
+
+    def test_values_are_not_scanned_for_slots(self):
+        template = compile_template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(template.render({'Title': "{{ Content }}", 'Content': "x"}), "<title>{{ Content }}</title>x")
+
+    def test_without_slots(self):
+        self.assertEqual(compile_template("<html></html>").render({'Title': "a"}), "<html></html>")
+        self.assertEqual(compile_template("").render({}), "")
+
+
+class TestGetTemplate(TemplateTestCase):
+    def setUp(self):
+        super().setUp()
+        clear_template_cache()
+        self.path = self.write('template.html', "{{> head.html }}{{ Content }}")
+        self.head_path = self.write('head.html', "<title>{{ Title }}</title>")
+
+    def touch(self, path: str) -> None:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_unchanged_template_is_cached(self):
+        self.assertIs(get_template(self.path), get_template(self.path))
+
+    def test_touched_template_with_the_same_content(self):
+        template = get_template(self.path)
+        self.touch(self.head_path)
+        self.assertIs(get_template(self.path), template)
+
+    def test_changed_include(self):
+        template = get_template(self.path)
+        self.write('head.html', "<title>{{ Title }} | Site</title>")
+        self.touch(self.head_path)
+        changed = get_template(self.path)
+        self.assertIsNot(changed, template)
+        self.assertEqual(changed.compiled.render({'Title': "a", 'Content': "b"}), "<title>a | Site</title>b")
+
+
+if __name__ == '__main__':
+    unittest.main()
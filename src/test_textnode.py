@@ -1,6 +1,11 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from htmlnode import FrozenLeafNode, LeafNode, props_table_size
+from inline_markdown import bytes_to_span_stream, text_to_span_stream, text_to_text_nodes
+from textnode import (
+    clear_interned_html_nodes, INTERNED_TEXT_MAX_LENGTH, TextNode, TextSpanStream, TextType, text_node_to_html_node,
+    text_span_stream_to_html,
+)
 
 
 class TestTextNode(unittest.TestCase):
@@ -101,6 +106,18 @@ class TestTextNode(unittest.TestCase):
         node = TextNode(text, text_type)
         self.assertEqual(repr(node), f'TextNode({text}, {text_type.value}, {None})')
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, '__dict__'))
+        with self.assertRaises(AttributeError):
+            node.other = 1
+
+    def test_trusted(self):
+        node = TextNode.trusted("anchor text", TextType.LINK, "https://boot.dev")
+        self.assertIsInstance(node, TextNode)
+        self.assertEqual(node, TextNode("anchor text", TextType.LINK, "https://boot.dev"))
+        self.assertIsNone(TextNode.trusted("text", TextType.TEXT).url)
+
 
 class TestTextToNode(unittest.TestCase):
     def test_text(self):
@@ -145,5 +162,110 @@ class TestTextToNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {'src': 'https://boot.dev/images/sample.png', 'alt': 'alt text'})
 
+    def test_invalid_text_is_rejected(self):
+        node = TextNode("bold", TextType.BOLD)
+        node.text = 42
+        with self.assertRaises(TypeError):
+            text_node_to_html_node(node)
+        with self.assertRaises(TypeError):
+            text_node_to_html_node(node, intern=True)
+
+    def test_trusted(self):
+        for node in [TextNode("plain", TextType.TEXT), TextNode("docs", TextType.LINK, "/docs")]:
+            html_node = text_node_to_html_node(node, trusted=True)
+            self.assertIs(type(html_node), LeafNode)
+            self.assertEqual(html_node, text_node_to_html_node(node))
+
+class TestInternedTextToNode(unittest.TestCase):
+    def setUp(self):
+        clear_interned_html_nodes()
+
+    def test_repeated_nodes_are_shared(self):
+        first = text_node_to_html_node(TextNode("docs", TextType.LINK, "/docs"), intern=True)
+        second = text_node_to_html_node(TextNode("docs", TextType.LINK, "/docs"), intern=True)
+        self.assertIs(first, second)
+        self.assertIsInstance(first, FrozenLeafNode)
+        self.assertIsNot(first, text_node_to_html_node(TextNode("docs", TextType.LINK, "/api"), intern=True))
+
+    def test_same_html_as_fresh_nodes(self):
+        nodes = [
+            TextNode("plain", TextType.TEXT),
+            TextNode("label", TextType.BOLD),
+            TextNode("name", TextType.CODE),
+            TextNode("alt text", TextType.IMAGE, "/logo.png"),
+        ]
+        for node in nodes:
+            interned = text_node_to_html_node(node, intern=True)
+            fresh = text_node_to_html_node(node)
+            self.assertEqual(interned, fresh)
+            self.assertEqual(interned.to_html(), fresh.to_html())
+
+    def test_interned_nodes_are_immutable(self):
+        node = text_node_to_html_node(TextNode("docs", TextType.LINK, "/docs"), intern=True)
+        with self.assertRaises(AttributeError):
+            node.value = "changed"
+        with self.assertRaises(TypeError):
+            node.props['href'] = "/changed"
+
+    def test_long_text_is_not_interned(self):
+        node = TextNode("x" * (INTERNED_TEXT_MAX_LENGTH + 1), TextType.TEXT)
+        html_node = text_node_to_html_node(node, intern=True)
+        self.assertIs(type(html_node), LeafNode)
+        self.assertIsNot(html_node, text_node_to_html_node(node, intern=True))
+
+
+
+class TestTextSpanStreamToHTML(unittest.TestCase):
+    def test_matches_text_node_rendering(self):
+        texts = [
+            "",
+            "plain text",
+            "a **b** _c_ *d* `e` and ```f```",
+            "[link](https://example.com) and ![alt](/a.png) and ![](/empty-alt.png) and [empty]()",
+        ]
+        for text in texts:
+            expected_html = ''.join(text_node_to_html_node(node).to_html() for node in text_to_text_nodes(text))
+            self.assertEqual(text_span_stream_to_html(text_to_span_stream(text)), expected_html, text)
+
+    def test_appended_spans(self):
+        stream = TextSpanStream("see docs")
+        stream.append((TextType.TEXT, 0, 4, None))
+        stream.append((TextType.LINK, 4, 8, "/docs.html"))
+        self.assertEqual(text_span_stream_to_html(stream), 'see <a href="/docs.html">docs</a>')
+        self.assertEqual(stream[1], TextNode("docs", TextType.LINK, "/docs.html"))
+
+    def test_links_do_not_fill_the_props_table(self):
+        size = props_table_size()
+        text = ' '.join(f"[page {i}](/page{i}.html) ![image {i}](/image{i}.png)" for i in range(100))
+        text_span_stream_to_html(text_to_span_stream(text))
+        self.assertEqual(props_table_size(), size)
+
+
+class TestTextSpanStreamIndexing(unittest.TestCase):
+    TEXT = "a **b** [c](/c.html) d"
+
+    def streams(self):
+        return text_to_span_stream(self.TEXT), bytes_to_span_stream(self.TEXT.encode('utf-8'))
+
+    def test_negative_indexes(self):
+        nodes = text_to_text_nodes(self.TEXT)
+        for stream in self.streams():
+            for index in range(-len(nodes), len(nodes)):
+                self.assertEqual(stream[index], nodes[index])
+
+    def test_out_of_range(self):
+        for stream in self.streams():
+            for index in (len(stream), len(stream) + 1, -len(stream) - 1, -2 * len(stream)):
+                with self.assertRaises(IndexError):
+                    stream[index]
+
+    def test_slices(self):
+        nodes = text_to_text_nodes(self.TEXT)
+        for stream in self.streams():
+            self.assertEqual(stream[1:3], nodes[1:3])
+            self.assertEqual(stream[::-2], nodes[::-2])
+            self.assertEqual(stream[-10:10], nodes)
+            self.assertEqual(stream[5:], [])
+
 if __name__ == "__main__":
     unittest.main()
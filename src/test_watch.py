@@ -0,0 +1,190 @@
+import os
+import unittest
+from unittest import mock
+
+from build import find_markdown_files
+from test_build import BuildTestCase
+from watch import scan_markdown_files, SiteWatcher
+
+
+class WatchTestCase(BuildTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_page('index.md', "# Home")
+        self.write_page('blog/post.md', "# Post\n\nFirst version")
+        self.watcher = SiteWatcher(self.content_dir, self.output_dir, self.template_path, self.manifest_path)
+        self.watcher.start()
+
+    def touch(self, path: str) -> None:
+        # make sure the change is visible even on file systems with a coarse mtime
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestSiteWatcher(WatchTestCase):
+    def test_start_builds_the_site(self):
+        self.assertEqual(self.read_output('index.html'), "<title>Home</title><main><div><h1>Home</h1></div></main>")
+        self.assertTrue(os.path.exists(self.manifest_path))
+
+    def test_nothing_changed(self):
+        self.assertIsNone(self.watcher.poll())
+
+    def test_changed_page(self):
+        self.write_page('blog/post.md', "# Post\n\nSecond version")
+        self.touch(os.path.join(self.content_dir, 'blog/post.md'))
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, ['blog/post.md'])
+        self.assertEqual(report.removed, [])
+        self.assertGreater(report.seconds, 0)
+        self.assertEqual(
+            self.read_output('blog/post.html'),
+            "<title>Post</title><main><div><h1>Post</h1><p>Second version</p></div></main>"
+        )
+        self.assertIsNone(self.watcher.poll())
+
+    def test_added_and_removed_pages(self):
+        self.write_page('about.md', "# About")
+        os.remove(os.path.join(self.content_dir, 'index.md'))
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, ['about.md'])
+        self.assertEqual(report.removed, ['index.md'])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'about.html')))
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'index.html')))
+
+    def test_template_change_renders_every_page(self):
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.touch(self.template_path)
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, ['blog/post.md', 'index.md'])
+        self.assertEqual(self.read_output('index.html'), "<h1>Home</h1><div><h1>Home</h1></div>")
+
+    def test_include_change_renders_every_page(self):
+        nav_path = os.path.join(self.root, 'nav.html')
+        self.write(nav_path, "<nav>home</nav>")
+        self.write(self.template_path, "{{> nav.html }}{{ Content }}")
+        self.touch(self.template_path)
+        self.watcher.poll()
+        self.write(nav_path, "<nav>blog</nav>")
+        self.touch(nav_path)
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, ['blog/post.md', 'index.md'])
+        self.assertEqual(self.read_output('index.html'), "<nav>blog</nav><div><h1>Home</h1></div>")
+
+    def test_broken_template_keeps_the_last_one(self):
+        self.write(self.template_path, "{{> template.html }}{{ Content }}")
+        self.touch(self.template_path)
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, [])
+        self.assertIn("includes itself", report.failed[self.template_path])
+        self.assertIsNone(self.watcher.poll())
+        self.write_page('index.md', "# Home\n\nMore")
+        self.touch(os.path.join(self.content_dir, 'index.md'))
+        self.assertEqual(self.watcher.poll().rendered, ['index.md'])
+        self.assertEqual(self.read_output('index.html'), "<title>Home</title><main><div><h1>Home</h1><p>More</p></div></main>")
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.touch(self.template_path)
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, ['blog/post.md', 'index.md'])
+        self.assertEqual(report.failed, {})
+
+    def test_template_with_invalid_utf8(self):
+        with open(self.template_path, 'wb') as file:
+            file.write(b"<title>\xff</title>{{ Content }}")
+        self.touch(self.template_path)
+        report = self.watcher.poll()
+        self.assertIn(self.template_path, report.failed)
+        self.assertEqual(self.read_output('index.html'), "<title>Home</title><main><div><h1>Home</h1></div></main>")
+
+    def test_unchanged_blocks_come_from_the_cache(self):
+        misses = self.watcher.block_cache.misses
+        self.write_page('blog/post.md', "# Post\n\nFirst version\n\nA new paragraph")
+        self.touch(os.path.join(self.content_dir, 'blog/post.md'))
+        self.watcher.poll()
+        self.assertEqual(self.watcher.block_cache.misses, misses + 1)
+
+    def test_failed_page_keeps_its_output(self):
+        self.write_page('index.md', "# Home\n\nan *unclosed delimiter")
+        self.touch(os.path.join(self.content_dir, 'index.md'))
+        report = self.watcher.poll()
+        self.assertEqual(report.rendered, [])
+        self.assertIn('index.md', report.failed)
+        self.assertEqual(self.read_output('index.html'), "<title>Home</title><main><div><h1>Home</h1></div></main>")
+        self.assertIsNone(self.watcher.poll())
+
+    def test_start_keeps_the_rendered_blocks(self):
+        self.assertEqual(sorted(self.watcher.pages), ['blog/post.md', 'index.md'])
+        self.write_page('blog/post.md', "# Post\n\nFirst version\n\nA new paragraph")
+        self.touch(os.path.join(self.content_dir, 'blog/post.md'))
+        self.watcher.poll()
+        self.assertEqual(self.watcher.pages['blog/post.md'].reparsed, 1)
+
+    def test_skipped_pages_are_diffed_from_their_first_save(self):
+        watcher = SiteWatcher(self.content_dir, self.output_dir, self.template_path, self.manifest_path)
+        self.assertEqual(watcher.start().rendered, [])
+        self.assertEqual(watcher.pages, {})
+        self.write_page('index.md', "# Home\n\nMore")
+        self.touch(os.path.join(self.content_dir, 'index.md'))
+        self.assertEqual(watcher.poll().rendered, ['index.md'])
+        self.assertIn('index.md', watcher.pages)
+
+    def test_next_build_catches_up_without_save(self):
+        self.write_page('index.md', "# Home again")
+        self.touch(os.path.join(self.content_dir, 'index.md'))
+        self.watcher.poll()
+        report = self.build()
+        self.assertEqual(report.rendered, ['index.md'])
+
+    def test_save_records_the_rendered_pages(self):
+        self.write_page('index.md', "# Home again\n\n[post](blog/post.html)")
+        self.touch(os.path.join(self.content_dir, 'index.md'))
+        os.remove(os.path.join(self.content_dir, 'blog/post.md'))
+        self.write_page('about.md', "# About")
+        self.watcher.poll()
+        self.watcher.save()
+        report = self.build()
+        self.assertEqual(report.rendered, [])
+        self.assertEqual(report.removed, [])
+        self.assertEqual(sorted(report.skipped), ['about.md', 'index.md'])
+        self.assertEqual(
+            self.read_output('index.html'),
+            '<title>Home again</title><main><div><h1>Home again</h1><p><a href="blog/post.html">post</a></p></div></main>'
+        )
+
+    def test_run_saves_on_exit(self):
+        self.write_page('index.md', "# Home again")
+        self.touch(os.path.join(self.content_dir, 'index.md'))
+        with mock.patch('watch.time.sleep', side_effect=KeyboardInterrupt):
+            self.watcher.run()
+        self.assertEqual(self.build().rendered, [])
+
+    def test_save_after_a_template_change(self):
+        self.write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.touch(self.template_path)
+        self.watcher.poll()
+        self.watcher.save()
+        self.assertEqual(self.build().rendered, [])
+
+
+class TestScanMarkdownFiles(BuildTestCase):
+    def test_scan(self):
+        self.write_page('index.md', "# Home")
+        self.write_page('blog/post.md', "post")
+        self.write_page('blog/image.png', "not markdown")
+        signatures = scan_markdown_files(self.content_dir)
+        self.assertEqual(sorted(signatures), ['blog/post.md', 'index.md'])
+        self.assertEqual(signatures['blog/post.md'][0], 4)
+
+    def test_missing_directory(self):
+        self.assertEqual(scan_markdown_files(os.path.join(self.root, 'missing')), {})
+
+    def test_symlinked_directories_are_not_followed(self):
+        self.write_page('blog/post.md', "post")
+        self.write(os.path.join(self.root, 'elsewhere', 'other.md'), "other")
+        os.symlink(os.path.join(self.root, 'elsewhere'), os.path.join(self.content_dir, 'linked'))
+        os.symlink(self.content_dir, os.path.join(self.content_dir, 'blog', 'loop'))
+        self.assertEqual(sorted(scan_markdown_files(self.content_dir)), find_markdown_files(self.content_dir))
+        self.assertEqual(sorted(scan_markdown_files(self.content_dir)), ['blog/post.md'])
+
+
+if __name__ == "__main__":
+    unittest.main()
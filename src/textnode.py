@@ -1,6 +1,16 @@
+from array import array
+from collections.abc import Iterator
+from typing import BinaryIO
 from enum import Enum
+from functools import lru_cache
 
-from htmlnode import LeafNode
+from htmlnode import FrozenLeafNode, LeafNode
+
+
+# Interned nodes are kept in a bounded LRU, and only short texts are interned:
+# repeated spans are nav links, labels and identifiers, not whole sentences.
+INTERNED_NODES_MAX_SIZE = 8192
+INTERNED_TEXT_MAX_LENGTH = 80
 
 
 class TextType(Enum):
@@ -12,6 +22,8 @@ class TextType(Enum):
     IMAGE = 'image'
 
 class TextNode:
+    __slots__ = ('text', 'text_type', 'url')
+
     def __init__(self, text: str, text_type: TextType, url: str | None = None) -> None:
         if not isinstance(text, str):
             raise TypeError('text must be a string')
@@ -23,6 +35,19 @@ class TextNode:
         self.text: str = text
         self.text_type: TextType = text_type
         self.url: str = url
+
+    @classmethod
+    def trusted(cls, text: str, text_type: TextType, url: str | None = None) -> "TextNode":
+        """
+        Builds a node without validating the arguments.
+
+        Meant for internal paths, like the inline tokenizer, that already produce values of the right types.
+        """
+        node = object.__new__(cls)
+        node.text = text
+        node.text_type = text_type
+        node.url = url
+        return node
     
     def __eq__(self, other: "TextNode") -> bool:
         text_is_equal = self.text == other.text
@@ -34,10 +59,141 @@ class TextNode:
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
-    value = text_node.text
+# code of every TextType in the kinds array of a TextSpanStream
+TEXT_TYPE_CODES: dict[TextType, int] = {text_type: code for code, text_type in enumerate(TextType)}
+_TEXT_TYPES_BY_CODE: tuple[TextType, ...] = tuple(TextType)
+
+
+class TextSpanStream:
+    """
+    The inline spans of a text stored column by column instead of as TextNode objects.
+
+    The span i is text[starts[i]:ends[i]] with the type of code kinds[i], and its url is urls[i] for links
+    and images. A span costs 9 bytes of arrays, plus a dict entry when it has a url, where a TextNode holds
+    an object, its own copy of the text and an enum reference. TextNodes are only built when the stream
+    is indexed or iterated, and text_span_stream_to_html renders the arrays without building any.
+    """
+    __slots__ = ('text', 'kinds', 'starts', 'ends', 'urls')
+
+    def __init__(self, text: str) -> None:
+        self.text: str = text
+        self.kinds: array = array('B')
+        self.starts: array = array('I')
+        self.ends: array = array('I')
+        self.urls: dict[int, str] = {}
+
+    def append(self, span: tuple[TextType, int, int, str | None]) -> None:
+        """Adds a (text_type, start, end, url) span, the format of tokenize_inline, so the stream can be its output."""
+        text_type, start, end, url = span
+        if url is not None:
+            self.urls[len(self.kinds)] = url
+        self.kinds.append(TEXT_TYPE_CODES[text_type])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _check_index(self, index: int) -> int:
+        """Returns index made non-negative, raises IndexError like a list out of its range."""
+        size = len(self.kinds)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError(f"{type(self).__name__} index out of range")
+        return index
+
+    def __getitem__(self, index: int | slice) -> TextNode | list[TextNode]:
+        """Returns the TextNode of a span, or a list of the TextNodes of a slice of the spans."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.kinds)))]
+        index = self._check_index(index)
+        return TextNode.trusted(
+            self.text[self.starts[index]:self.ends[index]], _TEXT_TYPES_BY_CODE[self.kinds[index]], self.urls.get(index)
+        )
+
+    def __iter__(self) -> Iterator[TextNode]:
+        text, urls = self.text, self.urls
+        for index, (code, start, end) in enumerate(zip(self.kinds, self.starts, self.ends)):
+            yield TextNode.trusted(text[start:end], _TEXT_TYPES_BY_CODE[code], urls.get(index))
+
+    def __repr__(self) -> str:
+        return f"TextSpanStream({len(self.kinds)} spans of {len(self.text)} characters)"
+
+
+class ByteSpanStream(TextSpanStream):
+    """
+    A TextSpanStream over a buffer of utf-8 bytes, whose offsets and urls are byte ranges of the buffer.
+
+    The spans are never copied while parsing: write_html writes memoryview slices of the buffer straight
+    into the output, so every character is copied once, into the written html. TextNodes are still
+    available on demand, decoded from their ranges.
+    """
+    __slots__ = ()
+
+    def __init__(self, data: bytes | memoryview) -> None:
+        super().__init__(data)
+        # (start, end) of the url of every link and image span, by span index
+        self.urls: dict[int, tuple[int, int]] = {}
+
+    def _url(self, index: int) -> str | None:
+        url_range = self.urls.get(index)
+        if url_range is None:
+            return None
+        return bytes(self.text[url_range[0]:url_range[1]]).decode('utf-8')
+
+    def __getitem__(self, index: int | slice) -> TextNode | list[TextNode]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.kinds)))]
+        index = self._check_index(index)
+        text = bytes(self.text[self.starts[index]:self.ends[index]]).decode('utf-8')
+        return TextNode.trusted(text, _TEXT_TYPES_BY_CODE[self.kinds[index]], self._url(index))
+
+    def __iter__(self) -> Iterator[TextNode]:
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def write_html(self, out: BinaryIO) -> None:
+        """Writes the utf-8 html of text_span_stream_to_html to out, a binary file or any object with a write method."""
+        view = memoryview(self.text)
+        urls = self.urls
+        write = out.write
+        for index, (code, start, end) in enumerate(zip(self.kinds, self.starts, self.ends)):
+            if code == _TEXT_CODE:
+                write(view[start:end])
+            elif code == _LINK_CODE:
+                url_start, url_end = urls[index]
+                if url_end > url_start:
+                    write(b'<a href="')
+                    write(view[url_start:url_end])
+                    write(b'">')
+                else:
+                    write(b'<a>')  # empty props are left out, like props_to_html does
+                write(view[start:end])
+                write(b'</a>')
+            elif code == _IMAGE_CODE:
+                url_start, url_end = urls[index]
+                write(b'<img')
+                if url_end > url_start:
+                    write(b' src="')
+                    write(view[url_start:url_end])
+                    write(b'"')
+                if end > start:
+                    write(b' alt="')
+                    write(view[start:end])
+                    write(b'"')
+                write(b'></img>')
+            else:
+                opening, closing = _PLAIN_BYTE_TAGS[code]
+                write(opening)
+                write(view[start:end])
+                write(closing)
+
+
+def _html_node_arguments(text: str, text_type: TextType, url: str | None) -> tuple[str | None, str, dict[str, str] | None]:
+    value = text
     props = None
-    match text_node.text_type:
+    match text_type:
         case TextType.TEXT:
             tag = None
         case TextType.BOLD:
@@ -48,12 +204,83 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
             tag = "code"
         case TextType.LINK:
             tag = "a"
-            props = {'href': text_node.url}
+            props = {'href': url}
         case TextType.IMAGE:
             tag = "img"
             value = ''
-            props = {'src': text_node.url, 'alt': text_node.text}
+            props = {'src': url, 'alt': text}
         case _:
-            raise ValueError(f'Invalid TextNode type: {text_node.text_type}')
-    node: LeafNode = LeafNode(tag=tag, value=value, props=props)
-    return node
+            raise ValueError(f'Invalid TextNode type: {text_type}')
+    return tag, value, props
+
+@lru_cache(maxsize=INTERNED_NODES_MAX_SIZE)
+def _interned_html_node(text: str, text_type: TextType, url: str | None) -> FrozenLeafNode:
+    return FrozenLeafNode(*_html_node_arguments(text, text_type, url))
+
+def text_node_to_html_node(text_node: TextNode, intern: bool = False, trusted: bool = False) -> LeafNode:
+    """
+    Converts a TextNode into the LeafNode rendering it.
+
+    :param text_node: the node to convert
+    :param intern: return a shared, immutable FrozenLeafNode for short texts already converted before,
+        instead of building a new LeafNode every time
+    :param trusted: skip the type checks of the LeafNode constructor, for internal paths whose TextNodes
+        come straight from the inline tokenizer
+    :return: the converted node
+    :raises TypeError: if the text of a node rendered with its text as value is not a string, unless trusted
+    """
+    if intern and len(text_node.text) <= INTERNED_TEXT_MAX_LENGTH:
+        return _interned_html_node(text_node.text, text_node.text_type, text_node.url)
+    if trusted:
+        return LeafNode.trusted(*_html_node_arguments(text_node.text, text_node.text_type, text_node.url))
+    return LeafNode(*_html_node_arguments(text_node.text, text_node.text_type, text_node.url))
+
+_TEXT_CODE = TEXT_TYPE_CODES[TextType.TEXT]
+_LINK_CODE = TEXT_TYPE_CODES[TextType.LINK]
+_IMAGE_CODE = TEXT_TYPE_CODES[TextType.IMAGE]
+# (opening tag, closing tag) of the span types rendered without props
+_PLAIN_TAGS: dict[int, tuple[str, str]] = {
+    TEXT_TYPE_CODES[TextType.BOLD]: ('<b>', '</b>'),
+    TEXT_TYPE_CODES[TextType.ITALIC]: ('<i>', '</i>'),
+    TEXT_TYPE_CODES[TextType.CODE]: ('<code>', '</code>'),
+}
+
+_PLAIN_BYTE_TAGS: dict[int, tuple[bytes, bytes]] = {
+    code: (opening.encode('ascii'), closing.encode('ascii')) for code, (opening, closing) in _PLAIN_TAGS.items()
+}
+
+def text_span_stream_to_html(stream: TextSpanStream) -> str:
+    """
+    Renders the spans of a stream to the same html as converting its TextNodes with text_node_to_html_node
+    and joining their to_html(), straight from the arrays: only the html parts are built, the attributes
+    of links and images are formatted in place like ByteSpanStream.write_html does.
+    """
+    text, urls = stream.text, stream.urls
+    parts = []
+    for index, (code, start, end) in enumerate(zip(stream.kinds, stream.starts, stream.ends)):
+        if code == _TEXT_CODE:
+            parts.append(text[start:end])
+        elif code == _LINK_CODE:
+            url = urls[index]
+            # empty props are left out, like props_to_html does
+            parts += ('<a href="', url, '">') if url else ('<a>',)
+            parts += (text[start:end], '</a>')
+        elif code == _IMAGE_CODE:
+            url = urls[index]
+            parts.append('<img')
+            if url:
+                parts += (' src="', url, '"')
+            if end > start:
+                parts += (' alt="', text[start:end], '"')
+            parts.append('></img>')
+        else:
+            opening, closing = _PLAIN_TAGS[code]
+            parts += (opening, text[start:end], closing)
+    return ''.join(parts)
+
+def clear_interned_html_nodes() -> None:
+    _interned_html_node.cache_clear()
+
+def interned_html_nodes_info():
+    """Hits, misses and size of the interned nodes cache, as a functools cache_info."""
+    return _interned_html_node.cache_info()
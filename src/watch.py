@@ -0,0 +1,203 @@
+from collections.abc import Callable
+import os
+import time
+
+from block_cache import BlockCache, DEFAULT_MAX_ENTRIES
+from build import (
+    build_site, BuildManifest, fill_rendered_page, hash_bytes, MARKDOWN_EXTENSION, output_path_for, page_paths, write_if_changed,
+)
+from dependency_graph import resolve_link_target
+from markdown_html import render_blocks, RenderedBlocks
+from templates import get_template, LoadedTemplate
+
+# (size, mtime_ns) of a file, a change of either one means the file was written
+Signature = tuple[int, int]
+
+
+def scan_markdown_files(content_dir: str) -> dict[str, Signature]:
+    """Returns the signature of every markdown file under content_dir, keyed by its path relative to it."""
+    signatures: dict[str, Signature] = {}
+    # (directory, prefix of the relative paths of its entries)
+    pending = [(content_dir, '')]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(MARKDOWN_EXTENSION) and entry.is_file():
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # removed while scanning, the next scan reports it
+                    signatures[prefix + name] = (stat.st_size, stat.st_mtime_ns)
+                elif entry.is_dir(follow_symlinks=False):  # like the os.walk of find_markdown_files
+                    pending.append((entry.path, f"{prefix}{name}{os.sep}"))
+    return signatures
+
+def file_signature(path: str) -> Signature | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class RebuildReport:
+    def __init__(self, rendered: list[str], removed: list[str], seconds: float, failed: dict[str, str] | None = None) -> None:
+        self.rendered: list[str] = rendered
+        self.removed: list[str] = removed
+        self.seconds: float = seconds
+        self.failed: dict[str, str] = failed if failed is not None else {}
+
+    def __repr__(self) -> str:
+        return (
+            f"RebuildReport(rendered={len(self.rendered)}, removed={len(self.removed)}, "
+            f"failed={len(self.failed)}, seconds={self.seconds:.4f})"
+        )
+
+
+class SiteWatcher:
+    """
+    Keeps a site built while its sources change.
+
+    The signatures of the sources, the compiled template (see get_template) and the blocks and fragments
+    of every page rendered since the start, by the initial build included, stay in memory between rebuilds:
+    a poll only stats the files, and a changed page only parses the blocks that differ from its last render
+    and are not in the block cache. Pages the initial build skipped are diffed from their first save on.
+
+    The pages rendered while watching are recorded in the manifest when the watcher stops, see save,
+    so the next build skips them.
+    """
+    def __init__(
+            self, content_dir: str, output_dir: str, template_path: str,
+            manifest_path: str | None = None, block_cache: BlockCache | None = None) -> None:
+        self.content_dir: str = content_dir
+        self.output_dir: str = output_dir
+        self.template_path: str = template_path
+        self.manifest_path: str | None = manifest_path
+        self.block_cache: BlockCache = block_cache if block_cache is not None else BlockCache(DEFAULT_MAX_ENTRIES)
+        self.template: LoadedTemplate | None = None
+        self.signatures: dict[str, Signature] = {}
+        self.pages: dict[str, RenderedBlocks] = {}
+        self.manifest: BuildManifest = BuildManifest(manifest_path)
+        # error of the last template load that failed, None once the template loads again
+        self.template_error: str | None = None
+
+    def start(self) -> RebuildReport:
+        """Builds the site incrementally against the manifest and takes the first snapshot of the sources."""
+        start = time.perf_counter()
+        self.signatures = scan_markdown_files(self.content_dir)
+        self.template = get_template(self.template_path)
+        self.pages = {}
+        report = build_site(
+            self.content_dir, self.output_dir, self.template_path, self.manifest_path, 1, self.block_cache,
+            rendered_pages=self.pages,
+        )
+        self.manifest = BuildManifest.load(self.manifest_path)
+        return RebuildReport(report.rendered, report.removed, time.perf_counter() - start)
+
+    def save(self) -> None:
+        """Records the pages rendered and removed since the start in the manifest, and saves it and the block cache."""
+        graph = self.manifest.graph
+        if self.template is not None:
+            graph.set_template(self.template)
+        self.manifest.save()
+        self.block_cache.save()
+
+    def _template_changed(self, failed: dict[str, str]) -> bool:
+        """
+        Returns whether the template or one of its includes changed since the last poll.
+
+        A template that can't be loaded, like one saved mid-edit with an include cycle or invalid utf-8,
+        leaves the last good one in use and is reported in failed once, until it loads or fails differently.
+        """
+        try:
+            template = get_template(self.template_path)
+        except FileNotFoundError:
+            return False  # being replaced, keep rendering with the last one
+        except (OSError, ValueError) as error:
+            if str(error) != self.template_error:
+                self.template_error = str(error)
+                failed[self.template_path] = self.template_error
+            return False
+        self.template_error = None
+        changed = template is not self.template
+        self.template = template
+        return changed
+
+    def poll(self) -> RebuildReport | None:
+        """
+        Renders the pages whose source changed since the last poll and removes the outputs of deleted sources,
+        every page when the template or one of its includes changed.
+
+        A page that can't be rendered, like one saved with an unclosed delimiter, keeps its previous output
+        and is reported in failed until its source changes again. So is a template that can't be loaded,
+        the pages keep being rendered with the last one that could.
+
+        :return: what was rebuilt and how long it took, from the start of the scan, or None when nothing changed
+        """
+        start = time.perf_counter()
+        signatures = scan_markdown_files(self.content_dir)
+        failed: dict[str, str] = {}
+        if self._template_changed(failed):
+            changed = sorted(signatures)
+        else:
+            changed = sorted(source for source, signature in signatures.items() if self.signatures.get(source) != signature)
+        removed = sorted(source for source in self.signatures if source not in signatures)
+        if not changed and not removed and not failed:
+            return None
+
+        rendered = []
+        for source in changed:
+            try:
+                self._render(source)
+            except (OSError, ValueError) as error:
+                failed[source] = str(error)
+                continue
+            rendered.append(source)
+        for source in removed:
+            output_path = os.path.join(self.output_dir, output_path_for(source))
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            self.pages.pop(source, None)
+            self.manifest.pages.pop(source, None)
+            self.manifest.graph.remove_page(source)
+        self.signatures = signatures
+        return RebuildReport(rendered, removed, time.perf_counter() - start, failed)
+
+    def _render(self, source: str) -> None:
+        source_path, output_path, fallback_title = page_paths(self.content_dir, self.output_dir, source)
+        with open(source_path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            data = file.read()
+        rendered = render_blocks(data.decode('utf-8'), self.pages.get(source), self.block_cache)
+        entry = self.manifest.pages.get(source, {})
+        output_hash, _ = write_if_changed(
+            output_path, fill_rendered_page(self.template.compiled, rendered, fallback_title), entry.get('output_hash')
+        )
+        self.pages[source] = rendered
+        self.manifest.pages[source] = {
+            'source_hash': hash_bytes(data),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'output_hash': output_hash,
+        }
+        links = (resolve_link_target(source, url) for url in rendered.urls)
+        self.manifest.graph.set_page(source, self.template_path, (link for link in links if link is not None))
+
+    def run(self, interval: float = 0.1, on_rebuild: Callable[[RebuildReport], None] | None = None) -> None:
+        """Polls every interval seconds until interrupted, passing the report of every rebuild to on_rebuild."""
+        try:
+            while True:
+                report = self.poll()
+                if report is not None and on_rebuild is not None:
+                    on_rebuild(report)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.save()